@@ -0,0 +1,292 @@
+"""Extract candidate lists from a directory tree without going through HTTP.
+
+Usage::
+
+    python -m api.app.cli <entrada> <saída> --workers 8 --merged listas.csv
+
+Each document gets its CSV under ``<saída>`` (same relative path, ``.csv``
+appended) and a line in ``<saída>/manifest.jsonl``. Documents already in the
+manifest, unchanged since, are skipped, so an interrupted run picks up where
+it stopped.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
+
+from .schemas.csv_contract import CandidateRecord
+from .services.csv_writer import CSVWriter
+from .services.pipeline import VALIDATION_LENIENT, VALIDATION_STRICT, ExtractionPipeline
+from .services.uploads import spool_upload
+from .services.validate import ValidationError
+
+MANIFEST = "manifest.jsonl"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+DEFAULT_EXTENSIONS = (".pdf", ".png", ".jpg", ".jpeg", ".tif", ".tiff", ".txt", ".csv")
+
+# Rows as CSV values, and the error when the document failed.
+_Outcome = Tuple[List[List[str]], Optional[str]]
+
+# One pipeline per worker process, built by ``_init_worker``.
+_pipeline: Optional[ExtractionPipeline] = None
+
+
+def _init_worker(validation: str, raster_dpi: int) -> None:
+    global _pipeline
+    _pipeline = ExtractionPipeline(validation=validation, raster_dpi=raster_dpi)
+
+
+def _process(path: str) -> _Outcome:
+    assert _pipeline is not None, "worker not initialised"
+    try:
+        with open(path, "rb") as handle, spool_upload(handle) as payload:
+            rows = _pipeline.run(payload, filename=os.path.basename(path))
+    except ValidationError as exc:
+        return [], str(exc)
+    except Exception as exc:
+        return [], f"{type(exc).__name__}: {exc}"
+    return [list(row.as_iterable()) for row in rows], None
+
+
+def discover(
+    root: Path, extensions: Sequence[str] = DEFAULT_EXTENSIONS, *, exclude: Optional[Path] = None
+) -> List[Path]:
+    """Documents under ``root`` in a stable order, skipping hidden files and folders.
+
+    Nothing under ``exclude`` is returned, so an output folder inside
+    ``root`` never has its own CSVs read back as documents.
+    """
+
+    suffixes = {extension.lower() for extension in extensions}
+    excluded = exclude.resolve() if exclude is not None else None
+    return sorted(
+        path
+        for path in root.rglob("*")
+        if path.is_file()
+        and path.suffix.lower() in suffixes
+        and not any(part.startswith(".") for part in path.relative_to(root).parts)
+        and (excluded is None or excluded not in path.resolve().parents)
+    )
+
+
+def _fingerprint(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def load_manifest(path: Path) -> Dict[str, dict]:
+    """Latest manifest entry per document; a truncated last line is ignored."""
+
+    entries: Dict[str, dict] = {}
+    if not path.exists():
+        return entries
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["document"]] = entry
+    return entries
+
+
+class BatchRunner:
+    """Run every pending document of ``source`` through the pipeline.
+
+    Documents go to a spawn process pool of ``workers`` processes, each with
+    its own pipeline, at most two per worker in flight; ``workers=1`` runs
+    them in this process. Results are written and recorded in the manifest by
+    this process only, as each document finishes.
+    """
+
+    def __init__(
+        self,
+        source: Path,
+        output: Path,
+        *,
+        workers: int = 1,
+        validation: str = VALIDATION_STRICT,
+        raster_dpi: int = 200,
+        extensions: Sequence[str] = DEFAULT_EXTENSIONS,
+        retry_failed: bool = False,
+        progress: Optional[TextIO] = None,
+    ) -> None:
+        self.source = source
+        self.output = output
+        self.workers = max(1, workers)
+        self.validation = validation
+        self.raster_dpi = raster_dpi
+        self.extensions = extensions
+        self.retry_failed = retry_failed
+        self.progress = progress
+        self.writer = CSVWriter()
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.output / MANIFEST
+
+    def pending(self) -> List[Path]:
+        """Documents that are new, changed since processed, or failed (with ``retry_failed``)."""
+
+        recorded = load_manifest(self.manifest_path)
+        pending = []
+        for path in discover(self.source, self.extensions, exclude=self.output):
+            entry = recorded.get(self._name(path))
+            changed = entry is None or any(
+                entry.get(key) != value for key, value in _fingerprint(path).items()
+            )
+            if changed or (entry["status"] == STATUS_FAILED and self.retry_failed):
+                pending.append(path)
+        return pending
+
+    def run(self) -> Tuple[int, int]:
+        """Process the pending documents; return ``(done, failed)`` for this run."""
+
+        self.output.mkdir(parents=True, exist_ok=True)
+        pending = self.pending()
+        done = failed = rows = 0
+        started = time.monotonic()
+        with self.manifest_path.open("a", encoding="utf-8") as manifest:
+            for index, (path, (values, error)) in enumerate(self._outcomes(pending), start=1):
+                entry = {"document": self._name(path), **_fingerprint(path), "rows": len(values)}
+                if error is None:
+                    csv_path = self.output / f"{self._name(path)}.csv"
+                    csv_path.parent.mkdir(parents=True, exist_ok=True)
+                    records = [CandidateRecord.from_values(row) for row in values]
+                    with csv_path.open("w", encoding="utf-8", newline="") as handle:
+                        handle.write(self.writer.write(records))
+                    entry.update(status=STATUS_DONE, csv=csv_path.relative_to(self.output).as_posix())
+                    done += 1
+                    rows += len(values)
+                else:
+                    entry.update(status=STATUS_FAILED, error=error)
+                    failed += 1
+                manifest.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                manifest.flush()
+                self._report(index, len(pending), rows, started, entry)
+        return done, failed
+
+    def merge(self, target: Path) -> int:
+        """Write the CSV of every completed document, in contract order, to ``target``."""
+
+        records: List[CandidateRecord] = []
+        for entry in load_manifest(self.manifest_path).values():
+            if entry["status"] != STATUS_DONE:
+                continue
+            with (self.output / entry["csv"]).open(encoding="utf-8", newline="") as handle:
+                reader = csv.reader(handle, delimiter=";")
+                next(reader, None)
+                records.extend(CandidateRecord.from_values(values) for values in reader)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        with target.open("w", encoding="utf-8", newline="") as handle:
+            for chunk in self.writer.iter_chunks(records):
+                handle.write(chunk)
+        return len(records)
+
+    def _outcomes(self, paths: List[Path]) -> Iterator[Tuple[Path, _Outcome]]:
+        if self.workers == 1:
+            _init_worker(self.validation, self.raster_dpi)
+            for path in paths:
+                yield path, _process(str(path))
+            return
+
+        window: Deque[Tuple[Path, "Future[_Outcome]"]] = deque()
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.validation, self.raster_dpi),
+        ) as pool:
+            try:
+                for path in paths:
+                    window.append((path, pool.submit(_process, str(path))))
+                    if len(window) >= 2 * self.workers:
+                        yield _collect(*window.popleft())
+                while window:
+                    yield _collect(*window.popleft())
+            finally:
+                for _, future in window:
+                    future.cancel()
+
+    def _name(self, path: Path) -> str:
+        return path.relative_to(self.source).as_posix()
+
+    def _report(self, index: int, total: int, rows: int, started: float, entry: dict) -> None:
+        if self.progress is None:
+            return
+        elapsed = max(time.monotonic() - started, 1e-9)
+        rate = index / elapsed
+        eta = (total - index) / rate
+        detail = f"{entry['rows']} linhas" if entry["status"] == STATUS_DONE else f"falhou: {entry['error']}"
+        print(
+            f"[{index}/{total}] {entry['document']}: {detail} | "
+            f"{rate:.2f} docs/s, {rows / elapsed:.1f} linhas/s, ETA {_format_duration(eta)}",
+            file=self.progress,
+            flush=True,
+        )
+
+
+def _collect(path: Path, future: "Future[_Outcome]") -> Tuple[Path, _Outcome]:
+    try:
+        return path, future.result()
+    except Exception as exc:
+        # The worker died (e.g. out of memory): record the document as failed.
+        return path, ([], f"{type(exc).__name__}: {exc}")
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extrai listas de candidatos de uma pasta de documentos.")
+    parser.add_argument("source", type=Path, help="Pasta com os documentos (percorrida recursivamente)")
+    parser.add_argument("output", type=Path, help="Pasta onde escrever um CSV por documento e o manifesto")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos em paralelo")
+    parser.add_argument("--merged", type=Path, help="Escrever também um CSV conjunto neste ficheiro")
+    parser.add_argument(
+        "--validation", choices=(VALIDATION_STRICT, VALIDATION_LENIENT), default=VALIDATION_STRICT
+    )
+    parser.add_argument("--raster-dpi", type=int, default=200)
+    parser.add_argument(
+        "--extensions",
+        default=",".join(DEFAULT_EXTENSIONS),
+        help="Extensões a processar, separadas por vírgulas",
+    )
+    parser.add_argument("--retry-failed", action="store_true", help="Repetir documentos que falharam")
+    parser.add_argument("--quiet", action="store_true", help="Não mostrar o progresso")
+    args = parser.parse_args(argv)
+
+    runner = BatchRunner(
+        args.source,
+        args.output,
+        workers=args.workers,
+        validation=args.validation,
+        raster_dpi=args.raster_dpi,
+        extensions=[f".{value.strip(' .')}" for value in args.extensions.split(",") if value.strip(" .")],
+        retry_failed=args.retry_failed,
+        progress=None if args.quiet else sys.stderr,
+    )
+    done, failed = runner.run()
+    print(f"{done} documentos processados, {failed} falharam", file=sys.stderr)
+    if args.merged:
+        rows = runner.merge(args.merged)
+        print(f"{rows} linhas em {args.merged}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,34 +1,119 @@
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
 
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, File, Header, HTTPException, Query, UploadFile
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 
+from .services.archive import ArchiveProcessor
+from .schemas.csv_contract import CandidateRecord
+from .services.admission import AdmissionController, AdmissionRejected
+from .services.artifacts import ArtifactStore
+from .services.cache import ResultCache
+from .services.columnar import FORMAT_CSV, MEDIA_TYPES, ColumnarWriter, FormatNotAcceptable, negotiate_format
 from .services.pipeline import ExtractionPipeline
 from .services.csv_writer import CSVWriter
+from .services.jobs import JOB_DONE, JobQueue
+from .services.segment import KeywordDictionary
+from .services.uploads import spool_upload
 from .services.validate import ValidationError
 
 
-app = FastAPI(title="CNE Listas Extraction Service", version="1.0.0")
-
-pipeline = ExtractionPipeline()
+anchor_keywords_path = os.getenv("CNE_ANCHOR_KEYWORDS")
+pipeline = ExtractionPipeline(
+    ocr_workers=int(os.getenv("CNE_OCR_WORKERS", "1")),
+    render_workers=int(os.getenv("CNE_RENDER_WORKERS", "1")),
+    raster_dpi=int(os.getenv("CNE_RASTER_DPI", "200")),
+    refine_dpi=int(os.environ["CNE_REFINE_DPI"]) if os.getenv("CNE_REFINE_DPI") else None,
+    refine_below=float(os.getenv("CNE_REFINE_CONFIDENCE", "0.8")),
+    anchor_keywords=KeywordDictionary(anchor_keywords_path) if anchor_keywords_path else None,
+    validation=os.getenv("CNE_VALIDATION", "strict"),
+    cache=ResultCache(
+        max_entries=int(os.getenv("CNE_CACHE_ENTRIES", "128")),
+        directory=os.getenv("CNE_CACHE_DIR") or None,
+        max_disk_bytes=int(os.getenv("CNE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))),
+    ),
+    artifacts=ArtifactStore(os.environ["CNE_ARTIFACTS_DIR"]) if os.getenv("CNE_ARTIFACTS_DIR") else None,
+)
 csv_writer = CSVWriter()
+columnar_writer = ColumnarWriter()
 
+# Bounded pool for the CPU-bound pipeline so the event loop stays responsive.
+pipeline_workers = int(os.getenv("CNE_PIPELINE_WORKERS", "2"))
+pipeline_executor = ThreadPoolExecutor(max_workers=pipeline_workers, thread_name_prefix="pipeline")
 
-@app.get("/api/health")
-def health_check() -> dict[str, str]:
-    """Simple health endpoint used for uptime monitoring."""
-    return {"status": "ok"}
+# Documents and pages admitted into the pipeline at once; the rest queue
+# briefly or get a 503 so bursts degrade instead of exhausting CPU and memory.
+admission = AdmissionController(
+    max_running=int(os.getenv("CNE_ADMIT_DOCUMENTS", str(pipeline_workers))),
+    max_queued=int(os.getenv("CNE_ADMIT_QUEUE", "16")),
+    max_pages=int(os.getenv("CNE_ADMIT_PAGES", "2000")),
+    queue_timeout=float(os.getenv("CNE_ADMIT_TIMEOUT", "30")),
+    retry_after=int(os.getenv("CNE_RETRY_AFTER", "5")),
+    metrics=pipeline.metrics,
+)
 
+archive_processor = ArchiveProcessor(
+    pipeline,
+    pipeline_executor,
+    window=2 * pipeline_workers,
+    max_member_bytes=int(os.getenv("CNE_ARCHIVE_MAX_MEMBER_BYTES", str(256 * 1024 * 1024))),
+    admission=admission,
+)
 
-@app.post("/api/ocr-csv", response_class=PlainTextResponse)
-async def ocr_to_csv(
-    files: List[UploadFile] | None = File(default=None),
-    file: UploadFile | None = File(default=None),
-) -> PlainTextResponse:
-    """Run the hybrid extraction pipeline over one or more uploaded files."""
+job_queue = JobQueue(
+    os.getenv("CNE_JOBS_DB", "jobs.sqlite3"),
+    pipeline,
+    writer=csv_writer,
+    workers=int(os.getenv("CNE_JOB_WORKERS", "1")),
+    admission=admission,
+    upload_dir=os.getenv("CNE_JOBS_UPLOAD_DIR") or None,
+)
+
+# Set once the background warm-up has loaded (or given up on) every model.
+models_warm = threading.Event()
+
+
+def _warm_up() -> None:
+    try:
+        pipeline.warm_up()
+    finally:
+        models_warm.set()
+
+
+def _start_warm_up() -> None:
+    # Models load in the background so the server accepts connections (and
+    # text-layer documents) straight away.
+    if os.getenv("CNE_WARM_UP", "1") == "0":
+        # Nothing to wait for: models load on first use.
+        models_warm.set()
+        return
+    threading.Thread(target=_warm_up, name="model-warm-up", daemon=True).start()
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    _start_warm_up()
+    job_queue.start()
+    try:
+        yield
+    finally:
+        job_queue.stop()
+        pipeline_executor.shutdown(wait=False, cancel_futures=True)
+        pipeline.close()
+
+
+app = FastAPI(title="CNE Listas Extraction Service", version="1.0.0", lifespan=lifespan)
 
+
+def _collect_uploads(
+    files: List[UploadFile] | None, file: UploadFile | None
+) -> List[UploadFile]:
     uploads: List[UploadFile] = []
     if files:
         uploads.extend(files)
@@ -37,26 +122,202 @@ async def ocr_to_csv(
 
     if not uploads:
         raise HTTPException(status_code=400, detail="At least one file must be provided")
+    return uploads
+
+
+def _run_upload(upload: UploadFile) -> List[CandidateRecord]:
+    # Starlette spools uploads to a temporary file; map it instead of reading
+    # the whole document into memory.
+    with spool_upload(upload.file) as payload:
+        return pipeline.run(payload, filename=upload.filename, content_type=upload.content_type)
+
+
+def _count_pages(upload: UploadFile) -> int:
+    with spool_upload(upload.file) as payload:
+        return pipeline.renderer.count_pages(
+            payload, filename=upload.filename, content_type=upload.content_type
+        )
+
+
+def _busy(exc: AdmissionRejected) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": str(exc.retry_after)})
+
+
+def _output_format(accept: str | None, requested: str | None) -> str:
+    try:
+        return negotiate_format(accept, requested)
+    except FormatNotAcceptable as exc:
+        raise HTTPException(status_code=406, detail=str(exc)) from exc
+
+
+def _rows_response(rows: List[CandidateRecord], output_format: str) -> Response:
+    if output_format == FORMAT_CSV:
+        # Starlette iterates sync generators in its threadpool, off the event loop.
+        return StreamingResponse(csv_writer.iter_chunks(rows), media_type=MEDIA_TYPES[FORMAT_CSV])
+    return Response(columnar_writer.write(rows, output_format), media_type=MEDIA_TYPES[output_format])
+
+
+def _validation_detail(exc: ValidationError) -> str | dict:
+    if exc.report is None:
+        return str(exc)
+    return {"message": str(exc), **exc.report.as_dict()}
+
+
+@app.get("/api/health")
+def health_check() -> dict[str, str]:
+    """Simple health endpoint used for uptime monitoring."""
+    return {"status": "ok"}
+
+
+@app.get("/api/ready")
+def readiness() -> dict:
+    """Report readiness, whether model warm-up has finished and the state of each engine.
+
+    Text-layer documents never wait for the models, so the service is ready as
+    soon as it answers; ``models`` says whether the warm-up is still running.
+    """
+
+    return {
+        "status": "ready",
+        "models": "loaded" if models_warm.is_set() else "warming",
+        "engines": pipeline.status(),
+        "ocr_health": pipeline.ocr.health(),
+        "admission": admission.snapshot(),
+    }
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Expose pipeline latency and throughput metrics in Prometheus text format."""
+
+    return PlainTextResponse(
+        content=pipeline.metrics.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
+
+
+@app.post("/api/ocr-csv", response_class=StreamingResponse)
+async def ocr_to_csv(
+    files: List[UploadFile] | None = File(default=None),
+    file: UploadFile | None = File(default=None),
+    output_format: str | None = Query(default=None, alias="format"),
+    accept: str | None = Header(default=None),
+) -> Response:
+    """Run the hybrid extraction pipeline over one or more uploaded files.
+
+    The result is the CSV contract, or Parquet/Arrow with ``?format=`` or a
+    matching ``Accept`` header.
+    """
+
+    uploads = _collect_uploads(files, file)
+    chosen_format = _output_format(accept, output_format)
+    loop = asyncio.get_running_loop()
 
-    def _run_pipeline(upload: UploadFile, payload: bytes):
-        try:
-            return pipeline.run(
-                payload,
-                filename=upload.filename,
-                content_type=upload.content_type,
+    async def _run_pipeline(upload: UploadFile):
+        return await loop.run_in_executor(pipeline_executor, _run_upload, upload)
+
+    async def _count() -> int:
+        counts = await asyncio.gather(
+            *(loop.run_in_executor(None, _count_pages, upload) for upload in uploads)
+        )
+        return sum(counts)
+
+    try:
+        # Pages are counted while holding a queue place, so a burst is turned
+        # away before it is parsed.
+        async with admission.admit(documents=len(uploads), pages=_count if admission.max_pages else 0):
+            # ``gather`` keeps upload order, so the merge below is deterministic.
+            # Every upload is awaited before the slots are given back, even
+            # when one fails early: the others keep running on the workers.
+            results = await asyncio.gather(
+                *(_run_pipeline(upload) for upload in uploads), return_exceptions=True
             )
-        except ValidationError as exc:
-            raise HTTPException(status_code=422, detail=str(exc)) from exc
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+    except AdmissionRejected as exc:
+        raise _busy(exc) from exc
+    except ValidationError as exc:
+        raise HTTPException(status_code=422, detail=_validation_detail(exc)) from exc
 
     rows = []
-    for upload in uploads:
-        payload = await upload.read()
-        document_rows = _run_pipeline(upload, payload)
+    for document_rows in results:
         rows.extend(document_rows)
 
-    csv_content = csv_writer.write(rows)
+    return await loop.run_in_executor(None, _rows_response, rows, chosen_format)
+
+
+@app.post("/api/archive-csv")
+async def archive_to_csv(file: UploadFile = File(...)) -> dict:
+    """Extract every document of a ZIP/TAR upload into one CSV plus a per-member manifest."""
+
+    loop = asyncio.get_running_loop()
+    # The upload is already spooled to disk by Starlette; members are read one
+    # at a time while earlier ones run on the pipeline workers. The reader runs
+    # on the default pool so it never waits on a pipeline thread it occupies.
+    try:
+        # The request only takes its turn in the queue (and may be turned
+        # away); each member then reserves its own slot and pages as it is
+        # read, since they are not known up front.
+        async with admission.admit(documents=0):
+            results = await loop.run_in_executor(None, archive_processor.process, file.file)
+    except AdmissionRejected as exc:
+        raise _busy(exc) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    rows = [row for result in results for row in result.rows]
+    return {
+        "csv": await loop.run_in_executor(None, csv_writer.write, rows),
+        "manifest": [result.manifest() for result in results],
+    }
+
+
+@app.post("/api/jobs", status_code=202)
+async def create_job(
+    files: List[UploadFile] | None = File(default=None),
+    file: UploadFile | None = File(default=None),
+) -> dict[str, str]:
+    """Queue the uploaded files for background extraction."""
+
+    uploads = _collect_uploads(files, file)
+    # The queue copies each spooled upload to its own file in chunks.
+    documents = [(upload.filename, upload.content_type, upload.file) for upload in uploads]
+    loop = asyncio.get_running_loop()
+    job_id = await loop.run_in_executor(None, job_queue.submit, documents)
+    return {"id": job_id, "status": "queued"}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str) -> dict:
+    """Report the status and progress of a background job."""
+
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": {"documents_done": job.documents_done, "documents_total": job.documents_total},
+        "error": job.error,
+    }
+
+
+@app.get("/api/jobs/{job_id}/result", response_class=StreamingResponse)
+def get_job_result(
+    job_id: str,
+    output_format: str | None = Query(default=None, alias="format"),
+    accept: str | None = Header(default=None),
+) -> Response:
+    """Return the rows produced by a finished job, as CSV, Parquet or Arrow."""
 
-    return PlainTextResponse(content=csv_content, media_type="text/csv; charset=utf-8")
+    chosen_format = _output_format(accept, output_format)
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.status != JOB_DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+    return _rows_response(job_queue.result_rows(job_id), chosen_format)
 
 
 __all__ = ["app"]
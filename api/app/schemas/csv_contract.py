@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import ClassVar, Iterable, List
+from dataclasses import dataclass, field
+from typing import ClassVar, Iterable, List, Optional, Sequence, Tuple, Union
 
 from pydantic import BaseModel, Field, validator
 
@@ -34,11 +35,7 @@ class CandidateRow(BaseModel):
 
     @validator("NUM_ORDEM", pre=True)
     def coerce_num_ordem(cls, value: int | str) -> int:
-        if isinstance(value, int):
-            return value
-        if isinstance(value, str) and value.strip():
-            return int(value.strip())
-        return 0
+        return _coerce_num_ordem(value)
 
     def as_iterable(self) -> Iterable[str]:
         """Return the row in CSV order as an iterable of strings."""
@@ -56,5 +53,92 @@ class CandidateRow(BaseModel):
             self.INDEPENDENTE,
         ]
 
+    @classmethod
+    def from_record(cls, record: "CandidateRecord") -> "CandidateRow":
+        return cls(**dict(zip(cls.HEADERS, record.as_iterable())))
 
-__all__ = ["CandidateRow"]
+
+def _coerce_num_ordem(value: int | str) -> int:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip():
+        return int(value.strip())
+    return 0
+
+
+@dataclass(slots=True)
+class CandidateRecord:
+    """Compact internal row used between normalisation, validation and output.
+
+    Field names and order mirror :class:`CandidateRow`; convert with
+    :meth:`to_row` where a validated pydantic model is needed.
+    ``page_number`` records the source page for validation reports and is
+    not part of the contract output.
+    """
+
+    DTMNFR: str
+    ORGAO: str
+    TIPO: str
+    SIGLA: str
+    SIMBOLO: str
+    NOME_LISTA: str
+    NUM_ORDEM: int
+    NOME_CANDIDATO: str
+    PARTIDO_PROPONENTE: str
+    INDEPENDENTE: str
+    page_number: Optional[int] = field(default=None, compare=False)
+
+    @classmethod
+    def from_values(cls, values: Sequence[str]) -> "CandidateRecord":
+        """Build a record from a CSV-ordered sequence of values."""
+
+        (
+            dtmnfr,
+            orgao,
+            tipo,
+            sigla,
+            simbolo,
+            nome_lista,
+            num_ordem,
+            nome_candidato,
+            partido_proponente,
+            independente,
+        ) = values
+        return cls(
+            dtmnfr,
+            orgao,
+            tipo,
+            sigla,
+            simbolo,
+            nome_lista,
+            _coerce_num_ordem(num_ordem),
+            nome_candidato,
+            partido_proponente,
+            independente,
+        )
+
+    def as_iterable(self) -> Tuple[str, ...]:
+        """Return the row in CSV order as strings."""
+
+        return (
+            self.DTMNFR,
+            self.ORGAO,
+            self.TIPO,
+            self.SIGLA,
+            self.SIMBOLO,
+            self.NOME_LISTA,
+            str(self.NUM_ORDEM),
+            self.NOME_CANDIDATO,
+            self.PARTIDO_PROPONENTE,
+            self.INDEPENDENTE,
+        )
+
+    def to_row(self) -> CandidateRow:
+        return CandidateRow.from_record(self)
+
+
+# Anything exposing the contract fields and ``as_iterable``.
+ContractRow = Union[CandidateRow, CandidateRecord]
+
+
+__all__ = ["CandidateRecord", "CandidateRow", "ContractRow"]
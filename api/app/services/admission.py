@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Optional, Union
+
+from .metrics import MetricsRegistry
+
+REJECT_QUEUE_FULL = "queue_full"
+REJECT_TIMEOUT = "timeout"
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; retry after ``retry_after`` seconds."""
+
+    def __init__(self, reason: str, retry_after: int) -> None:
+        super().__init__(f"Server busy ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Waiter:
+    documents: int
+    pages: int
+    # Called under the lock once admitted; must not block.
+    wake: Callable[[], None]
+    granted: bool = field(default=False)
+
+
+class AdmissionController:
+    """Limit the documents and pages in the pipeline before any work starts.
+
+    A request is admitted straight away while the documents (``max_running``)
+    and pages (``max_pages``, ``0`` for no limit) in flight stay within
+    bounds; a request too large for the limits on its own is still admitted
+    when nothing else runs. Otherwise it waits in a FIFO queue of at most
+    ``max_queued`` requests for up to ``queue_timeout`` seconds. Requests
+    that find the queue full or time out are rejected with
+    :class:`AdmissionRejected`, so the caller can answer quickly instead of
+    piling more work onto the workers.
+
+    ``pages`` may be given as a coroutine function counting them: a request
+    holds a queue place while it counts, so a burst is turned away with
+    ``queue_full`` before it is parsed. Worker threads (the job queue) use
+    :meth:`hold`, which waits in the same FIFO queue but is never rejected.
+
+    State is shared across threads and event loops; waiters are woken on
+    their own loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_running: int = 2,
+        max_queued: int = 16,
+        max_pages: int = 0,
+        queue_timeout: float = 30.0,
+        retry_after: int = 5,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.max_running = max(1, max_running)
+        self.max_queued = max(0, max_queued)
+        self.max_pages = max(0, max_pages)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.metrics = metrics or MetricsRegistry()
+        self._running = 0
+        self._pages = 0
+        self._counting = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._describe_metrics()
+
+    @asynccontextmanager
+    async def admit(
+        self, *, documents: int = 1, pages: Union[int, Callable[[], Awaitable[int]]] = 0
+    ) -> AsyncIterator[None]:
+        """Hold ``documents`` run slots and ``pages`` of the page budget for the ``with`` block."""
+
+        if callable(pages):
+            pages = await self._count(pages)
+
+        waiter: Optional[_Waiter] = None
+        with self._lock:
+            if not self._waiters and self._fits(documents, pages):
+                self._take(documents, pages)
+            elif len(self._waiters) >= self.max_queued:
+                self._reject(REJECT_QUEUE_FULL)
+            else:
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                waiter = _Waiter(documents, pages, partial(loop.call_soon_threadsafe, _wake, future))
+                self._waiters.append(waiter)
+                self._publish()
+
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+            except asyncio.CancelledError:
+                if self._abandon(waiter):
+                    self._release(documents, pages)
+                raise
+            except asyncio.TimeoutError:
+                # Admitted just as the timeout fired: go ahead.
+                if not self._abandon(waiter):
+                    self._reject(REJECT_TIMEOUT)
+
+        try:
+            yield
+        finally:
+            self._release(documents, pages)
+
+    @contextmanager
+    def hold(self, *, documents: int = 1, pages: int = 0) -> Iterator[None]:
+        """Blocking :meth:`admit` for worker threads; waits its turn without a timeout."""
+
+        admitted = threading.Event()
+        with self._lock:
+            if not self._waiters and self._fits(documents, pages):
+                self._take(documents, pages)
+                admitted.set()
+            else:
+                # Accepted work (a persisted job) is queued even when the queue is full.
+                self._waiters.append(_Waiter(documents, pages, admitted.set))
+                self._publish()
+        admitted.wait()
+        try:
+            yield
+        finally:
+            self._release(documents, pages)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "running": self._running,
+                "queued": len(self._waiters),
+                "counting": self._counting,
+                "pages_in_flight": self._pages,
+            }
+
+    async def _count(self, count: Callable[[], Awaitable[int]]) -> int:
+        # Requests counting pages are about to queue: they take a queue place
+        # for the duration, unless nothing else is queued or counting.
+        with self._lock:
+            queued = len(self._waiters) + self._counting
+            if queued and queued >= self.max_queued:
+                self._reject(REJECT_QUEUE_FULL)
+            self._counting += 1
+        try:
+            return await count()
+        finally:
+            with self._lock:
+                self._counting -= 1
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Leave the queue; return ``True`` if the waiter had already been admitted."""
+
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            self._publish()
+            return False
+
+    def _fits(self, documents: int, pages: int) -> bool:
+        if self._running == 0:
+            return True
+        if self._running + documents > self.max_running:
+            return False
+        return not self.max_pages or self._pages + pages <= self.max_pages
+
+    def _take(self, documents: int, pages: int) -> None:
+        self._running += documents
+        self._pages += pages
+        self._publish()
+
+    def _release(self, documents: int, pages: int) -> None:
+        with self._lock:
+            self._running -= documents
+            self._pages -= pages
+            while self._waiters and self._fits(self._waiters[0].documents, self._waiters[0].pages):
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                self._take(waiter.documents, waiter.pages)
+                waiter.wake()
+            self._publish()
+
+    def _reject(self, reason: str) -> None:
+        self.metrics.inc("cne_admission_rejections_total", reason=reason)
+        raise AdmissionRejected(reason, self.retry_after)
+
+    def _publish(self) -> None:
+        self.metrics.set("cne_admission_running_documents", self._running)
+        self.metrics.set("cne_admission_queued_requests", len(self._waiters))
+        self.metrics.set("cne_admission_pages_in_flight", self._pages)
+
+    def _describe_metrics(self) -> None:
+        self.metrics.gauge("cne_admission_running_documents", "Documents admitted into the pipeline.")
+        self.metrics.gauge("cne_admission_queued_requests", "Requests waiting for admission.")
+        self.metrics.gauge("cne_admission_pages_in_flight", "Pages of the admitted documents.")
+        self.metrics.counter(
+            "cne_admission_rejections_total", "Requests rejected with 503 (queue_full, timeout)."
+        )
+        self._publish()
+
+
+def _wake(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+__all__ = ["AdmissionController", "AdmissionRejected", "REJECT_QUEUE_FULL", "REJECT_TIMEOUT"]
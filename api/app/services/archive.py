@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import tarfile
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import Executor, Future
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from pathlib import PurePosixPath
+from typing import IO, Any, BinaryIO, Callable, Deque, Iterator, List, Optional, Tuple, Union
+
+from ..schemas.csv_contract import CandidateRecord
+from .admission import AdmissionController
+from .pipeline import ExtractionPipeline
+from .validate import ValidationError
+
+MEMBER_DONE = "done"
+MEMBER_FAILED = "failed"
+
+# Name, payload and, for members that could not be read, the error.
+Member = Tuple[str, bytes, Optional[str]]
+
+# Raised by zipfile/tarfile/zlib on damaged or unsupported member data
+# (RuntimeError for encrypted ZIP members, NotImplementedError for unknown
+# compression methods).
+_READ_ERRORS = (
+    zipfile.BadZipFile,
+    tarfile.TarError,
+    zlib.error,
+    EOFError,
+    OSError,
+    RuntimeError,
+    NotImplementedError,
+)
+
+
+@dataclass
+class MemberResult:
+    name: str
+    status: str
+    rows: List[CandidateRecord] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def manifest(self) -> dict:
+        return {"name": self.name, "status": self.status, "rows": len(self.rows), "error": self.error}
+
+
+def iter_members(fileobj: BinaryIO, *, max_member_bytes: int = 0) -> Iterator[Member]:
+    """Yield ``(name, payload, error)`` for each regular file of a ZIP or TAR archive.
+
+    Members are read one at a time, so only the member being yielded is held
+    in memory. Directories and hidden entries (``.DS_Store``, ``__MACOSX``)
+    are skipped. A member that cannot be read (bad CRC, truncated data) or
+    is larger than ``max_member_bytes`` (``0`` for no limit) comes with an
+    empty payload and the ``error``; the other members are still yielded.
+    Raises ``ValueError`` for anything that is not an archive and for
+    archives too damaged to list.
+    """
+
+    if zipfile.is_zipfile(fileobj):
+        fileobj.seek(0)
+        try:
+            archive = zipfile.ZipFile(fileobj)
+        except (zipfile.BadZipFile, OSError) as exc:
+            raise ValueError(f"Corrupt ZIP archive: {exc}") from exc
+        with archive:
+            for info in archive.infolist():
+                if info.is_dir() or _hidden(info.filename):
+                    continue
+                yield (info.filename, *_read_member(archive.open, info, info.file_size, max_member_bytes))
+        return
+
+    fileobj.seek(0)
+    try:
+        # Stream mode reads members sequentially instead of indexing the archive first.
+        archive = tarfile.open(fileobj=fileobj, mode="r|*")
+    except tarfile.TarError as exc:
+        raise ValueError("Unsupported archive: expected a ZIP or TAR file") from exc
+    try:
+        with archive:
+            for info in archive:
+                if not info.isfile() or _hidden(info.name):
+                    continue
+                yield (info.name, *_read_member(archive.extractfile, info, info.size, max_member_bytes))
+    except _READ_ERRORS as exc:
+        # The next header could not be read: nothing after it can be located.
+        raise ValueError(f"Corrupt TAR archive: {exc}") from exc
+
+
+def _read_member(
+    open_member: Callable[[Any], Optional[IO[bytes]]], info: Any, size: int, limit: int
+) -> Tuple[bytes, Optional[str]]:
+    if limit and size > limit:
+        return b"", f"Member too large: {size} bytes (limit {limit})"
+    try:
+        member = open_member(info)
+        if member is None:
+            return b"", "Member has no data"
+        with member:
+            # Read one byte past the limit: sizes in the headers can lie.
+            payload = member.read(limit + 1 if limit else -1)
+    except _READ_ERRORS as exc:
+        return b"", f"{type(exc).__name__}: {exc}"
+    if limit and len(payload) > limit:
+        return b"", f"Member too large: more than {limit} bytes"
+    return payload, None
+
+
+def _hidden(name: str) -> bool:
+    return any(part.startswith(".") or part == "__MACOSX" for part in PurePosixPath(name).parts)
+
+
+class ArchiveProcessor:
+    """Run every document of an archive through the pipeline on ``executor``.
+
+    At most ``window`` members are in flight (read but not yet finished), so
+    memory depends on the window rather than on the archive size. Results
+    come back in archive order; a member that fails, cannot be read or is
+    larger than ``max_member_bytes`` does not stop the others.
+
+    With an ``admission`` controller each member waits for its document slot
+    and pages, like a queued job, before it is handed to ``executor``.
+    """
+
+    def __init__(
+        self,
+        pipeline: ExtractionPipeline,
+        executor: Executor,
+        *,
+        window: int = 2,
+        max_member_bytes: int = 0,
+        admission: Optional[AdmissionController] = None,
+    ) -> None:
+        self.pipeline = pipeline
+        self.executor = executor
+        self.window = max(1, window)
+        self.max_member_bytes = max(0, max_member_bytes)
+        self.admission = admission
+
+    def process(self, fileobj: BinaryIO) -> List[MemberResult]:
+        results: List[MemberResult] = []
+        # Each entry holds the running member, or the error of one that could not be read.
+        pending: Deque[Tuple[str, Union["Future[List[CandidateRecord]]", str]]] = deque()
+        try:
+            for name, payload, error in iter_members(fileobj, max_member_bytes=self.max_member_bytes):
+                if error is None:
+                    pending.append((name, self._submit(name, payload)))
+                else:
+                    pending.append((name, error))
+                if len(pending) >= self.window:
+                    results.append(_collect(*pending.popleft()))
+            while pending:
+                results.append(_collect(*pending.popleft()))
+        finally:
+            for _, outcome in pending:
+                if isinstance(outcome, Future):
+                    outcome.cancel()
+        return results
+
+    def _submit(self, name: str, payload: bytes) -> "Future[List[CandidateRecord]]":
+        if self.admission is None:
+            return self.executor.submit(self.pipeline.run, payload, filename=name)
+        pages = 0
+        if self.admission.max_pages:
+            pages = self.pipeline.renderer.count_pages(payload, filename=name)
+        # The reservation is taken on the reading thread, never on a pipeline
+        # worker: a worker waiting for admission could starve the documents
+        # that hold the slots it waits for.
+        reservation = ExitStack()
+        reservation.enter_context(self.admission.hold(pages=pages))
+        try:
+            future = self.executor.submit(self.pipeline.run, payload, filename=name)
+        except BaseException:
+            reservation.close()
+            raise
+        future.add_done_callback(lambda _: reservation.close())
+        return future
+
+
+def _collect(name: str, outcome: Union["Future[List[CandidateRecord]]", str]) -> MemberResult:
+    if isinstance(outcome, str):
+        return MemberResult(name, MEMBER_FAILED, error=outcome)
+    try:
+        return MemberResult(name, MEMBER_DONE, rows=outcome.result())
+    except ValidationError as exc:
+        return MemberResult(name, MEMBER_FAILED, error=str(exc))
+    except Exception as exc:
+        return MemberResult(name, MEMBER_FAILED, error=f"{type(exc).__name__}: {exc}")
+
+
+__all__ = ["ArchiveProcessor", "MEMBER_DONE", "MEMBER_FAILED", "Member", "MemberResult", "iter_members"]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, List
+
+from .render import Payload
+
+# Pipeline checkpoints in execution order. Each one holds the output of the
+# stage of the same name: RenderedPage, OCRPage, LayoutPage, DocumentSegment
+# and RawCandidate lists respectively.
+STAGES = ("render", "ocr", "layout", "segment", "extract")
+
+
+def payload_digest(payload: Payload) -> str:
+    """Return the SHA-256 hex digest identifying a document payload."""
+
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ArtifactStore:
+    """Persist intermediate pipeline outputs keyed by document hash.
+
+    Artifacts are pickled, so only load stores written by this service.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def save(self, digest: str, stage: str, value: Any) -> None:
+        path = self._path(digest, stage)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def load(self, digest: str, stage: str) -> Any:
+        path = self._path(digest, stage)
+        try:
+            with path.open("rb") as handle:
+                return pickle.load(handle)
+        except FileNotFoundError:
+            raise KeyError(f"No '{stage}' artifact stored for document {digest}") from None
+
+    def has(self, digest: str, stage: str) -> bool:
+        return self._path(digest, stage).is_file()
+
+    def stages(self, digest: str) -> List[str]:
+        """Return the checkpoints stored for ``digest`` in pipeline order."""
+
+        return [stage for stage in STAGES if self.has(digest, stage)]
+
+    def documents(self) -> List[str]:
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def _path(self, digest: str, stage: str) -> Path:
+        if stage not in STAGES:
+            raise ValueError(f"Unknown pipeline stage '{stage}'. Expected one of {', '.join(STAGES)}")
+        return self.root / digest / f"{stage}.pkl"
+
+
+__all__ = ["ArtifactStore", "STAGES", "payload_digest"]
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..schemas.csv_contract import CandidateRecord
+
+
+class ResultCache:
+    """Content-addressed cache for pipeline results.
+
+    Entries live in an in-memory LRU and, when ``directory`` is given, in a
+    disk tier whose total size is capped at ``max_disk_bytes`` by evicting the
+    least recently used files. Concurrent lookups for the same key share a
+    single computation.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 128,
+        directory: Optional[str | os.PathLike[str]] = None,
+        max_disk_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory is not None else None
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, List[CandidateRecord]]" = OrderedDict()
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def get_or_compute(self, key: str, compute: Callable[[], List[CandidateRecord]]) -> List[CandidateRecord]:
+        with self._lock:
+            rows = self._get_memory(key)
+            if rows is not None:
+                return list(rows)
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            return list(future.result())
+
+        try:
+            rows = self._get_disk(key)
+            if rows is None:
+                rows = compute()
+                self._put_disk(key, rows)
+            with self._lock:
+                self._put_memory(key, rows)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(rows)
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+        return list(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if self.directory is not None:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _get_memory(self, key: str) -> Optional[List[CandidateRecord]]:
+        rows = self._memory.get(key)
+        if rows is not None:
+            self._memory.move_to_end(key)
+        return rows
+
+    def _put_memory(self, key: str, rows: List[CandidateRecord]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = rows
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.directory is not None
+        return self.directory / f"{key}.json"
+
+    def _get_disk(self, key: str) -> Optional[List[CandidateRecord]]:
+        if self.directory is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with path.open("r", encoding="utf-8") as handle:
+                records = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # refresh recency for eviction
+        except OSError:
+            pass
+        return [CandidateRecord.from_values(values) for values in records]
+
+    def _put_disk(self, key: str, rows: List[CandidateRecord]) -> None:
+        if self.directory is None:
+            return
+        records = [list(row.as_iterable()) for row in rows]
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(records, handle, ensure_ascii=False)
+            os.replace(tmp_name, self._disk_path(key))
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+            return
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        assert self.directory is not None
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_disk_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+__all__ = ["ResultCache"]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from typing import Iterable, List, Optional, Tuple
+
+from ..schemas.csv_contract import CandidateRow, ContractRow
+from .csv_writer import contract_sort_key
+
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa  # type: ignore
+    import pyarrow.ipc  # type: ignore  # noqa: F401
+    import pyarrow.parquet as pq  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+FORMAT_CSV = "csv"
+FORMAT_PARQUET = "parquet"
+FORMAT_ARROW = "arrow"
+FORMAT_ARROW_FILE = "arrow-file"
+
+MEDIA_TYPES = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_PARQUET: "application/vnd.apache.parquet",
+    FORMAT_ARROW: "application/vnd.apache.arrow.stream",
+    FORMAT_ARROW_FILE: "application/vnd.apache.arrow.file",
+}
+
+# Media types clients may send in ``Accept`` for each format.
+_ACCEPTED = {
+    "text/csv": FORMAT_CSV,
+    "text/*": FORMAT_CSV,
+    "*/*": FORMAT_CSV,
+    "application/vnd.apache.parquet": FORMAT_PARQUET,
+    "application/x-parquet": FORMAT_PARQUET,
+    "application/vnd.apache.arrow.stream": FORMAT_ARROW,
+    "application/vnd.apache.arrow.file": FORMAT_ARROW_FILE,
+}
+
+# Low-cardinality columns, stored as dictionary indices instead of repeated strings.
+DICTIONARY_COLUMNS = (
+    "DTMNFR",
+    "ORGAO",
+    "TIPO",
+    "SIGLA",
+    "SIMBOLO",
+    "NOME_LISTA",
+    "PARTIDO_PROPONENTE",
+    "INDEPENDENTE",
+)
+
+
+class FormatNotAcceptable(Exception):
+    """Raised when no supported output format matches the request."""
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick the output format from a ``format`` query value or the ``Accept`` header.
+
+    ``requested`` wins over ``Accept``. Without either, or when ``Accept``
+    names nothing supported, the CSV contract is used as before. Columnar
+    formats need pyarrow.
+    """
+
+    if requested:
+        chosen = requested.lower()
+        if chosen not in MEDIA_TYPES:
+            expected = ", ".join(MEDIA_TYPES)
+            raise FormatNotAcceptable(f"Unknown format '{requested}'. Expected one of: {expected}")
+    else:
+        chosen = _from_accept(accept)
+    if chosen != FORMAT_CSV and pa is None:
+        raise FormatNotAcceptable(f"pyarrow is required for {chosen} output")
+    return chosen
+
+
+def _from_accept(accept: Optional[str]) -> str:
+    if not accept:
+        return FORMAT_CSV
+    offers: List[Tuple[float, int, str]] = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *params = (part.strip() for part in item.split(";"))
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        chosen = _ACCEPTED.get(media_type.lower())
+        if chosen is not None and quality > 0:
+            offers.append((-quality, position, chosen))
+    return min(offers)[2] if offers else FORMAT_CSV
+
+
+class ColumnarWriter:
+    """Produce Parquet or Arrow IPC (stream or file format) output matching the CSV contract.
+
+    Columns follow ``CandidateRow.HEADERS`` and rows the contract order, as
+    in :class:`~.csv_writer.CSVWriter`; ``NUM_ORDEM`` is typed as an integer
+    and the columns in ``DICTIONARY_COLUMNS`` are dictionary-encoded.
+    """
+
+    def __init__(self, *, compression: str = "zstd", chunk_rows: int = 65536) -> None:
+        self.compression = compression
+        self.chunk_rows = max(1, chunk_rows)
+
+    def schema(self) -> "pa.Schema":
+        _require_pyarrow()
+        return pa.schema([(name, _column_type(name)) for name in CandidateRow.HEADERS])
+
+    def table(self, rows: Iterable[ContractRow]) -> "pa.Table":
+        _require_pyarrow()
+        ordered = sorted(rows, key=contract_sort_key)
+        columns = []
+        for name in CandidateRow.HEADERS:
+            values = [getattr(row, name) for row in ordered]
+            if name in DICTIONARY_COLUMNS:
+                columns.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                columns.append(pa.array(values, type=_column_type(name)))
+        return pa.Table.from_arrays(columns, schema=self.schema())
+
+    def write(self, rows: Iterable[ContractRow], output_format: str = FORMAT_PARQUET) -> bytes:
+        table = self.table(rows)
+        sink = pa.BufferOutputStream()
+        if output_format == FORMAT_PARQUET:
+            pq.write_table(
+                table,
+                sink,
+                compression=self.compression,
+                use_dictionary=list(DICTIONARY_COLUMNS),
+                row_group_size=self.chunk_rows,
+            )
+        elif output_format in (FORMAT_ARROW, FORMAT_ARROW_FILE):
+            # The file format adds a footer for random access (``pa.ipc.open_file``).
+            new_writer = pa.ipc.new_stream if output_format == FORMAT_ARROW else pa.ipc.new_file
+            with new_writer(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=self.chunk_rows)
+        else:
+            raise ValueError(
+                f"Unknown columnar format '{output_format}'. Expected 'parquet', 'arrow' or 'arrow-file'"
+            )
+        return sink.getvalue().to_pybytes()
+
+
+def _column_type(name: str) -> "pa.DataType":
+    if name == "NUM_ORDEM":
+        return pa.int32()
+    if name in DICTIONARY_COLUMNS:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def _require_pyarrow() -> None:
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow output. Install the optional dependency.")
+
+
+__all__ = [
+    "ColumnarWriter",
+    "DICTIONARY_COLUMNS",
+    "FORMAT_ARROW",
+    "FORMAT_ARROW_FILE",
+    "FORMAT_CSV",
+    "FORMAT_PARQUET",
+    "FormatNotAcceptable",
+    "MEDIA_TYPES",
+    "negotiate_format",
+]
@@ -2,34 +2,55 @@ from __future__ import annotations
 
 import csv
 from io import StringIO
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Tuple
 
-from ..schemas.csv_contract import CandidateRow
+from ..schemas.csv_contract import CandidateRow, ContractRow
+
+
+def contract_sort_key(row: ContractRow) -> Tuple[str, str, str, str, str, int]:
+    """Order in which rows appear in the contract output."""
+
+    return (
+        row.DTMNFR,
+        row.ORGAO,
+        row.SIGLA,
+        row.NOME_LISTA,
+        row.TIPO,
+        row.NUM_ORDEM,
+    )
 
 
 class CSVWriter:
     """Produce UTF-8 CSV output that matches the contract."""
 
-    def write(self, rows: Iterable[CandidateRow]) -> str:
-        materialised: List[CandidateRow] = list(rows)
-        ordered = sorted(
-            materialised,
-            key=lambda row: (
-                row.DTMNFR,
-                row.ORGAO,
-                row.SIGLA,
-                row.NOME_LISTA,
-                row.TIPO,
-                row.NUM_ORDEM,
-            ),
-        )
+    def __init__(self, *, chunk_rows: int = 500) -> None:
+        self.chunk_rows = max(1, chunk_rows)
+
+    def write(self, rows: Iterable[ContractRow]) -> str:
+        return "".join(self.iter_chunks(rows))
+
+    def iter_chunks(self, rows: Iterable[ContractRow]) -> Iterator[str]:
+        """Yield the CSV in contract order, header first, ``chunk_rows`` rows at a time.
+
+        Only the rows themselves are held for sorting; the text is produced
+        chunk by chunk through a single reused buffer.
+        """
 
         buffer = StringIO()
         writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
         writer.writerow(CandidateRow.HEADERS)
-        for row in ordered:
-            writer.writerow(row.as_iterable())
-        return buffer.getvalue()
+        yield self._drain(buffer)
+
+        ordered: List[ContractRow] = sorted(rows, key=contract_sort_key)
+        for start in range(0, len(ordered), self.chunk_rows):
+            writer.writerows(row.as_iterable() for row in ordered[start : start + self.chunk_rows])
+            yield self._drain(buffer)
+
+    def _drain(self, buffer: StringIO) -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
 
 
-__all__ = ["CSVWriter"]
+__all__ = ["CSVWriter", "contract_sort_key"]
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 
+from .models import MODEL_UNAVAILABLE, LazyModel
 from .segment import DocumentSegment
 
 try:  # pragma: no cover - optional dependency
@@ -26,73 +29,131 @@ class RawCandidate:
     partido_proponente: str
     independente: str
     anchor: str
+    page_number: Optional[int] = None
 
 
 class DataExtractor:
-    """Extract candidate rows from anchored layout segments."""
-
-    def __init__(self) -> None:
-        self._nlp: Optional[Language] = None
-        if spacy is not None:
-            try:  # pragma: no cover - heavy dependency
-                self._nlp = spacy.load("pt_core_news_sm")
-            except Exception:
-                try:
-                    self._nlp = spacy.blank("pt")
-                except Exception:
-                    self._nlp = None
+    """Extract candidate rows from anchored layout segments.
+
+    The spaCy model is only loaded when a row needs NER to find the
+    candidate name, or when :meth:`warm_up` is called. All rows of a call to
+    :meth:`extract` that need NER go through a single ``nlp.pipe`` batch, and
+    the recognised names are memoised by row text.
+    """
+
+    # Pipeline components needed for entities; everything else is disabled.
+    NER_COMPONENTS = ("tok2vec", "ner")
+
+    def __init__(self, *, ner_batch_size: int = 256, ner_memo_size: int = 4096) -> None:
+        self._nlp: LazyModel[Language] = LazyModel(_load_nlp)
+        self.ner_batch_size = ner_batch_size
+        self.ner_memo_size = ner_memo_size
+        self._names: "OrderedDict[str, str]" = OrderedDict()
+        # ``select_pipes`` toggles components on the shared model.
+        self._ner_lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        self._nlp.get()
+
+    def status(self) -> dict[str, str]:
+        return {"spacy": MODEL_UNAVAILABLE if spacy is None else self._nlp.state}
 
     def extract(self, segments: Iterable[DocumentSegment]) -> List[RawCandidate]:
-        candidates: List[RawCandidate] = []
-        context = {
-            "DTMNFR": "",
-            "ORGAO": "",
-            "TIPO": "",
-            "SIGLA": "",
-            "SIMBOLO": "",
-            "NOME_LISTA": "",
-            "PARTIDO_PROPONENTE": "",
-        }
+        segments = list(segments)
+        names = self._recognise_names(segments)
+        context = _new_context()
+        return [
+            candidate for segment in segments for candidate in self._extract_segment(segment, context, names)
+        ]
+
+    def iter_extract(self, segments: Iterable[DocumentSegment]) -> Iterator[RawCandidate]:
+        """Extract segment by segment, carrying the list context across them.
 
+        NER is batched per segment instead of per document.
+        """
+
+        context = _new_context()
         for segment in segments:
-            for row in segment.rows:
-                if len(row.values) >= 10:
-                    mapping = row.values[:10]
-                else:
-                    mapping = self._heuristic_fill(row.values, context)
-                    if mapping is None:
-                        continue
-
-                context.update(
-                    {
-                        "DTMNFR": mapping[0] or context["DTMNFR"],
-                        "ORGAO": mapping[1] or context["ORGAO"],
-                        "TIPO": mapping[2] or context["TIPO"],
-                        "SIGLA": mapping[3] or context["SIGLA"],
-                        "SIMBOLO": mapping[4] or context["SIMBOLO"],
-                        "NOME_LISTA": mapping[5] or context["NOME_LISTA"],
-                        "PARTIDO_PROPONENTE": mapping[8] or context["PARTIDO_PROPONENTE"],
-                    }
-                )
-
-                candidates.append(
-                    RawCandidate(
-                        dtmnfr=mapping[0] or context["DTMNFR"],
-                        orgao=mapping[1] or context["ORGAO"],
-                        tipo=mapping[2] or context["TIPO"],
-                        sigla=mapping[3] or context["SIGLA"],
-                        simbolo=mapping[4] or context["SIMBOLO"],
-                        nome_lista=mapping[5] or context["NOME_LISTA"],
-                        num_ordem=mapping[6],
-                        nome_candidato=mapping[7],
-                        partido_proponente=mapping[8] or context["PARTIDO_PROPONENTE"],
-                        independente=mapping[9],
-                        anchor=segment.anchor,
-                    )
-                )
-        return candidates
-
-    def _heuristic_fill(self, values: List[str], context: dict[str, str]) -> Optional[List[str]]:
+            yield from self._extract_segment(segment, context, self._recognise_names([segment]))
+
+    def _extract_segment(
+        self, segment: DocumentSegment, context: Dict[str, str], names: Dict[str, str]
+    ) -> Iterator[RawCandidate]:
+        for row in segment.rows:
+            if len(row.values) >= 10:
+                mapping = row.values[:10]
+            else:
+                mapping = self._heuristic_fill(row.values, context, names)
+                if mapping is None:
+                    continue
+
+            context.update(
+                {
+                    "DTMNFR": mapping[0] or context["DTMNFR"],
+                    "ORGAO": mapping[1] or context["ORGAO"],
+                    "TIPO": mapping[2] or context["TIPO"],
+                    "SIGLA": mapping[3] or context["SIGLA"],
+                    "SIMBOLO": mapping[4] or context["SIMBOLO"],
+                    "NOME_LISTA": mapping[5] or context["NOME_LISTA"],
+                    "PARTIDO_PROPONENTE": mapping[8] or context["PARTIDO_PROPONENTE"],
+                }
+            )
+
+            yield RawCandidate(
+                dtmnfr=mapping[0] or context["DTMNFR"],
+                orgao=mapping[1] or context["ORGAO"],
+                tipo=mapping[2] or context["TIPO"],
+                sigla=mapping[3] or context["SIGLA"],
+                simbolo=mapping[4] or context["SIMBOLO"],
+                nome_lista=mapping[5] or context["NOME_LISTA"],
+                num_ordem=mapping[6],
+                nome_candidato=mapping[7],
+                partido_proponente=mapping[8] or context["PARTIDO_PROPONENTE"],
+                independente=mapping[9],
+                anchor=segment.anchor,
+                page_number=row.page_number,
+            )
+
+    def _recognise_names(self, segments: List[DocumentSegment]) -> Dict[str, str]:
+        """Map the text of every row that needs NER to the person it names, if any."""
+
+        texts = list(
+            dict.fromkeys(
+                _ner_text(row.values)
+                for segment in segments
+                for row in segment.rows
+                if 0 < len(row.values) < 10 and not (row.values[7] if len(row.values) > 7 else "")
+            )
+        )
+        if not texts:
+            return {}
+        nlp = self._nlp.get()
+        if nlp is None:
+            return {}
+
+        with self._ner_lock:
+            missing = [text for text in texts if text not in self._names]
+            if missing and "ner" not in nlp.pipe_names:
+                recognised = [""] * len(missing)
+            elif missing:
+                enabled = [name for name in self.NER_COMPONENTS if name in nlp.pipe_names]
+                with nlp.select_pipes(enable=enabled):
+                    recognised = [_person(doc) for doc in nlp.pipe(missing, batch_size=self.ner_batch_size)]
+            else:
+                recognised = []
+            for text, name in zip(missing, recognised):
+                self._names[text] = name
+            result = {}
+            for text in texts:
+                self._names.move_to_end(text)
+                result[text] = self._names[text]
+            while len(self._names) > self.ner_memo_size:
+                self._names.popitem(last=False)
+        return result
+
+    def _heuristic_fill(
+        self, values: List[str], context: dict[str, str], names: Optional[Dict[str, str]] = None
+    ) -> Optional[List[str]]:
         if not values:
             return None
         padded = [""] * 10
@@ -100,12 +161,8 @@ class DataExtractor:
             padded[idx] = value
 
         # Attempt to guess candidate name when missing using NER
-        if not padded[7] and self._nlp is not None:
-            doc = self._nlp(" ".join(values))  # pragma: no cover - heavy dependency
-            for ent in doc.ents:
-                if ent.label_.upper() in {"PER", "PESSOA", "PERSON"}:
-                    padded[7] = ent.text
-                    break
+        if not padded[7] and names:
+            padded[7] = names.get(_ner_text(values), "")
 
         if not padded[7]:
             padded[7] = self._guess_name(values)
@@ -143,4 +200,36 @@ class DataExtractor:
         return "1"
 
 
+def _new_context() -> Dict[str, str]:
+    return {
+        "DTMNFR": "",
+        "ORGAO": "",
+        "TIPO": "",
+        "SIGLA": "",
+        "SIMBOLO": "",
+        "NOME_LISTA": "",
+        "PARTIDO_PROPONENTE": "",
+    }
+
+
+def _ner_text(values: List[str]) -> str:
+    return " ".join(values)
+
+
+def _person(doc) -> str:
+    for ent in doc.ents:
+        if ent.label_.upper() in {"PER", "PESSOA", "PERSON"}:
+            return ent.text
+    return ""
+
+
+def _load_nlp() -> Optional[Language]:
+    if spacy is None:
+        return None
+    try:  # pragma: no cover - heavy dependency
+        return spacy.load("pt_core_news_sm")
+    except Exception:
+        return spacy.blank("pt")
+
+
 __all__ = ["DataExtractor", "RawCandidate"]
@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Sequence, Tuple, Union
+
+from ..schemas.csv_contract import CandidateRecord
+from .admission import AdmissionController
+from .csv_writer import CSVWriter
+from .pipeline import ExtractionPipeline
+from .render import Payload
+from .uploads import spool_upload
+from .validate import ValidationError
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_documents (
+    job_id TEXT NOT NULL REFERENCES jobs(id),
+    position INTEGER NOT NULL,
+    filename TEXT,
+    content_type TEXT,
+    path TEXT,
+    rows TEXT,
+    PRIMARY KEY (job_id, position)
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs(status, created_at);
+"""
+
+
+@dataclass
+class Job:
+    id: str
+    status: str
+    documents_total: int
+    documents_done: int
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+
+class JobQueue:
+    """Persistent SQLite-backed queue running extraction jobs in background threads.
+
+    Each document's rows are stored as soon as it finishes, so a job picked up
+    again after a restart only processes the documents that were still
+    pending. Jobs left ``running`` by a previous process are re-queued on
+    :meth:`start`; the database is meant to be owned by one service process.
+
+    Uploads are copied to files under ``upload_dir`` (next to the database
+    by default) rather than stored in SQLite, and mapped into memory only
+    while their document runs; each file is removed once its rows are stored.
+
+    With an ``admission`` controller each document waits for its turn
+    alongside the HTTP requests (see :meth:`AdmissionController.hold`), so
+    jobs count against the same document and page limits.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        pipeline: ExtractionPipeline,
+        *,
+        writer: Optional[CSVWriter] = None,
+        workers: int = 1,
+        poll_interval: float = 1.0,
+        admission: Optional[AdmissionController] = None,
+        upload_dir: str | os.PathLike[str] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.upload_dir = Path(upload_dir) if upload_dir else self.path.with_name(f"{self.path.stem}-uploads")
+        self.pipeline = pipeline
+        self.admission = admission
+        self.writer = writer or CSVWriter()
+        self.workers = max(1, workers)
+        self.poll_interval = poll_interval
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (JOB_QUEUED, time.time(), JOB_RUNNING),
+            )
+        self._stop.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads.clear()
+
+    def submit(self, documents: Sequence[Tuple[Optional[str], Optional[str], Union[bytes, BinaryIO]]]) -> str:
+        """Queue ``(filename, content_type, payload)`` documents as one job.
+
+        ``payload`` is the document's bytes or a binary file, copied in chunks.
+        """
+
+        job_id = uuid.uuid4().hex
+        directory = self.upload_dir / job_id
+        directory.mkdir(parents=True)
+        try:
+            paths = []
+            for position, (_, _, payload) in enumerate(documents):
+                target = directory / str(position)
+                with target.open("wb") as handle:
+                    if isinstance(payload, bytes):
+                        handle.write(payload)
+                    else:
+                        payload.seek(0)
+                        shutil.copyfileobj(payload, handle, 1024 * 1024)
+                paths.append(str(target))
+            now = time.time()
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, status, created_at, updated_at) VALUES (?, ?, ?, ?)",
+                    (job_id, JOB_QUEUED, now, now),
+                )
+                conn.executemany(
+                    "INSERT INTO job_documents (job_id, position, filename, content_type, path) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (job_id, position, filename, content_type, path)
+                        for position, ((filename, content_type, _), path) in enumerate(zip(documents, paths))
+                    ],
+                )
+        except BaseException:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT j.id, j.status, COUNT(d.position), COUNT(d.rows), j.error, j.created_at, j.updated_at "
+                "FROM jobs j LEFT JOIN job_documents d ON d.job_id = j.id "
+                "WHERE j.id = ? GROUP BY j.id",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Job(*row)
+
+    def iter_result(self, job_id: str) -> Iterator[str]:
+        """Yield the CSV of a finished job in contract order."""
+
+        return self.writer.iter_chunks(self.result_rows(job_id))
+
+    def result_rows(self, job_id: str) -> List[CandidateRecord]:
+        """Return the rows of a finished job, in document order."""
+
+        with self._connect() as conn:
+            stored = conn.execute(
+                "SELECT rows FROM job_documents WHERE job_id = ? ORDER BY position", (job_id,)
+            ).fetchall()
+        return [
+            CandidateRecord.from_values(values)
+            for (document_rows,) in stored
+            for values in json.loads(document_rows or "[]")
+        ]
+
+    def process_next(self) -> bool:
+        """Claim the oldest queued job and run it. Return ``False`` when idle."""
+
+        job_id = self._claim()
+        if job_id is None:
+            return False
+
+        try:
+            while True:
+                with self._connect() as conn:
+                    document = conn.execute(
+                        "SELECT position, filename, content_type, path FROM job_documents "
+                        "WHERE job_id = ? AND rows IS NULL ORDER BY position LIMIT 1",
+                        (job_id,),
+                    ).fetchone()
+                if document is None:
+                    break
+                position, filename, content_type, path = document
+                with open(path, "rb") as handle, spool_upload(handle) as mapped:
+                    rows = self._run(mapped, filename, content_type)
+                with self._connect() as conn:
+                    conn.execute(
+                        "UPDATE job_documents SET rows = ?, path = NULL "
+                        "WHERE job_id = ? AND position = ?",
+                        (
+                            json.dumps([list(row.as_iterable()) for row in rows], ensure_ascii=False),
+                            job_id,
+                            position,
+                        ),
+                    )
+                    conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time(), job_id))
+                os.unlink(path)
+        except ValidationError as exc:
+            self._finish(job_id, JOB_FAILED, str(exc))
+        except Exception as exc:
+            self._finish(job_id, JOB_FAILED, f"{type(exc).__name__}: {exc}")
+        else:
+            self._finish(job_id, JOB_DONE, None)
+        return True
+
+    def _run(
+        self, payload: Payload, filename: Optional[str], content_type: Optional[str]
+    ) -> List[CandidateRecord]:
+        if self.admission is None:
+            return self.pipeline.run(payload, filename=filename, content_type=content_type)
+        pages = 0
+        if self.admission.max_pages:
+            pages = self.pipeline.renderer.count_pages(payload, filename=filename, content_type=content_type)
+        with self.admission.hold(pages=pages):
+            return self.pipeline.run(payload, filename=filename, content_type=content_type)
+
+    def _claim(self) -> Optional[str]:
+        with self._connect(immediate=True) as conn:
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (JOB_RUNNING, time.time(), row[0]),
+            )
+        return row[0]
+
+    def _finish(self, job_id: str, status: str, error: Optional[str]) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+            conn.execute("UPDATE job_documents SET path = NULL WHERE job_id = ?", (job_id,))
+        shutil.rmtree(self.upload_dir / job_id, ignore_errors=True)
+
+    def _work(self) -> None:
+        while not self._stop.is_set():
+            if self.process_next():
+                continue
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    @contextmanager
+    def _connect(self, *, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        if not self._schema_ready:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            self._ensure_schema(conn)
+            conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+            yield conn
+            if conn.in_transaction:
+                conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _ensure_schema(self, conn: sqlite3.Connection) -> None:
+        if self._schema_ready:
+            return
+        with self._schema_lock:
+            if not self._schema_ready:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._schema_ready = True
+
+
+__all__ = ["Job", "JobQueue", "JOB_DONE", "JOB_FAILED", "JOB_QUEUED", "JOB_RUNNING"]
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Optional, Sequence
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+# Columns of the CSV contract, see ``CandidateRow.HEADERS``.
+CONTRACT_COLUMNS = 10
 
 
 @dataclass
 class LayoutRow:
     values: List[str]
+    page_number: Optional[int] = None
 
 
 @dataclass
@@ -17,16 +26,96 @@ class LayoutPage:
 
 
 class LayoutAnalyzer:
-    """Heuristic layout analyser for semi-structured electoral lists."""
+    """Heuristic layout analyser for semi-structured electoral lists.
+
+    When OCR reports token boxes, rows are found by clustering token centres
+    on the y axis and columns from the widest vertical gaps in the page's x
+    coverage, at least ``column_gap`` token heights wide so that spaces
+    between words do not count. When the 10 contract columns are found, rows
+    spanning at least ``min_row_columns`` columns come out with one value per
+    column, keeping multi-word cells such as names together, and take the
+    extractor's direct path. Other rows (titles, section headers), pages
+    where fewer columns are found and pages without geometry use the text
+    heuristics.
+    """
+
+    def __init__(
+        self, *, min_row_columns: int = 3, noise_share: float = 0.1, column_gap: float = 1.0
+    ) -> None:
+        self.min_row_columns = min_row_columns
+        # Share of rows allowed to cross a column gap (wide titles, stray marks).
+        self.noise_share = noise_share
+        # Narrowest column gap, in median token heights.
+        self.column_gap = column_gap
 
     def analyze(self, pages: Iterable["OCRPage"]) -> List[LayoutPage]:
-        from .ocr import OCRPage  # local import to avoid cycles
+        return list(self.iter_analyze(pages))
+
+    def iter_analyze(self, pages: Iterable["OCRPage"]) -> Iterator[LayoutPage]:
+        from .ocr import OCRPage, OCRToken  # local import to avoid cycles
 
-        analysed: List[LayoutPage] = []
         for page in pages:
-            rows = self._split_rows(page.text)
-            analysed.append(LayoutPage(page_number=page.page_number, source=page.source, rows=rows))
-        return analysed
+            rows = self._rows_from_tokens(page.tokens) if page.tokens else None
+            if rows is None:
+                rows = self._split_rows(page.text)
+            for row in rows:
+                row.page_number = page.page_number
+            yield LayoutPage(page_number=page.page_number, source=page.source, rows=rows)
+
+    def _rows_from_tokens(self, tokens: Sequence["OCRToken"]) -> Optional[List[LayoutRow]]:
+        """Lay tokens out on a grid, or return ``None`` unless all contract columns are found."""
+
+        if np is None:
+            return None
+        boxes = np.array([(token.x0, token.y0, token.x1, token.y1) for token in tokens], dtype=float)
+        texts = [token.text.strip() for token in tokens]
+
+        # Rows: a new line starts where the sorted y centres jump by more than
+        # half the median token height.
+        centres = (boxes[:, 1] + boxes[:, 3]) / 2
+        order = np.argsort(centres, kind="stable")
+        height = max(float(np.median(boxes[:, 3] - boxes[:, 1])), 1.0)
+        row_ids = np.empty(len(tokens), dtype=int)
+        row_ids[order] = np.concatenate(([0], np.cumsum(np.diff(centres[order]) > height / 2)))
+        row_count = int(row_ids.max()) + 1
+
+        # Columns: x coverage per pixel; gaps are runs covered by no more than
+        # ``noise_share`` of the rows. The widest gaps separate the columns.
+        left = np.floor(boxes[:, 0] - boxes[:, 0].min()).astype(int)
+        right = np.ceil(boxes[:, 2] - boxes[:, 0].min()).astype(int)
+        edges = np.zeros(int(right.max()) + 2, dtype=int)
+        np.add.at(edges, left, 1)
+        np.add.at(edges, right, -1)
+        coverage = np.cumsum(edges)[:-1]
+        low = np.concatenate(([0], (coverage <= int(self.noise_share * row_count)).astype(np.int8), [0]))
+        starts = np.flatnonzero(np.diff(low) == 1)
+        stops = np.flatnonzero(np.diff(low) == -1)
+        # Word spacing inside a cell is well under a character height, so
+        # narrower runs are spaces between words, not columns.
+        inner = (starts > 0) & (stops < len(coverage)) & (stops - starts >= self.column_gap * height)
+        starts, stops = starts[inner], stops[inner]
+        if len(starts) < CONTRACT_COLUMNS - 1:
+            # Empty columns (SIMBOLO and NOME_LISTA outside GCE lists) merge
+            # into their neighbours' gap; which cells are which is unknown.
+            return None
+        widest = np.argsort(stops - starts, kind="stable")[::-1][: CONTRACT_COLUMNS - 1]
+        bounds = np.sort((starts[widest] + stops[widest]) / 2)
+        columns = np.searchsorted(bounds, (left + right) / 2)
+
+        rows: List[LayoutRow] = []
+        by_row = np.lexsort((boxes[:, 0], row_ids))
+        splits = np.flatnonzero(np.diff(row_ids[by_row])) + 1
+        for members in np.split(by_row, splits):
+            if len(np.unique(columns[members])) >= self.min_row_columns:
+                cells: List[List[str]] = [[] for _ in range(CONTRACT_COLUMNS)]
+                for index in members:
+                    cells[columns[index]].append(texts[index])
+                values = [" ".join(cell) for cell in cells]
+            else:
+                values = " ".join(texts[index] for index in members).split()
+            if any(values):
+                rows.append(LayoutRow(values=values))
+        return rows
 
     def _split_rows(self, text: str) -> List[LayoutRow]:
         if not text:
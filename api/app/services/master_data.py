@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import math
+from collections import defaultdict
 from dataclasses import dataclass
-from difflib import get_close_matches
-from typing import Dict, Iterable, List
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
 
 MASTER_SIGLA: Dict[str, List[str]] = {
@@ -28,20 +31,109 @@ class SiglaResolution:
     confidence: float
 
 
-def resolve_sigla(sigla: str) -> SiglaResolution:
-    sigla_norm = (sigla or "").strip().upper()
-    if sigla_norm in MASTER_SIGLA:
-        return SiglaResolution(canonical=sigla_norm, matched=sigla_norm, confidence=1.0)
+class SiglaResolver:
+    """Resolve free-text siglas against a master list, built once per master list.
+
+    Results are identical to scanning every canonical party in order with
+    ``difflib.get_close_matches``; the indexes only skip work that cannot
+    change the outcome:
+
+    * exact canonical and alias lookups are hash hits, and an alias hit
+      bounds the fuzzy scan to the canonicals listed before it;
+    * candidates are bucketed by length, so a canonical whose aliases are all
+      too short or too long to reach the cutoff is skipped with integer maths;
+    * the remaining candidates share one ``SequenceMatcher`` primed with the
+      input instead of rebuilding it per canonical;
+    * resolutions are memoised in a bounded LRU cache.
+    """
+
+    def __init__(
+        self,
+        master: Mapping[str, Sequence[str]],
+        *,
+        cutoff: float = 0.6,
+        memo_size: int = 4096,
+    ) -> None:
+        self.cutoff = cutoff
+        self._master = dict(master)
+        self._canonicals: List[str] = list(self._master)
+        self._candidates: List[List[str]] = [
+            [alias.lower() for alias in (canonical, *aliases)] for canonical, aliases in self._master.items()
+        ]
+        self._exact: Dict[str, int] = {}
+        self._by_length: Dict[int, List[int]] = defaultdict(list)
+        for canonical_index, candidates in enumerate(self._candidates):
+            for candidate in candidates:
+                self._exact.setdefault(candidate, canonical_index)
+            for length in sorted({len(candidate) for candidate in candidates}):
+                self._by_length[length].append(canonical_index)
+        self.resolve = lru_cache(maxsize=memo_size)(self._resolve)
+
+    def _resolve(self, sigla: str) -> SiglaResolution:
+        sigla_norm = (sigla or "").strip().upper()
+        if sigla_norm in self._master:
+            return SiglaResolution(canonical=sigla_norm, matched=sigla_norm, confidence=1.0)
+
+        word = sigla_norm.lower()
+        exact_index = self._exact.get(word)
+        limit = len(self._canonicals) if exact_index is None else exact_index
+        matcher = SequenceMatcher()
+        matcher.set_seq2(word)
+        for canonical_index in self._viable(len(word), limit):
+            match = self._best_match(matcher, self._candidates[canonical_index])
+            if match is not None:
+                return SiglaResolution(canonical=self._canonicals[canonical_index], matched=match, confidence=0.8)
+
+        if exact_index is not None:
+            return SiglaResolution(canonical=self._canonicals[exact_index], matched=word, confidence=0.8)
+        return SiglaResolution(canonical=sigla_norm or "INDEPENDENTE", matched=sigla_norm, confidence=0.0)
 
-    for canonical, aliases in MASTER_SIGLA.items():
-        if sigla_norm == canonical:
-            return SiglaResolution(canonical=canonical, matched=canonical, confidence=1.0)
-        candidates = [canonical, *aliases]
-        matches = get_close_matches(sigla_norm.lower(), [alias.lower() for alias in candidates], n=1, cutoff=0.6)
-        if matches:
-            return SiglaResolution(canonical=canonical, matched=matches[0], confidence=0.8)
+    def _viable(self, length: int, limit: int) -> List[int]:
+        """Canonical indexes below ``limit`` with a candidate length that can reach the cutoff."""
 
-    return SiglaResolution(canonical=sigla_norm or "INDEPENDENTE", matched=sigla_norm, confidence=0.0)
+        if length == 0 or self.cutoff <= 0:
+            return list(range(limit)) if length else []
+        # real_quick_ratio = 2 * min(la, lb) / (la + lb) must be >= cutoff. The
+        # bounds are rounded outwards so float error never drops a candidate.
+        shortest = math.floor(length * self.cutoff / (2 - self.cutoff))
+        longest = math.ceil(length * (2 - self.cutoff) / self.cutoff)
+        viable = {
+            canonical_index
+            for candidate_length, indexes in self._by_length.items()
+            if shortest <= candidate_length <= longest
+            for canonical_index in indexes
+            if canonical_index < limit
+        }
+        return sorted(viable)
+
+    def _best_match(self, matcher: SequenceMatcher, candidates: Sequence[str]) -> Optional[str]:
+        # Same filters and tie-breaking as get_close_matches(word, candidates, n=1).
+        best: Optional[Tuple[float, str]] = None
+        for candidate in candidates:
+            matcher.set_seq1(candidate)
+            if (
+                matcher.real_quick_ratio() >= self.cutoff
+                and matcher.quick_ratio() >= self.cutoff
+                and matcher.ratio() >= self.cutoff
+            ):
+                scored = (matcher.ratio(), candidate)
+                if best is None or scored > best:
+                    best = scored
+        return None if best is None else best[1]
+
+
+_DEFAULT_RESOLVER = SiglaResolver(MASTER_SIGLA)
+
+
+def resolve_sigla(sigla: str) -> SiglaResolution:
+    return _DEFAULT_RESOLVER.resolve(sigla)
 
 
-__all__ = ["MASTER_SIGLA", "VALID_ORGAOS", "VALID_TIPOS", "SiglaResolution", "resolve_sigla"]
+__all__ = [
+    "MASTER_SIGLA",
+    "VALID_ORGAOS",
+    "VALID_TIPOS",
+    "SiglaResolution",
+    "SiglaResolver",
+    "resolve_sigla",
+]
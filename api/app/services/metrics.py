@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+@dataclass
+class _Histogram:
+    buckets: Tuple[float, ...]
+    counts: List[int] = field(default_factory=list)
+    total: float = 0.0
+    count: int = 0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * len(self.buckets)
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class _Metric:
+    kind: str
+    help: str
+    buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    values: Dict[LabelSet, float] = field(default_factory=dict)
+    histograms: Dict[LabelSet, _Histogram] = field(default_factory=dict)
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and histograms rendered in Prometheus text format."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str) -> None:
+        self._declare(name, "counter", help)
+
+    def gauge(self, name: str, help: str) -> None:
+        self._declare(name, "gauge", help)
+
+    def histogram(self, name: str, help: str, buckets: Optional[Sequence[float]] = None) -> None:
+        self._declare(name, "histogram", help, tuple(sorted(buckets or DEFAULT_BUCKETS)))
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = _label_set(labels)
+        with self._lock:
+            metric = self._get(name, "counter")
+            metric.values[key] = metric.values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        key = _label_set(labels)
+        with self._lock:
+            self._get(name, "gauge").values[key] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _label_set(labels)
+        with self._lock:
+            metric = self._get(name, "histogram")
+            histogram = metric.histograms.get(key)
+            if histogram is None:
+                histogram = metric.histograms[key] = _Histogram(metric.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the ``with`` block in seconds."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        with self._lock:
+            for name, metric in sorted(self._metrics.items()):
+                lines.append(f"# HELP {name} {metric.help}")
+                lines.append(f"# TYPE {name} {metric.kind}")
+                if metric.kind == "histogram":
+                    for labels, histogram in sorted(metric.histograms.items()):
+                        cumulative = 0
+                        for bound, count in zip(histogram.buckets, histogram.counts):
+                            cumulative += count
+                            lines.append(
+                                f"{name}_bucket{_format_labels(labels + (('le', _format_value(bound)),))} {cumulative}"
+                            )
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.total)}")
+                        lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+                else:
+                    for labels, value in sorted(metric.values.items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _declare(self, name: str, kind: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None and existing.kind != kind:
+                raise ValueError(f"Metric {name} already registered as {existing.kind}")
+            if existing is None:
+                self._metrics[name] = _Metric(kind=kind, help=help, buckets=buckets)
+
+    def _get(self, name: str, kind: str) -> _Metric:
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = _Metric(kind=kind, help=name)
+        elif metric.kind != kind:
+            raise ValueError(f"Metric {name} is a {metric.kind}, not a {kind}")
+        return metric
+
+
+def _label_set(labels: Dict[str, str]) -> LabelSet:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+__all__ = ["DEFAULT_BUCKETS", "MetricsRegistry"]
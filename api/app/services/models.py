@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+MODEL_PENDING = "pending"
+MODEL_LOADING = "loading"
+MODEL_LOADED = "loaded"
+MODEL_UNAVAILABLE = "unavailable"
+
+
+class LazyModel(Generic[T]):
+    """Load a heavy model on first use, exactly once, from any thread.
+
+    ``loader`` returns the model, or ``None`` when it cannot be used (missing
+    dependency, download failure, ...). Either outcome is remembered, so a
+    failed load is not retried on every page.
+    """
+
+    def __init__(self, loader: Callable[[], Optional[T]]) -> None:
+        self._loader = loader
+        self._model: Optional[T] = None
+        self._state = MODEL_PENDING
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def get(self) -> Optional[T]:
+        if self._state in (MODEL_LOADED, MODEL_UNAVAILABLE):
+            return self._model
+        with self._lock:
+            if self._state in (MODEL_PENDING, MODEL_LOADING):
+                self._state = MODEL_LOADING
+                try:
+                    self._model = self._loader()
+                except Exception:
+                    self._model = None
+                self._state = MODEL_LOADED if self._model is not None else MODEL_UNAVAILABLE
+        return self._model
+
+
+__all__ = ["LazyModel", "MODEL_LOADED", "MODEL_LOADING", "MODEL_PENDING", "MODEL_UNAVAILABLE"]
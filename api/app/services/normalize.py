@@ -1,24 +1,24 @@
 from __future__ import annotations
 
 import unicodedata
-from typing import Iterable, List
+from typing import Iterable, Iterator, List
 
 from .extract import RawCandidate
 from .master_data import VALID_ORGAOS, VALID_TIPOS, resolve_sigla
-from ..schemas.csv_contract import CandidateRow
+from ..schemas.csv_contract import CandidateRecord
 
 
 class DataNormalizer:
     """Normalise extracted data to fit the CSV contract."""
 
-    def normalize(self, candidates: Iterable[RawCandidate]) -> List[CandidateRow]:
-        normalised: List[CandidateRow] = []
+    def normalize(self, candidates: Iterable[RawCandidate]) -> List[CandidateRecord]:
+        return [self._normalize_candidate(candidate) for candidate in candidates]
+
+    def iter_normalize(self, candidates: Iterable[RawCandidate]) -> Iterator[CandidateRecord]:
         for candidate in candidates:
-            row = self._normalize_candidate(candidate)
-            normalised.append(row)
-        return normalised
+            yield self._normalize_candidate(candidate)
 
-    def _normalize_candidate(self, candidate: RawCandidate) -> CandidateRow:
+    def _normalize_candidate(self, candidate: RawCandidate) -> CandidateRecord:
         dtmnfr = self._clean(candidate.dtmnfr)
         orgao = self._normalise_orgao(candidate.orgao, candidate.anchor)
         tipo = self._normalise_tipo(candidate.tipo, candidate.anchor)
@@ -41,7 +41,7 @@ class DataNormalizer:
         if tipo in {"GCE", "COLIGAÇÃO"} and not nome_lista:
             nome_lista = sigla_resolution.canonical
 
-        return CandidateRow(
+        return CandidateRecord(
             DTMNFR=dtmnfr or "",
             ORGAO=orgao,
             TIPO=tipo,
@@ -52,6 +52,7 @@ class DataNormalizer:
             NOME_CANDIDATO=nome_candidato,
             PARTIDO_PROPONENTE=partido,
             INDEPENDENTE=independente,
+            page_number=candidate.page_number,
         )
 
     def _clean(self, value: str) -> str:
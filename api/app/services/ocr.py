@@ -1,8 +1,15 @@
 from __future__ import annotations
 
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from .models import MODEL_UNAVAILABLE, LazyModel
+from .ocr_router import ROUTE_BLANK, OCRRouter
 
 try:  # pragma: no cover - optional dependency
     from paddleocr import PaddleOCR  # type: ignore
@@ -11,79 +18,374 @@ except Exception:  # pragma: no cover - optional dependency
 
 try:  # pragma: no cover - optional dependency
     import pytesseract  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    pytesseract = None
+
+try:  # pragma: no cover - optional dependency
     from PIL import Image  # type: ignore
     import numpy as np  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
-    pytesseract = None
     Image = None
     np = None
 
 
+# Engine reported for pages no engine could read (or that failed to render).
+ENGINE_FAILED = "failed"
+
+
+@dataclass
+class OCRToken:
+    """A recognised word or phrase with its bounding box in raster pixels."""
+
+    text: str
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    confidence: Optional[float] = None
+
+
 @dataclass
 class OCRPage:
     page_number: int
     source: str
     text: str
+    engine: str = ""
+    # Mean token confidence in [0, 1] reported by the engine; ``None`` for
+    # text-layer pages. ``dpi`` is the resolution the page was rasterized at.
+    confidence: Optional[float] = None
+    dpi: Optional[int] = None
+    # Token geometry from engines that report it, for column detection.
+    tokens: Optional[List[OCRToken]] = None
+
+
+# Page text, engine name, mean confidence and tokens.
+_Outcome = Tuple[str, str, Optional[float], Optional[List[OCRToken]]]
 
 
 class OCREngine:
-    """OCR abstraction with PaddleOCR preference and Tesseract fallback."""
+    """OCR abstraction with PaddleOCR preference and Tesseract fallback.
 
-    def __init__(self) -> None:
-        self._paddle: Optional[PaddleOCR] = None
-        if PaddleOCR is not None:
-            try:  # pragma: no cover - heavy dependency
-                self._paddle = PaddleOCR(use_angle_cls=True, lang="pt")
-            except Exception:
-                self._paddle = None
+    With ``workers > 1`` pages are OCR'd in a process pool. Each worker process
+    holds its own engine instance and the pool is recycled once every worker
+    has handled ``max_tasks_per_worker`` pages, so leaks in the native OCR
+    libraries do not accumulate. Results are always returned in input order,
+    and :meth:`iter_run` keeps at most two pages per worker in flight.
+
+    PaddleOCR is loaded on the first page that actually needs it (or by
+    :meth:`warm_up`), so text-layer documents never wait for the model.
+
+    Raster pages go through an :class:`OCRRouter`, which picks the engine
+    per page and stops calling engines that keep failing. A raster that no
+    engine could read is reported as ``failed``; its bytes are never decoded
+    as text. Engine health is tracked per process.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        max_tasks_per_worker: Optional[int] = 50,
+        router: Optional[OCRRouter] = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_tasks = 0
+        self._pool_users: Dict[ProcessPoolExecutor, int] = {}
+        self._pool_lock = threading.Lock()
+        # PaddleOCR predictors are not safe to call from several threads at once.
+        self._paddle_lock = threading.Lock()
+        self._paddle: LazyModel[PaddleOCR] = LazyModel(_load_paddle)
+        self.router = router or OCRRouter()
+        # Engines by preference; each takes a pixel array and returns an outcome.
+        self._engines: Dict[str, Callable[[Any], _Outcome]] = {
+            "paddle": self._ocr_paddle,
+            "tesseract": _tesseract,
+        }
 
     def run(self, pages: List["RenderedPage"]) -> List[OCRPage]:
+        return list(self.iter_run(pages))
+
+    def iter_run(self, pages: Iterable["RenderedPage"]) -> Iterator[OCRPage]:
+        """OCR pages as they arrive, without holding on to their payloads."""
+
         from .render import RenderedPage  # local import to avoid cycles
 
-        results: List[OCRPage] = []
+        if self.workers > 1:
+            yield from self._iter_parallel(pages)
+            return
         for page in pages:
-            text = self._run_single(page)
-            results.append(OCRPage(page_number=page.page_number, source=page.source, text=text))
-        return results
-
-    def _run_single(self, page: "RenderedPage") -> str:
-        if self._paddle is not None:
-            try:  # pragma: no cover - heavy dependency
-                image_array = self._ensure_image(page.payload)
-                if image_array is not None:
-                    ocr_result = self._paddle.ocr(image_array, cls=True)
-                    return "\n".join(
-                        " ".join(token[1][0] for token in line if token)
-                        if isinstance(line, list)
-                        else ""
-                        for line in ocr_result
-                    ).strip()
-            except Exception:
-                pass
+            yield _ocr_page(page.page_number, page.source, page.dpi, self._run_single(page))
 
-        if pytesseract is not None and Image is not None and np is not None:
-            try:  # pragma: no cover - heavy dependency
-                image_array = self._ensure_image(page.payload)
-                if image_array is not None:
-                    return pytesseract.image_to_string(image_array, lang="por")
-            except Exception:
-                pass
+    def warm_up(self) -> None:
+        """Load the OCR model now instead of on the first scanned page.
+
+        With a process pool each worker holds its own engine. The pool only
+        spawns processes as tasks arrive, so one warm-up task per worker is
+        submitted and waited for; a worker that happens to take two leaves
+        another to load its model on its first scanned page.
+        """
+
+        if self.workers == 1:
+            self._paddle.get()
+            return
+        with self._pool_lock:
+            pool = self._get_pool()
+            self._pool_users[pool] = self._pool_users.get(pool, 0) + 1
+        try:
+            for future in [pool.submit(_warm_worker) for _ in range(self.workers)]:
+                future.result()
+        finally:
+            self._release(pool)
+
+    def status(self) -> Dict[str, str]:
+        """Report the state of each OCR engine in this process."""
+
+        if self.workers > 1:
+            paddle = "per-worker"
+        elif PaddleOCR is None:
+            paddle = "unavailable"
+        else:
+            paddle = self._paddle.state
+        tesseract_ready = pytesseract is not None and Image is not None and np is not None
+        tesseract = "loaded" if tesseract_ready else "unavailable"
+        return {"paddle": paddle, "tesseract": tesseract}
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Report calls, errors, latency and availability per engine in this process."""
+
+        return self.router.snapshot()
+
+    def close(self) -> None:
+        """Shut down the worker pool, if one was started."""
+
+        with self._pool_lock:
+            pools = [pool for pool in (self._pool, *self._pool_users) if pool is not None]
+            self._pool = None
+            self._pool_users.clear()
+            self._pool_tasks = 0
+        for pool in dict.fromkeys(pools):
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_parallel(self, pages: Iterable["RenderedPage"]) -> Iterator[OCRPage]:
+        # Only the page number, source and DPI are kept while a page is in
+        # flight; the payload is dropped as soon as it has been sent to a worker.
+        window: Deque[Tuple[int, str, Optional[int], "Future[_Outcome]", ProcessPoolExecutor]] = deque()
+        try:
+            for page in pages:
+                future, pool = self._submit(page)
+                window.append((page.page_number, page.source, page.dpi, future, pool))
+                del page
+                if len(window) >= 2 * self.workers:
+                    yield self._collect(*window.popleft())
+            while window:
+                yield self._collect(*window.popleft())
+        finally:
+            while window:
+                _, _, _, future, pool = window.popleft()
+                future.cancel()
+                self._release(pool)
 
+    def _submit(self, page: "RenderedPage") -> Tuple["Future[_Outcome]", ProcessPoolExecutor]:
+        # Recycling is done here rather than through ``max_tasks_per_child``,
+        # which can deadlock the executor on Python 3.11 when a worker exits.
+        # A pool whose budget is spent is retired: new pages go to a fresh pool
+        # and the old one shuts down once its last page has been collected.
+        with self._pool_lock:
+            pool = self._get_pool()
+            self._pool_tasks += 1
+            self._pool_users[pool] = self._pool_users.get(pool, 0) + 1
+            if self.max_tasks_per_worker and self._pool_tasks >= self.workers * self.max_tasks_per_worker:
+                self._pool = None
         try:
-            return page.payload.decode("utf-8")
-        except UnicodeDecodeError:
-            return page.payload.decode("latin-1", errors="ignore")
+            return pool.submit(_ocr_in_worker, page), pool
+        except BaseException:
+            self._release(pool)
+            raise
 
-    def _ensure_image(self, payload: bytes):  # pragma: no cover - heavy dependency
-        if np is None or Image is None:
+    def _collect(
+        self,
+        page_number: int,
+        source: str,
+        dpi: Optional[int],
+        future: "Future[_Outcome]",
+        pool: ProcessPoolExecutor,
+    ) -> OCRPage:
+        try:
+            outcome = future.result()
+        finally:
+            self._release(pool)
+        return _ocr_page(page_number, source, dpi, outcome)
+
+    def _release(self, pool: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            users = self._pool_users.get(pool)
+            if users is None:  # already shut down by close()
+                return
+            self._pool_users[pool] = users - 1
+            retired = users == 1 and pool is not self._pool
+            if retired:
+                del self._pool_users[pool]
+        if retired:
+            pool.shutdown(wait=False)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+            self._pool_tasks = 0
+        return self._pool
+
+    def _run_single(self, page: "RenderedPage") -> _Outcome:
+        """Return the page text, the engine that produced it and its mean confidence."""
+
+        if page.error:
+            return "", ENGINE_FAILED, None, None
+
+        # Text-layer pages are not images: skip the engines (and loading them).
+        image_array = self._ensure_image(page)
+        if image_array is None:
+            try:
+                return page.payload.decode("utf-8"), "raw", None, None
+            except UnicodeDecodeError:
+                return page.payload.decode("latin-1", errors="ignore"), "raw", None, None
+
+        route = self.router.classify(image_array)
+        if route == ROUTE_BLANK:
+            return "", "blank", None, None
+        for name in self.router.order(route, self._available_engines()):
+            started = time.perf_counter()
+            try:
+                outcome = self._engines[name](image_array)
+            except Exception:
+                self.router.record(name, time.perf_counter() - started, ok=False)
+                continue
+            self.router.record(name, time.perf_counter() - started, ok=True)
+            return outcome
+        return "", ENGINE_FAILED, None, None
+
+    def _available_engines(self) -> List[str]:
+        engines = []
+        if PaddleOCR is not None and self._paddle.state != MODEL_UNAVAILABLE:
+            engines.append("paddle")
+        if pytesseract is not None:
+            engines.append("tesseract")
+        return engines
+
+    def _ocr_paddle(self, image_array) -> _Outcome:  # pragma: no cover - heavy dependency
+        paddle = self._paddle.get()
+        if paddle is None:
+            raise RuntimeError("PaddleOCR could not be loaded")
+        with self._paddle_lock:
+            ocr_result = paddle.ocr(_as_rgb(image_array), cls=True)
+        lines = [line if isinstance(line, list) else [] for line in ocr_result or []]
+        text = "\n".join(" ".join(token[1][0] for token in line if token) for line in lines).strip()
+        tokens = [_paddle_token(token) for line in lines for token in line if token]
+        return text, "paddle", _mean([token.confidence for token in tokens]), tokens
+
+    def _ensure_image(self, page: "RenderedPage"):
+        """Return the page pixels, decoding ``payload`` only when no raster was handed over."""
+
+        if page.image is not None:
+            return page.image
+        if np is None or Image is None:  # pragma: no cover - optional dependency
             return None
         try:
             from io import BytesIO
 
-            with Image.open(BytesIO(payload)) as img:
+            with Image.open(BytesIO(page.payload)) as img:
                 return np.array(img.convert("RGB"))
         except Exception:
             return None
 
 
-__all__ = ["OCREngine", "OCRPage"]
+def _ocr_page(page_number: int, source: str, dpi: Optional[int], outcome: _Outcome) -> OCRPage:
+    text, engine, confidence, tokens = outcome
+    return OCRPage(
+        page_number=page_number,
+        source=source,
+        text=text,
+        engine=engine,
+        confidence=confidence,
+        dpi=dpi,
+        tokens=tokens,
+    )
+
+
+def _paddle_token(token) -> OCRToken:  # pragma: no cover - heavy dependency
+    # ``[[corner, corner, corner, corner], (text, score)]``
+    box, (text, score) = token
+    xs = [float(point[0]) for point in box]
+    ys = [float(point[1]) for point in box]
+    return OCRToken(text=text, x0=min(xs), y0=min(ys), x1=max(xs), y1=max(ys), confidence=float(score))
+
+
+def _mean(scores: List[float]) -> Optional[float]:
+    return sum(scores) / len(scores) if scores else None
+
+
+def _tesseract(image_array) -> _Outcome:  # pragma: no cover - heavy dependency
+    # ``image_to_data`` yields the words with their confidences (0-100, -1 for
+    # non-words); lines are rebuilt from the block/paragraph/line numbers.
+    data = pytesseract.image_to_data(image_array, lang="por", output_type=pytesseract.Output.DICT)
+    lines: Dict[Tuple[int, int, int], List[str]] = {}
+    tokens: List[OCRToken] = []
+    for index, word in enumerate(data["text"]):
+        confidence = float(data["conf"][index])
+        if not word.strip() or confidence < 0:
+            continue
+        key = (data["block_num"][index], data["par_num"][index], data["line_num"][index])
+        lines.setdefault(key, []).append(word)
+        left, top = float(data["left"][index]), float(data["top"][index])
+        tokens.append(
+            OCRToken(
+                text=word,
+                x0=left,
+                y0=top,
+                x1=left + float(data["width"][index]),
+                y1=top + float(data["height"][index]),
+                confidence=confidence / 100.0,
+            )
+        )
+    text = "\n".join(" ".join(words) for words in lines.values())
+    return text, "tesseract", _mean([token.confidence for token in tokens]), tokens
+
+
+def _as_rgb(image_array):  # pragma: no cover - heavy dependency
+    # PaddleOCR expects three channels; grayscale rasters are expanded here.
+    if getattr(image_array, "ndim", 3) == 2:
+        return np.stack([image_array] * 3, axis=-1)
+    return image_array
+
+
+def _load_paddle() -> Optional[PaddleOCR]:
+    if PaddleOCR is None:
+        return None
+    return PaddleOCR(use_angle_cls=True, lang="pt")  # pragma: no cover - heavy dependency
+
+
+_WORKER_ENGINE: Optional[OCREngine] = None
+
+
+def _init_worker() -> None:
+    global _WORKER_ENGINE
+    _WORKER_ENGINE = OCREngine()
+
+
+def _warm_worker() -> None:
+    if _WORKER_ENGINE is None:  # pragma: no cover - initializer always runs first
+        _init_worker()
+    _WORKER_ENGINE.warm_up()
+
+
+def _ocr_in_worker(page: "RenderedPage") -> _Outcome:
+    if _WORKER_ENGINE is None:  # pragma: no cover - initializer always runs first
+        _init_worker()
+    return _WORKER_ENGINE._run_single(page)
+
+
+__all__ = ["ENGINE_FAILED", "OCREngine", "OCRPage", "OCRToken"]
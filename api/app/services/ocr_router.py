@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+try:  # pragma: no cover - optional dependency
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+
+# Page classes, from cheapest to most demanding.
+ROUTE_BLANK = "blank"
+ROUTE_SPARSE = "sparse"
+ROUTE_DENSE = "dense"
+
+
+@dataclass
+class EngineHealth:
+    calls: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+    # Exponentially weighted average of successful call durations, in seconds.
+    latency: Optional[float] = None
+    open_until: float = 0.0
+
+
+class OCRRouter:
+    """Pick the OCR engine for each raster page and track engine health.
+
+    Pages are classified from a subsample of their pixels: ``blank`` pages
+    (almost no ink) are not OCR'd at all, ``sparse`` pages go to the fastest
+    healthy engine and ``dense`` pages to the preferred (most accurate) one.
+    An engine that fails ``max_failures`` times in a row is skipped for
+    ``cooldown`` seconds, after which a single page is let through to probe it.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_failures: int = 3,
+        cooldown: float = 60.0,
+        blank_density: float = 0.0005,
+        sparse_density: float = 0.02,
+        sample_pixels: int = 250_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.blank_density = blank_density
+        self.sparse_density = sparse_density
+        self.sample_pixels = sample_pixels
+        self._clock = clock
+        self._health: Dict[str, EngineHealth] = {}
+        self._lock = threading.Lock()
+
+    def classify(self, image: Any) -> str:
+        """Classify a ``uint8`` grayscale or RGB raster by its share of dark pixels."""
+
+        if np is None or getattr(image, "ndim", 0) not in (2, 3) or not image.size:
+            return ROUTE_DENSE
+        height, width = image.shape[:2]
+        # Stride so that roughly ``sample_pixels`` pixels are inspected.
+        stride = max(1, int((height * width / self.sample_pixels) ** 0.5))
+        sample = image[::stride, ::stride]
+        if sample.ndim == 3:
+            sample = sample.min(axis=2)
+        density = float((sample < 128).mean())
+        if density < self.blank_density:
+            return ROUTE_BLANK
+        if density < self.sparse_density:
+            return ROUTE_SPARSE
+        return ROUTE_DENSE
+
+    def order(self, route: str, engines: Sequence[str]) -> List[str]:
+        """Return the healthy engines to try for ``route``, in order.
+
+        ``engines`` lists the available engines by preference.
+        """
+
+        now = self._clock()
+        with self._lock:
+            healthy = [engine for engine in engines if self._admit(engine, now)]
+            if route == ROUTE_SPARSE:
+                # Unmeasured engines sort first so every engine gets timed.
+                healthy.sort(key=lambda engine: self._health.get(engine, EngineHealth()).latency or 0.0)
+        return healthy
+
+    def record(self, engine: str, seconds: float, *, ok: bool) -> None:
+        with self._lock:
+            health = self._health.setdefault(engine, EngineHealth())
+            health.calls += 1
+            if ok:
+                health.consecutive_failures = 0
+                health.open_until = 0.0
+                health.latency = seconds if health.latency is None else 0.8 * health.latency + 0.2 * seconds
+                return
+            health.errors += 1
+            health.consecutive_failures += 1
+            if health.consecutive_failures >= self.max_failures:
+                health.open_until = self._clock() + self.cooldown
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return calls, errors, latency and circuit state per engine."""
+
+        now = self._clock()
+        with self._lock:
+            return {
+                engine: {
+                    "calls": health.calls,
+                    "errors": health.errors,
+                    "latency_seconds": health.latency,
+                    "available": health.open_until <= now,
+                }
+                for engine, health in sorted(self._health.items())
+            }
+
+    def _admit(self, engine: str, now: float) -> bool:
+        health = self._health.get(engine)
+        if health is None or health.consecutive_failures < self.max_failures:
+            return True
+        if now < health.open_until:
+            return False
+        # Cooldown over: let one page probe the engine and re-arm the breaker
+        # so concurrent pages do not pile onto it before it has answered.
+        health.open_until = now + self.cooldown
+        return True
+
+
+__all__ = ["EngineHealth", "OCRRouter", "ROUTE_BLANK", "ROUTE_DENSE", "ROUTE_SPARSE"]
@@ -1,44 +1,337 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import hashlib
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from ..schemas.csv_contract import CandidateRow
+from ..schemas.csv_contract import CandidateRecord
+from .artifacts import STAGES, ArtifactStore, payload_digest
+from .cache import ResultCache
 from .extract import DataExtractor
 from .layout import LayoutAnalyzer
+from .metrics import MetricsRegistry
 from .normalize import DataNormalizer
-from .ocr import OCREngine
-from .render import DocumentRenderer
-from .segment import AnchorDetector
-from .validate import DataValidator
+from .ocr import ENGINE_FAILED, OCREngine, OCRPage
+from .render import DocumentRenderer, Payload
+from .segment import AnchorDetector, KeywordDictionary
+from .validate import RULE_PAGE, DataValidator, ValidationError, ValidationReport, Violation
+
+
+VALIDATION_STRICT = "strict"
+VALIDATION_LENIENT = "lenient"
+
+# Bump whenever a stage changes its output for the same input, so cached
+# results from older builds are not served.
+PIPELINE_VERSION = "3"
 
 
 class ExtractionPipeline:
-    """Coordinate the hybrid extraction pipeline."""
+    """Coordinate the hybrid extraction pipeline.
+
+    Pages without a text layer are rasterized at ``raster_dpi``. With
+    ``refine_dpi`` set, rasters whose mean OCR confidence is below
+    ``refine_below`` are rendered again at that resolution and re-OCR'd; the
+    more confident result is kept.
 
-    def __init__(self) -> None:
-        self.renderer = DocumentRenderer()
-        self.ocr = OCREngine()
+    With ``validation="strict"`` a document breaking any rule is rejected
+    with a :class:`ValidationError` carrying the full report; ``"lenient"``
+    drops the offending rows and keeps the rest. A page that could not be
+    rendered or read counts as a ``page`` violation, so its missing rows
+    never go unnoticed in strict mode.
+
+    Documents are passed as ``bytes`` or as a read-only ``mmap`` of a spooled
+    upload (see :func:`~.uploads.spool_upload`), which must stay open until
+    the call returns.
+    """
+
+    def __init__(
+        self,
+        *,
+        ocr_workers: int = 1,
+        render_workers: int = 1,
+        ocr_max_tasks_per_worker: Optional[int] = 50,
+        cache: Optional[ResultCache] = None,
+        artifacts: Optional[ArtifactStore] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        raster_dpi: int = 200,
+        refine_dpi: Optional[int] = None,
+        refine_below: float = 0.8,
+        anchor_keywords: Optional[KeywordDictionary] = None,
+        validation: str = VALIDATION_STRICT,
+    ) -> None:
+        if validation not in (VALIDATION_STRICT, VALIDATION_LENIENT):
+            raise ValueError(f"Unknown validation mode '{validation}'. Expected 'strict' or 'lenient'")
+        self.cache = cache
+        self.artifacts = artifacts
+        self.metrics = metrics or MetricsRegistry()
+        self._describe_metrics()
+        self.refine_dpi = refine_dpi
+        self.refine_below = refine_below
+        self.renderer = DocumentRenderer(workers=render_workers, dpi=raster_dpi)
+        self.ocr = OCREngine(workers=ocr_workers, max_tasks_per_worker=ocr_max_tasks_per_worker)
         self.layout = LayoutAnalyzer()
-        self.anchor_detector = AnchorDetector()
+        self.anchor_detector = AnchorDetector(anchor_keywords)
         self.extractor = DataExtractor()
         self.normalizer = DataNormalizer()
-        self.validator = DataValidator()
+        self.validator = DataValidator(strict=validation == VALIDATION_STRICT)
 
     def run(
         self,
-        payload: bytes,
+        payload: Payload,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> List[CandidateRecord]:
+        if self.cache is None:
+            return self._run(payload, filename=filename, content_type=content_type)
+
+        key = self.cache_key(payload, filename=filename, content_type=content_type)
+        return self.cache.get_or_compute(
+            key, lambda: self._run(payload, filename=filename, content_type=content_type)
+        )
+
+    def iter_run(
+        self,
+        payload: Payload,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Iterator[CandidateRecord]:
+        """Stream rows page by page instead of materialising every stage.
+
+        Each page is rendered, OCR'd and dropped before later pages are
+        touched, so memory depends on the pages in flight rather than on the
+        document size. Rows are yielded as soon as they pass the per-row
+        rules; NUM_ORDEM sequences are checked at the end, so a
+        :class:`ValidationError` can still be raised after rows were yielded.
+        The result cache and artifact store are not used in this mode.
+        """
+
+        report = ValidationReport()
+        pages = self.renderer.iter_render(payload, filename=filename, content_type=content_type)
+        ocr_pages = self._count_ocr(self._refine(self.ocr.iter_run(pages), payload, filename))
+        layout_pages = self.layout.iter_analyze(self._check_pages(ocr_pages, report))
+        segments = self.anchor_detector.iter_locate(layout_pages)
+        raw = self.extractor.iter_extract(segments)
+        rows = self.normalizer.iter_normalize(raw)
+
+        count = 0
+        try:
+            for row in self.validator.iter_validate(rows, report=report):
+                count += 1
+                yield row
+        except ValidationError:
+            self.metrics.inc("cne_validation_failures_total")
+            raise
+        finally:
+            self._record_violations(report)
+        self.metrics.inc("cne_rows_total", count)
+
+    def cache_key(
+        self,
+        payload: Payload,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> str:
+        """Key results by payload, rendering and DPIs, pipeline version, anchors and validation mode."""
+
+        digest = hashlib.sha256()
+        digest.update(f"v{PIPELINE_VERSION};".encode("ascii"))
+        digest.update(b"strict;" if self.validator.strict else b"lenient;")
+        digest.update(f"anchors={self.anchor_detector.fingerprint()};".encode("ascii"))
+        digest.update(b"pdf;" if self.renderer.is_pdf(filename, content_type) else b"raw;")
+        refine = f"dpi={self.renderer.dpi};refine={self.refine_dpi}<{self.refine_below};"
+        digest.update(refine.encode("ascii"))
+        digest.update(payload)
+        return digest.hexdigest()
+
+    def _run(
+        self,
+        payload: Payload,
         *,
         filename: Optional[str] = None,
         content_type: Optional[str] = None,
-    ) -> List[CandidateRow]:
-        rendered = self.renderer.render(payload, filename=filename, content_type=content_type)
-        ocr_pages = self.ocr.run(rendered)
-        layout_pages = self.layout.analyze(ocr_pages)
-        segments = self.anchor_detector.locate(layout_pages)
-        raw_candidates = self.extractor.extract(segments)
-        normalised_rows = self.normalizer.normalize(raw_candidates)
-        self.validator.validate(normalised_rows)
+    ) -> List[CandidateRecord]:
+        digest = payload_digest(payload) if self.artifacts is not None else None
+        with self.metrics.time("cne_document_duration_seconds"):
+            with self.metrics.time("cne_stage_duration_seconds", stage="render"):
+                rendered = self.renderer.render(payload, filename=filename, content_type=content_type)
+            self._checkpoint(digest, "render", rendered)
+            return self._run_from("render", rendered, digest, source=(payload, filename))
+
+    def replay(self, digest: str, *, checkpoint: str = "ocr") -> List[CandidateRecord]:
+        """Re-run the stages after ``checkpoint`` from stored artifacts.
+
+        Replaying from ``"ocr"`` re-does layout analysis, anchor detection,
+        extraction, normalisation and validation without touching OCR.
+        Artifacts of the re-run stages are overwritten with the new output.
+        """
+
+        if self.artifacts is None:
+            raise RuntimeError("Replay requires the pipeline to be configured with an ArtifactStore")
+        data = self.artifacts.load(digest, checkpoint)
+        return self._run_from(checkpoint, data, digest)
+
+    def _stages(self) -> List[Tuple[str, Callable[[Any], Any]]]:
+        return [
+            ("ocr", self.ocr.run),
+            ("layout", self.layout.analyze),
+            ("segment", self.anchor_detector.locate),
+            ("extract", self.extractor.extract),
+        ]
+
+    def _run_from(
+        self,
+        checkpoint: str,
+        data: Any,
+        digest: Optional[str],
+        *,
+        source: Optional[Tuple[Payload, Optional[str]]] = None,
+    ) -> List[CandidateRecord]:
+        # ``source`` is the original payload and filename, needed to re-render
+        # low-confidence pages; replays from stored artifacts do not refine.
+        completed = STAGES.index(checkpoint)
+        pages_report = ValidationReport()
+        try:
+            for name, stage in self._stages():
+                if STAGES.index(name) <= completed:
+                    continue
+                with self.metrics.time("cne_stage_duration_seconds", stage=name):
+                    data = stage(data)
+                    if name == "ocr" and source is not None:
+                        data = list(self._refine(data, *source))
+                self._checkpoint(digest, name, data)
+                if name == "ocr":
+                    self._record_ocr(data)
+                    data = list(self._check_pages(data, pages_report))
+
+            with self.metrics.time("cne_stage_duration_seconds", stage="normalize"):
+                normalised_rows = self.normalizer.normalize(data)
+            with self.metrics.time("cne_stage_duration_seconds", stage="validate"):
+                report = self.validator.validate(normalised_rows)
+        except ValidationError as exc:
+            self._record_violations(exc.report)
+            self.metrics.inc("cne_validation_failures_total")
+            raise
+        report.violations[:0] = pages_report.violations
+        self._record_violations(report)
+        if not report.ok:
+            invalid = report.invalid_rows()
+            normalised_rows = [
+                row for position, row in enumerate(normalised_rows, start=1) if position not in invalid
+            ]
+        self.metrics.inc("cne_rows_total", len(normalised_rows))
         return normalised_rows
 
+    def _refine(
+        self, pages: Iterable[OCRPage], payload: Payload, filename: Optional[str]
+    ) -> Iterator[OCRPage]:
+        # One PDF handle for the whole document, opened for the first page that needs it.
+        with self.renderer.open_pages(payload, filename=filename, dpi=self.refine_dpi) as render_page:
+            for page in pages:
+                if (
+                    self.refine_dpi
+                    and page.dpi is not None
+                    and page.dpi < self.refine_dpi
+                    and page.confidence is not None
+                    and page.confidence < self.refine_below
+                ):
+                    rendered = render_page(page.page_number)
+                    if not rendered.error:
+                        self.metrics.inc("cne_ocr_refined_pages_total")
+                        refined = self.ocr.run([rendered])[0]
+                        if refined.confidence is not None and refined.confidence >= page.confidence:
+                            page = refined
+                yield page
+
+    def _check_pages(self, pages: Iterable[OCRPage], report: ValidationReport) -> Iterator[OCRPage]:
+        """Report pages that could not be rendered or read; strict mode rejects the document."""
+
+        for page in pages:
+            if page.engine == ENGINE_FAILED:
+                report.violations.append(
+                    Violation(
+                        RULE_PAGE,
+                        f"Página {page.page_number} não foi lida ({page.source})",
+                        page_number=page.page_number,
+                    )
+                )
+                if self.validator.strict:
+                    raise ValidationError(report.summary(), report)
+            yield page
+
+    def _count_ocr(self, pages: Iterable[OCRPage]) -> Iterator[OCRPage]:
+        for page in pages:
+            self._record_ocr([page])
+            yield page
+
+    def _record_ocr(self, pages: List[OCRPage]) -> None:
+        self.metrics.inc("cne_pages_total", len(pages))
+        for page in pages:
+            self.metrics.inc("cne_ocr_pages_total", engine=page.engine or "unknown")
+            if page.dpi is not None:
+                self.metrics.inc("cne_raster_pages_total", dpi=str(page.dpi))
+            if page.confidence is not None:
+                self.metrics.observe("cne_ocr_confidence", page.confidence, engine=page.engine)
+
+    def _record_violations(self, report: Optional[ValidationReport]) -> None:
+        for violation in report.violations if report is not None else ():
+            self.metrics.inc("cne_validation_violations_total", rule=violation.rule)
+
+    def _describe_metrics(self) -> None:
+        self.metrics.histogram(
+            "cne_stage_duration_seconds",
+            "Time spent in each pipeline stage (render, ocr, layout, segment, extract, normalize, validate).",
+        )
+        self.metrics.histogram(
+            "cne_document_duration_seconds", "End-to-end pipeline time per document."
+        )
+        self.metrics.counter("cne_pages_total", "Pages processed by OCR.")
+        self.metrics.counter(
+            "cne_ocr_pages_total", "Pages processed per OCR engine (paddle, tesseract, raw, blank, failed)."
+        )
+        self.metrics.counter("cne_raster_pages_total", "OCR'd raster pages per final rasterization DPI.")
+        self.metrics.counter("cne_ocr_refined_pages_total", "Low-confidence pages re-rendered at refine_dpi.")
+        self.metrics.histogram(
+            "cne_ocr_confidence",
+            "Mean OCR token confidence per page (0-1).",
+            buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99, 1.0),
+        )
+        self.metrics.counter("cne_rows_total", "Candidate rows that passed validation.")
+        self.metrics.counter("cne_validation_failures_total", "Documents rejected by DataValidator.")
+        self.metrics.counter(
+            "cne_validation_violations_total",
+            "Validation rule violations found (domain, conditional, sequence, page).",
+        )
+
+    def _checkpoint(self, digest: Optional[str], stage: str, data: Any) -> None:
+        if self.artifacts is not None and digest is not None:
+            if stage == "render":
+                # Rasters travel to OCR as pixel arrays; only stored pages are PNG-encoded.
+                data = [page.encode_png() for page in data]
+            self.artifacts.save(digest, stage, data)
+
+    def warm_up(self) -> None:
+        """Load the OCR and NER models ahead of the first document that needs them."""
+
+        self.ocr.warm_up()
+        self.extractor.warm_up()
+
+    def status(self) -> Dict[str, str]:
+        """Report the load state of every model used by the pipeline."""
+
+        return {**self.ocr.status(), **self.extractor.status()}
+
+    def close(self) -> None:
+        """Release worker pools held by the pipeline stages."""
+
+        self.renderer.close()
+        self.ocr.close()
+
 
-__all__ = ["ExtractionPipeline"]
+__all__ = [
+    "ExtractionPipeline",
+    "PIPELINE_VERSION",
+    "VALIDATION_LENIENT",
+    "VALIDATION_STRICT",
+]
@@ -1,103 +1,417 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import io
+import mmap
+import multiprocessing
+import os
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, replace
 from io import BytesIO
-from typing import Iterable, List, Optional
-
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple, Union
 
 try:  # pragma: no cover - optional dependency
     import pdfplumber  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
     pdfplumber = None
 
+try:  # pragma: no cover - optional dependency
+    import numpy as np  # type: ignore
+    from PIL import Image  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    np = None
+    Image = None
+
+# A document as handed to the pipeline: bytes, or a read-only map of a file.
+Payload = Union[bytes, mmap.mmap]
+
+RASTER_ARRAY = "array"
+RASTER_PNG = "png"
+
 
 @dataclass
 class RenderedPage:
-    """Representation of a rendered page ready for OCR."""
+    """Representation of a rendered page ready for OCR.
+
+    Scanned pages carry their pixels in ``image`` (a grayscale or RGB
+    ``uint8`` numpy array) with an empty ``payload``; text pages and PNG
+    rasters use ``payload``. ``error`` is set (and both left empty) when the
+    page could not be rendered; the rest of the document is still returned.
+    """
 
     page_number: int
     payload: bytes
     source: str
+    error: Optional[str] = None
+    image: Any = None
+    # Resolution of the raster; ``None`` for text pages.
+    dpi: Optional[int] = None
+
+    def encode_png(self) -> "RenderedPage":
+        """Return the page with its pixels PNG-encoded into ``payload``, for persistence."""
+
+        if self.image is None or Image is None:
+            return self
+        buffer = BytesIO()
+        Image.fromarray(self.image).save(buffer, format="PNG")
+        return replace(self, payload=buffer.getvalue(), image=None)
 
 
 class DocumentRenderer:
-    """Render arbitrary document payloads into OCR-friendly pages."""
+    """Render arbitrary document payloads into OCR-friendly pages.
+
+    With ``workers > 1`` PDF pages are rendered in a process pool: the payload
+    is written once to a temporary file and each task opens its own
+    pdfplumber handle on a range of ``pages_per_task`` pages. Pages are
+    always returned in document order.
+
+    ``payload`` may be ``bytes`` or a read-only ``mmap`` of the uploaded file;
+    pdfplumber then reads the pages it needs straight from the map instead of
+    from an in-memory copy of the document.
+
+    Rasters are handed to OCR as pixel arrays (``raster_format="array"``),
+    converted to grayscale when ``grayscale`` is set; ``"png"`` keeps the
+    encoded bytes in ``payload`` instead. Pages without a text layer are
+    rasterized at ``dpi``; :meth:`open_pages` re-renders chosen pages at
+    another resolution.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        pages_per_task: int = 4,
+        raster_format: str = RASTER_ARRAY,
+        grayscale: bool = False,
+        dpi: int = 200,
+    ) -> None:
+        if raster_format not in (RASTER_ARRAY, RASTER_PNG):
+            raise ValueError(f"Unknown raster format '{raster_format}'. Expected 'array' or 'png'")
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.raster_format = raster_format
+        self.grayscale = grayscale
+        self.dpi = dpi
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
 
     def render(
         self,
-        payload: bytes,
+        payload: Payload,
         *,
         filename: Optional[str] = None,
         content_type: Optional[str] = None,
     ) -> List[RenderedPage]:
+        return list(self.iter_render(payload, filename=filename, content_type=content_type))
+
+    def iter_render(
+        self,
+        payload: Payload,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> Iterator[RenderedPage]:
+        """Yield pages one at a time, rasterizing each only when it is requested."""
+
         if not payload:
-            return []
+            return
+
+        if self.is_pdf(filename, content_type):
+            source = filename or "<uploaded>"
+            if self.workers > 1:
+                pages = self._iter_pdf_parallel(payload, source)
+            else:
+                pages = self._iter_pdf(payload, source)
+            rendered = False
+            for page in pages:
+                rendered = True
+                yield page
+            if rendered:
+                return
+
+        yield RenderedPage(page_number=1, payload=bytes(payload), source=filename or "<uploaded>")
+
+    def render_page(
+        self,
+        payload: Payload,
+        page_number: int,
+        *,
+        filename: Optional[str] = None,
+        dpi: Optional[int] = None,
+    ) -> RenderedPage:
+        """Rasterize one PDF page (1-based), ignoring its text layer."""
 
-        if self._is_pdf(filename, content_type):
-            pages = self._render_pdf(payload, source=filename or "<uploaded>")
-            if pages:
-                return pages
+        with self.open_pages(payload, filename=filename, dpi=dpi) as render_page:
+            return render_page(page_number)
 
-        return [RenderedPage(page_number=1, payload=payload, source=filename or "<uploaded>")]
+    @contextmanager
+    def open_pages(
+        self,
+        payload: Payload,
+        *,
+        filename: Optional[str] = None,
+        dpi: Optional[int] = None,
+    ) -> Iterator[Callable[[int], RenderedPage]]:
+        """Yield a function rasterizing PDF pages (1-based) of ``payload``, ignoring their text layer.
+
+        The document is parsed once, on the first call, and kept open until
+        the ``with`` block exits, so re-rendering many pages of a long scan
+        costs a single parse.
+        """
+
+        source = filename or "<uploaded>"
+        raster = self._raster_options(dpi)
+        with ExitStack() as stack:
+            opened: List[Any] = []
+
+            def render_page(page_number: int) -> RenderedPage:
+                if not opened:
+                    _require_pdfplumber()
+                    opened.append(stack.enter_context(pdfplumber.open(_PayloadReader(payload))))
+                page = opened[0].pages[page_number - 1]
+                return _render_page(page, page_number, source, raster, use_text=False)
+
+            yield render_page
+
+    def count_pages(
+        self,
+        payload: Payload,
+        *,
+        filename: Optional[str] = None,
+        content_type: Optional[str] = None,
+    ) -> int:
+        """Return how many pages :meth:`iter_render` would yield, without rendering them."""
 
-    def _is_pdf(self, filename: Optional[str], content_type: Optional[str]) -> bool:
+        if not payload:
+            return 0
+        if pdfplumber is None or not self.is_pdf(filename, content_type):
+            return 1
+        try:
+            with pdfplumber.open(_PayloadReader(payload)) as pdf:  # pragma: no cover - heavy dependency
+                return len(pdf.pages) or 1
+        except Exception:
+            return 1
+
+    def is_pdf(self, filename: Optional[str], content_type: Optional[str]) -> bool:
         if content_type and "pdf" in content_type:
             return True
         if filename and filename.lower().endswith(".pdf"):
             return True
         return False
 
-    def _render_pdf(self, payload: bytes, *, source: str) -> List[RenderedPage]:
-        if pdfplumber is None:
-            raise RuntimeError(
-                "pdfplumber is required to render PDF documents. Install the optional "
-                "dependency or provide a non-PDF payload."
-            )
+    def close(self) -> None:
+        """Shut down the render pool, if one was started."""
+
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
 
-        pages: List[RenderedPage] = []
-        with pdfplumber.open(BytesIO(payload)) as pdf:  # pragma: no cover - heavy dependency
+    def _iter_pdf(self, payload: Payload, source: str) -> Iterator[RenderedPage]:
+        _require_pdfplumber()
+        with pdfplumber.open(_PayloadReader(payload)) as pdf:  # pragma: no cover - heavy dependency
             for index, page in enumerate(pdf.pages, start=1):
-                try:
-                    text = page.extract_text()
-                except Exception:  # pragma: no cover - defensive path
-                    text = None
-
-                if isinstance(text, str) and text.strip():
-                    payload_bytes = text.encode("utf-8")
-                else:
-                    payload_bytes = self._rasterize_page(
-                        page, page_number=index, source=source
-                    )
-
-                pages.append(
-                    RenderedPage(
-                        page_number=index,
-                        payload=payload_bytes,
-                        source=f"{source}#page={index}",
-                    )
+                yield _render_page(page, index, source, self._raster_options())
+
+    def _iter_pdf_parallel(self, payload: Payload, source: str) -> Iterator[RenderedPage]:
+        _require_pdfplumber()
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            with pdfplumber.open(path) as pdf:
+                count = len(pdf.pages)
+
+            step = self.pages_per_task
+            ranges = [(start, min(start + step, count)) for start in range(0, count, step)]
+            pool = self._get_pool()
+            # Bound the finished-but-unconsumed rasters to two ranges per worker.
+            window: Deque[Tuple[Tuple[int, int], "Future[List[RenderedPage]]"]] = deque()
+            try:
+                raster = self._raster_options()
+                for page_range in ranges:
+                    window.append((page_range, pool.submit(_render_range, path, source, *page_range, raster)))
+                    if len(window) >= 2 * self.workers:
+                        yield from _collect_range(source, *window.popleft())
+                while window:
+                    yield from _collect_range(source, *window.popleft())
+            finally:
+                for _, future in window:
+                    future.cancel()
+        finally:
+            # Workers may still hold the file if the consumer stopped early;
+            # on POSIX unlinking an open file is fine.
+            os.unlink(path)
+
+    def _raster_options(self, dpi: Optional[int] = None) -> Tuple[str, bool, int]:
+        return self.raster_format, self.grayscale, dpi or self.dpi
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
                 )
-        return pages
-
-    def _rasterize_page(self, page: "pdfplumber.page.Page", *, page_number: int, source: str) -> bytes:
-        try:  # pragma: no cover - relies on pillow/pdfplumber internals
-            page_image = page.to_image(resolution=200)
-            image = getattr(page_image, "original", None)
-            if image is None:
-                raise AttributeError("PageImage missing original image")
-            buffer = BytesIO()
-            image.save(buffer, format="PNG")
-            data = buffer.getvalue()
-        except Exception as exc:  # pragma: no cover - defensive path
-            raise RuntimeError(
-                f"Unable to rasterize PDF page {page_number} from {source}: {exc}"
-            ) from exc
-
-        if not data:
-            raise RuntimeError(
-                f"Rasterization produced empty payload for page {page_number} from {source}"
-            )
+            return self._pool
+
+
+class _PayloadReader(io.RawIOBase):
+    """Seekable read-only stream over a payload, with its own position.
+
+    Reads slice the payload, so an ``mmap`` is paged in from disk on demand
+    and never exported as a buffer (which would keep it from being closed).
+    Several readers can share one payload, e.g. while a page is re-rendered.
+    """
 
+    def __init__(self, payload: Payload) -> None:
+        super().__init__()
+        self._payload = payload
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._payload)
+        self._position = max(0, offset)
+        return self._position
+
+    def read(self, size: Optional[int] = -1) -> bytes:
+        end = len(self._payload) if size is None or size < 0 else self._position + size
+        data = bytes(self._payload[self._position : end])
+        self._position += len(data)
         return data
 
+    def readall(self) -> bytes:
+        return self.read()
+
+    def readinto(self, buffer: Any) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _require_pdfplumber() -> None:
+    if pdfplumber is None:
+        raise RuntimeError(
+            "pdfplumber is required to render PDF documents. Install the optional "
+            "dependency or provide a non-PDF payload."
+        )
+
+
+def _render_range(
+    path: str, source: str, start: int, stop: int, raster: Tuple[str, bool, int]
+) -> List[RenderedPage]:
+    """Render pages ``start`` to ``stop`` (0-based, exclusive) in a worker process."""
+
+    with pdfplumber.open(path) as pdf:
+        return [_render_page(pdf.pages[index], index + 1, source, raster) for index in range(start, stop)]
+
+
+def _collect_range(
+    source: str, page_range: Tuple[int, int], future: "Future[List[RenderedPage]]"
+) -> Iterable[RenderedPage]:
+    try:
+        return future.result()
+    except Exception as exc:
+        # The whole task failed (e.g. the worker died): report each page.
+        start, stop = page_range
+        error = f"{type(exc).__name__}: {exc}"
+        return [_failed_page(index + 1, source, error) for index in range(start, stop)]
+
+
+def _render_page(
+    page: "pdfplumber.page.Page",
+    page_number: int,
+    source: str,
+    raster: Tuple[str, bool, int],
+    *,
+    use_text: bool = True,
+) -> RenderedPage:
+    text = None
+    if use_text:
+        try:
+            text = page.extract_text()
+        except Exception:  # pragma: no cover - defensive path
+            text = None
+
+    rendered = RenderedPage(page_number=page_number, payload=b"", source=f"{source}#page={page_number}")
+    try:
+        if isinstance(text, str) and text.strip():
+            rendered.payload = text.encode("utf-8")
+        else:
+            raster_format, grayscale, dpi = raster
+            image = _rasterize_page(page, page_number=page_number, source=source, dpi=dpi)
+            rendered.dpi = dpi
+            pixels = _pixels(image, grayscale) if raster_format == RASTER_ARRAY else None
+            if pixels is not None:
+                rendered.image = pixels
+            else:
+                rendered.payload = _encode_png(image, page_number=page_number, source=source)
+    except Exception as exc:
+        return _failed_page(page_number, source, str(exc))
+    return rendered
+
+
+def _failed_page(page_number: int, source: str, error: str) -> RenderedPage:
+    return RenderedPage(
+        page_number=page_number, payload=b"", source=f"{source}#page={page_number}", error=error
+    )
+
+
+def _rasterize_page(page: "pdfplumber.page.Page", *, page_number: int, source: str, dpi: int) -> Any:
+    try:  # pragma: no cover - relies on pillow/pdfplumber internals
+        page_image = page.to_image(resolution=dpi)
+        image = getattr(page_image, "original", None)
+        if image is None:
+            raise AttributeError("PageImage missing original image")
+    except Exception as exc:  # pragma: no cover - defensive path
+        raise RuntimeError(
+            f"Unable to rasterize PDF page {page_number} from {source}: {exc}"
+        ) from exc
+    return image
+
+
+def _pixels(image: Any, grayscale: bool) -> Any:
+    """Return the raster as a ``uint8`` array, or ``None`` if it is not a PIL image."""
+
+    if np is None or Image is None or not isinstance(image, Image.Image):
+        return None
+    wanted = "L" if grayscale else ("L" if image.mode in ("1", "L") else "RGB")
+    if image.mode != wanted:
+        image = image.convert(wanted)
+    return np.asarray(image)
+
+
+def _encode_png(image: Any, *, page_number: int, source: str) -> bytes:
+    try:  # pragma: no cover - relies on pillow internals
+        buffer = BytesIO()
+        image.save(buffer, format="PNG")
+        data = buffer.getvalue()
+    except Exception as exc:  # pragma: no cover - defensive path
+        raise RuntimeError(
+            f"Unable to rasterize PDF page {page_number} from {source}: {exc}"
+        ) from exc
+
+    if not data:
+        raise RuntimeError(
+            f"Rasterization produced empty payload for page {page_number} from {source}"
+        )
+
+    return data
+
 
-__all__ = ["DocumentRenderer", "RenderedPage"]
+__all__ = ["DocumentRenderer", "Payload", "RASTER_ARRAY", "RASTER_PNG", "RenderedPage"]
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
 from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-from .layout import LayoutPage, LayoutRow
+from .layout import CONTRACT_COLUMNS, LayoutPage, LayoutRow
 
 ANCHOR_KEYWORDS: Dict[str, List[str]] = {
     "EFETIVOS": ["candidatos efetivos", "efetivos"],
@@ -14,6 +22,91 @@ ANCHOR_KEYWORDS: Dict[str, List[str]] = {
 }
 
 
+def fold(text: str) -> str:
+    """Lowercase, strip accents and collapse whitespace (``"Câmara  X"`` -> ``"camara x"``)."""
+
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+class AnchorMatcher:
+    """Find section-header keywords in accent-folded text with one compiled regex.
+
+    Keywords are folded and merged into a trie-shaped pattern, so matching
+    cost barely grows with the number of keywords. The longest keyword wins
+    at a given position; across positions the anchor listed first wins.
+    """
+
+    def __init__(self, keywords: Mapping[str, Sequence[str]]) -> None:
+        self._anchors: Dict[str, str] = {}
+        self._priority: Dict[str, int] = {}
+        for priority, (anchor, words) in enumerate(keywords.items()):
+            self._priority[anchor] = priority
+            for word in words:
+                self._anchors.setdefault(fold(word), anchor)
+        words = [word for word in self._anchors if word]
+        self.fingerprint = hashlib.sha256(
+            json.dumps([list(keywords), sorted(self._anchors.items())], ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        self._pattern = re.compile(rf"(?<!\w)(?:{_trie_pattern(words)})(?!\w)") if words else None
+
+    def match(self, text: str) -> Optional[str]:
+        if self._pattern is None:
+            return None
+        found = {self._anchors[match.group()] for match in self._pattern.finditer(fold(text))}
+        return min(found, key=self._priority.__getitem__) if found else None
+
+
+class KeywordDictionary:
+    """Anchor keywords loaded from a JSON file of ``{"ANCHOR": ["keyword", ...]}``.
+
+    The file's modification time is checked at most every ``check_interval``
+    seconds and the matcher is recompiled when it changes, so keywords can be
+    edited without restarting the service. A file that fails to load on
+    reload leaves the previous keywords in place.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], *, check_interval: float = 1.0) -> None:
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._mtime, self._matcher = self._load()
+
+    def matcher(self) -> AnchorMatcher:
+        if time.monotonic() - self._checked >= self.check_interval:
+            with self._lock:
+                self._checked = time.monotonic()
+                try:
+                    changed = self.path.stat().st_mtime_ns != self._mtime
+                except OSError:
+                    changed = False
+                if changed:
+                    try:
+                        self._mtime, self._matcher = self._load()
+                    except (OSError, ValueError):
+                        pass
+        return self._matcher
+
+    def reload(self) -> AnchorMatcher:
+        """Load the file now, raising if it is missing or invalid."""
+
+        with self._lock:
+            self._mtime, self._matcher = self._load()
+            self._checked = time.monotonic()
+            return self._matcher
+
+    def _load(self) -> Tuple[int, AnchorMatcher]:
+        mtime = self.path.stat().st_mtime_ns
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if not isinstance(data, dict) or not all(
+            isinstance(words, list) and all(isinstance(word, str) for word in words) for words in data.values()
+        ):
+            raise ValueError(f"{self.path} must map anchor names to lists of keywords")
+        return mtime, AnchorMatcher(data)
+
+
 @dataclass
 class DocumentSegment:
     anchor: str
@@ -22,7 +115,20 @@ class DocumentSegment:
 
 
 class AnchorDetector:
-    """Detect anchor sections in the layout to contextualise extraction."""
+    """Detect anchor sections in the layout to contextualise extraction.
+
+    Only rows shorter than a full contract row can be section headers; data
+    rows that merely contain a keyword (``EFETIVOS`` in the TIPO column) are
+    never taken as anchors.
+    """
+
+    def __init__(self, keywords: Union[Mapping[str, Sequence[str]], KeywordDictionary, None] = None) -> None:
+        if isinstance(keywords, KeywordDictionary):
+            self._dictionary: Optional[KeywordDictionary] = keywords
+            self._matcher = keywords.matcher()
+        else:
+            self._dictionary = None
+            self._matcher = AnchorMatcher(ANCHOR_KEYWORDS if keywords is None else keywords)
 
     def locate(self, pages: Iterable[LayoutPage]) -> List[DocumentSegment]:
         segments: List[DocumentSegment] = []
@@ -44,12 +150,73 @@ class AnchorDetector:
 
         return segments
 
+    def iter_locate(self, pages: Iterable[LayoutPage]) -> Iterator[DocumentSegment]:
+        """Yield segments page by page.
+
+        A section that spans several pages is yielded once per page, each
+        piece carrying the anchor of the section it continues, so extraction
+        sees the same anchors as with :meth:`locate`.
+        """
+
+        anchor = "DESCONHECIDO"
+        for page in pages:
+            current: Optional[DocumentSegment] = None
+            for row in page.rows:
+                matched = self._match_anchor(row)
+                if matched is not None:
+                    if current is not None:
+                        yield current
+                    anchor = matched
+                    current = DocumentSegment(anchor=anchor, rows=[], page_numbers=[page.page_number])
+                    continue
+                if current is None:
+                    current = DocumentSegment(anchor=anchor, rows=[], page_numbers=[page.page_number])
+                current.rows.append(row)
+            if current is not None:
+                yield current
+
     def _match_anchor(self, row: LayoutRow) -> Optional[str]:
-        joined = " ".join(value.lower() for value in row.values)
-        for anchor, keywords in ANCHOR_KEYWORDS.items():
-            if any(keyword in joined for keyword in keywords):
-                return anchor
-        return None
+        if len(row.values) >= CONTRACT_COLUMNS:
+            return None
+        return self._current().match(" ".join(row.values))
+
+    def fingerprint(self) -> str:
+        """Identify the keywords in use, so results can be keyed on them."""
+
+        return self._current().fingerprint
+
+    def _current(self) -> AnchorMatcher:
+        return self._dictionary.matcher() if self._dictionary is not None else self._matcher
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex matching any of ``words``, factoring shared prefixes."""
+
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        # Optional suffixes are greedy, so the longest keyword is preferred.
+        return group + "?" if "" in node else group
+
+    return build(trie)
 
 
-__all__ = ["AnchorDetector", "DocumentSegment"]
+__all__ = [
+    "ANCHOR_KEYWORDS",
+    "AnchorDetector",
+    "AnchorMatcher",
+    "DocumentSegment",
+    "KeywordDictionary",
+    "fold",
+]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import io
+import mmap
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+from .render import Payload
+
+
+@contextmanager
+def spool_upload(
+    fileobj: BinaryIO, *, directory: Optional[str] = None, chunk_size: int = 1024 * 1024
+) -> Iterator[Payload]:
+    """Yield the content of ``fileobj`` as a read-only memory map.
+
+    Files with a descriptor (Starlette's spooled uploads roll over to disk
+    when asked for one) are mapped in place; anything else is first copied to
+    a temporary file in ``directory``, ``chunk_size`` bytes at a time. Pages
+    are read from disk by the OS as the pipeline touches them, so the upload
+    is never held in memory as a whole. The map is closed on exit.
+    """
+
+    try:
+        fileobj.flush()
+        fileno = fileobj.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        with tempfile.TemporaryFile(dir=directory) as handle:
+            fileobj.seek(0)
+            shutil.copyfileobj(fileobj, handle, chunk_size)
+            handle.flush()
+            with _map(handle.fileno()) as payload:
+                yield payload
+        return
+
+    with _map(fileno) as payload:
+        yield payload
+
+
+@contextmanager
+def _map(fileno: int) -> Iterator[Payload]:
+    try:
+        mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    except ValueError:
+        # Empty files cannot be mapped.
+        yield b""
+        return
+    with mapped:
+        yield mapped
+
+
+__all__ = ["spool_upload"]
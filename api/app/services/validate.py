@@ -1,66 +1,196 @@
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Iterable, List
+from dataclasses import asdict, dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from ..schemas.csv_contract import CandidateRow
+from ..schemas.csv_contract import ContractRow
 from .master_data import VALID_ORGAOS, VALID_TIPOS
 
+RULE_DOMAIN = "domain"
+RULE_CONDITIONAL = "conditional"
+RULE_SEQUENCE = "sequence"
+# A page that could not be rendered or read, so its rows are missing.
+RULE_PAGE = "page"
+
+# Rows sharing a NUM_ORDEM sequence: (DTMNFR, ORGAO, SIGLA, TIPO).
+GroupKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class Violation:
+    """One broken rule. ``row`` is 1-based; both are ``None`` for whole-group issues."""
+
+    rule: str
+    message: str
+    row: Optional[int] = None
+    page_number: Optional[int] = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class ValidationReport:
+    rows_checked: int = 0
+    violations: List[Violation] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.violations
+
+    def invalid_rows(self) -> Set[int]:
+        """Rows (1-based) with a violation of their own."""
+
+        return {violation.row for violation in self.violations if violation.row is not None}
+
+    def summary(self) -> str:
+        if not self.violations:
+            return "Sem violações"
+        first = self.violations[0].message
+        others = len(self.violations) - 1
+        return f"{first} (+{others} outras violações)" if others else first
+
+    def as_dict(self) -> dict:
+        return {
+            "rows_checked": self.rows_checked,
+            "violations": [violation.as_dict() for violation in self.violations],
+        }
+
 
 class ValidationError(Exception):
     """Raised when the extracted data violates hard business rules."""
 
+    def __init__(self, message: str, report: Optional[ValidationReport] = None) -> None:
+        super().__init__(message)
+        self.report = report
+
 
 class DataValidator:
-    """Apply hard validation rules to the normalised data."""
+    """Apply hard validation rules to the normalised data.
+
+    Domains, conditionals and NUM_ORDEM sequences are checked together in a
+    single pass and every violation is collected in a
+    :class:`ValidationReport`. In ``strict`` mode a report with violations is
+    raised as a :class:`ValidationError`; otherwise it is returned and the
+    caller decides what to keep.
+    """
 
-    def validate(self, rows: Iterable[CandidateRow]) -> None:
-        materialised: List[CandidateRow] = list(rows)
-        self._check_domains(materialised)
-        self._check_sequences(materialised)
-        self._check_conditionals(materialised)
+    def __init__(self, *, strict: bool = True) -> None:
+        self.strict = strict
 
-    def _check_domains(self, rows: List[CandidateRow]) -> None:
+    def validate(self, rows: Iterable[ContractRow]) -> ValidationReport:
+        checker = _Checker()
         for row in rows:
-            if row.ORGAO.upper() not in VALID_ORGAOS:
-                raise ValidationError(f"ORGAO inválido: {row.ORGAO}")
-            if row.TIPO.upper() not in VALID_TIPOS:
-                raise ValidationError(f"TIPO inválido: {row.TIPO}")
-            if not row.DTMNFR:
-                raise ValidationError("DTMNFR obrigatório")
-            if not row.SIGLA:
-                raise ValidationError("SIGLA obrigatória")
-            if not row.NOME_CANDIDATO:
-                raise ValidationError("NOME_CANDIDATO obrigatório")
-
-    def _check_sequences(self, rows: List[CandidateRow]) -> None:
-        grouped = defaultdict(list)
+            checker.check(row)
+        return self._finish(checker)
+
+    def iter_validate(
+        self, rows: Iterable[ContractRow], *, report: Optional[ValidationReport] = None
+    ) -> Iterator[ContractRow]:
+        """Yield rows as they pass the per-row rules.
+
+        Rows breaking a domain or conditional rule, or repeating a NUM_ORDEM,
+        are held back. Gaps in a NUM_ORDEM sequence are only known once every
+        row has been seen, so in strict mode a :class:`ValidationError` is
+        raised after the last row when anything was found. Violations are
+        collected into ``report`` when one is given.
+        """
+
+        checker = _Checker(report)
         for row in rows:
-            key = (row.DTMNFR, row.ORGAO, row.SIGLA, row.TIPO)
-            grouped[key].append(row.NUM_ORDEM)
-
-        for key, numbers in grouped.items():
-            expected = 1
-            for number in sorted(numbers):
-                if number != expected:
-                    raise ValidationError(
-                        f"NUM_ORDEM inválido para {key}: esperado {expected}, obtido {number}"
+            if checker.check(row):
+                yield row
+        self._finish(checker)
+
+    def _finish(self, checker: "_Checker") -> ValidationReport:
+        report = checker.finish()
+        if self.strict and not report.ok:
+            raise ValidationError(report.summary(), report)
+        return report
+
+
+class _Checker:
+    """Single-pass rule state: the report so far and the NUM_ORDEM seen per group."""
+
+    def __init__(self, report: Optional[ValidationReport] = None) -> None:
+        self.report = report if report is not None else ValidationReport()
+        self._numbers: Dict[GroupKey, Set[int]] = {}
+
+    def check(self, row: ContractRow) -> bool:
+        """Check one row; return ``True`` when it broke no rule of its own."""
+
+        self.report.rows_checked += 1
+        position = self.report.rows_checked
+        page_number = getattr(row, "page_number", None)
+        found = len(self.report.violations)
+
+        def add(rule: str, message: str) -> None:
+            self.report.violations.append(Violation(rule, message, position, page_number))
+
+        for message in _domain_errors(row):
+            add(RULE_DOMAIN, message)
+        for message in _conditional_errors(row):
+            add(RULE_CONDITIONAL, message)
+
+        key = (row.DTMNFR, row.ORGAO, row.SIGLA, row.TIPO)
+        seen = self._numbers.setdefault(key, set())
+        if row.NUM_ORDEM < 1:
+            add(RULE_SEQUENCE, f"NUM_ORDEM inválido para {key}: obtido {row.NUM_ORDEM}")
+        elif row.NUM_ORDEM in seen:
+            add(RULE_SEQUENCE, f"NUM_ORDEM repetido para {key}: {row.NUM_ORDEM}")
+        else:
+            seen.add(row.NUM_ORDEM)
+        return len(self.report.violations) == found
+
+    def finish(self) -> ValidationReport:
+        for key, seen in self._numbers.items():
+            if not seen:
+                continue
+            missing = [number for number in range(1, max(seen) + 1) if number not in seen]
+            if missing:
+                self.report.violations.append(
+                    Violation(
+                        RULE_SEQUENCE,
+                        f"NUM_ORDEM inválido para {key}: em falta {', '.join(map(str, missing))}",
                     )
-                expected += 1
+                )
+        return self.report
 
-    def _check_conditionals(self, rows: List[CandidateRow]) -> None:
-        for row in rows:
-            tipo = row.TIPO.upper()
-            if tipo in {"GCE", "COLIGAÇÃO"} and not row.NOME_LISTA:
-                raise ValidationError("NOME_LISTA obrigatório para coligações/GCE")
-            if tipo == "GCE" and row.SIMBOLO:
-                # símbolo representa o próprio GCE, permitir valor "GCE"
-                if row.SIMBOLO.upper() not in {"GCE", ""}:
-                    raise ValidationError("SIMBOLO inválido para GCE")
-            if tipo != "GCE" and row.SIMBOLO:
-                raise ValidationError("SIMBOLO apenas permitido para GCE")
-            if tipo == "GCE" and row.INDEPENDENTE:
-                raise ValidationError("INDEPENDENTE deve ficar vazio para GCE")
-
-
-__all__ = ["DataValidator", "ValidationError"]
+
+def _domain_errors(row: ContractRow) -> Iterator[str]:
+    if row.ORGAO.upper() not in VALID_ORGAOS:
+        yield f"ORGAO inválido: {row.ORGAO}"
+    if row.TIPO.upper() not in VALID_TIPOS:
+        yield f"TIPO inválido: {row.TIPO}"
+    if not row.DTMNFR:
+        yield "DTMNFR obrigatório"
+    if not row.SIGLA:
+        yield "SIGLA obrigatória"
+    if not row.NOME_CANDIDATO:
+        yield "NOME_CANDIDATO obrigatório"
+
+
+def _conditional_errors(row: ContractRow) -> Iterator[str]:
+    tipo = row.TIPO.upper()
+    if tipo in {"GCE", "COLIGAÇÃO"} and not row.NOME_LISTA:
+        yield "NOME_LISTA obrigatório para coligações/GCE"
+    if tipo == "GCE" and row.SIMBOLO:
+        # símbolo representa o próprio GCE, permitir valor "GCE"
+        if row.SIMBOLO.upper() not in {"GCE", ""}:
+            yield "SIMBOLO inválido para GCE"
+    if tipo != "GCE" and row.SIMBOLO:
+        yield "SIMBOLO apenas permitido para GCE"
+    if tipo == "GCE" and row.INDEPENDENTE:
+        yield "INDEPENDENTE deve ficar vazio para GCE"
+
+
+__all__ = [
+    "DataValidator",
+    "RULE_CONDITIONAL",
+    "RULE_DOMAIN",
+    "RULE_PAGE",
+    "RULE_SEQUENCE",
+    "ValidationError",
+    "ValidationReport",
+    "Violation",
+]
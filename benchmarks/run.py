@@ -0,0 +1,243 @@
+"""Per-stage and end-to-end benchmarks over synthetic electoral lists.
+
+Usage::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --scenario text-pdf --lists 20 --repeat 5 --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.csv_writer import CSVWriter  # noqa: E402
+from api.app.services.pipeline import ExtractionPipeline  # noqa: E402
+from api.app.services.render import RenderedPage  # noqa: E402
+from api.app.services.validate import ValidationError  # noqa: E402
+
+from .synthetic import (  # noqa: E402
+    SyntheticConfig,
+    expected_rows,
+    generate_raster_pdf,
+    generate_text_pages,
+    generate_text_pdf,
+)
+
+SCENARIOS = ("text", "text-pdf", "raster-pdf")
+
+# A count, or a function deriving it from the stage output.
+Counter = Union[int, Callable[[Any], int]]
+
+
+def _measure(func: Callable[[], Any], repeat: int) -> Tuple[Any, Dict[str, float]]:
+    """Time ``repeat`` runs of ``func``; return its last result, timings and peak traced memory.
+
+    tracemalloc slows allocation-heavy code down, so the timed runs are not
+    traced: peak memory comes from one extra traced run.
+    """
+
+    durations: List[float] = []
+    result: Any = None
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - started)
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, {
+        "seconds_median": statistics.median(durations),
+        "seconds_min": min(durations),
+        "seconds_max": max(durations),
+        "peak_memory_bytes": peak,
+    }
+
+
+def _document(scenario: str, config: SyntheticConfig) -> Tuple[bytes, str, str]:
+    if scenario == "text":
+        return b"\n".join(generate_text_pages(config)), "synthetic.txt", "text/plain"
+    if scenario == "text-pdf":
+        return generate_text_pdf(config), "synthetic.pdf", "application/pdf"
+    if scenario == "raster-pdf":
+        return generate_raster_pdf(config), "synthetic.pdf", "application/pdf"
+    raise ValueError(f"Scenario {scenario} has no single-document payload")
+
+
+def _validate(pipeline: ExtractionPipeline, rows: List[Any]) -> bool:
+    try:
+        return pipeline.validator.validate(rows).ok
+    except ValidationError:
+        return False
+
+
+def _run_document(pipeline: ExtractionPipeline, payload: bytes, filename: str, content_type: str) -> List[Any]:
+    try:
+        return pipeline.run(payload, filename=filename, content_type=content_type)
+    except ValidationError:
+        return []
+
+
+def _stream_document(pipeline: ExtractionPipeline, payload: bytes, filename: str, content_type: str) -> List[Any]:
+    try:
+        return list(pipeline.iter_run(payload, filename=filename, content_type=content_type))
+    except ValidationError:
+        return []
+
+
+def run_scenario(
+    scenario: str,
+    config: SyntheticConfig,
+    *,
+    repeat: int = 3,
+    pipeline: Optional[ExtractionPipeline] = None,
+) -> List[Dict[str, Any]]:
+    pipeline = pipeline or ExtractionPipeline()
+    writer = CSVWriter()
+    results: List[Dict[str, Any]] = []
+
+    def record(stage: str, func: Callable[[], Any], *, pages: Counter, rows: Counter) -> Any:
+        value, stats = _measure(func, repeat)
+        seconds = stats["seconds_median"] or 1e-9
+        pages = pages(value) if callable(pages) else pages
+        rows = rows(value) if callable(rows) else rows
+        results.append(
+            {
+                "scenario": scenario,
+                "stage": stage,
+                "pages": pages,
+                "rows": rows,
+                "pages_per_second": pages / seconds,
+                "rows_per_second": rows / seconds,
+                **stats,
+            }
+        )
+        return value
+
+    payload, filename, content_type = _document(scenario, config)
+    if scenario == "text":
+        rendered = [
+            RenderedPage(page_number=index, payload=page, source=f"synthetic.txt#page={index}")
+            for index, page in enumerate(generate_text_pages(config), start=1)
+        ]
+    else:
+        rendered = record(
+            "render",
+            lambda: pipeline.renderer.render(payload, filename=filename, content_type=content_type),
+            pages=len,
+            rows=0,
+        )
+
+    pages = len(rendered)
+    ocr_pages = record("ocr", lambda: pipeline.ocr.run(rendered), pages=pages, rows=0)
+    layout_pages = record("layout", lambda: pipeline.layout.analyze(ocr_pages), pages=pages, rows=0)
+    segments = record("segment", lambda: pipeline.anchor_detector.locate(layout_pages), pages=pages, rows=0)
+    raw = record("extract", lambda: pipeline.extractor.extract(segments), pages=pages, rows=len)
+    rows = record("normalize", lambda: pipeline.normalizer.normalize(raw), pages=pages, rows=len(raw))
+    valid = record("validate", lambda: _validate(pipeline, rows), pages=pages, rows=len(rows))
+    results[-1]["valid"] = valid
+    results[-1]["expected_rows"] = expected_rows(config)
+    record("csv", lambda: writer.write(rows), pages=pages, rows=len(rows))
+
+    record(
+        "end_to_end",
+        lambda: _run_document(pipeline, payload, filename, content_type),
+        pages=pages,
+        rows=len,
+    )
+    record(
+        "end_to_end_streaming",
+        lambda: _stream_document(pipeline, payload, filename, content_type),
+        pages=pages,
+        rows=len,
+    )
+
+    for entry in results:
+        entry["config"] = asdict(config)
+        entry["config"]["orgaos"] = list(config.orgaos)
+    return results
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline on synthetic lists.")
+    parser.add_argument("--scenario", action="append", choices=SCENARIOS, help="Repeat to run several (default: all)")
+    parser.add_argument("--lists", type=int, default=SyntheticConfig.lists)
+    parser.add_argument("--efetivos", type=int, default=SyntheticConfig.efetivos)
+    parser.add_argument("--suplentes", type=int, default=SyntheticConfig.suplentes)
+    parser.add_argument("--gce-lists", type=int, default=SyntheticConfig.gce_lists)
+    parser.add_argument("--orgaos", default=",".join(SyntheticConfig.orgaos), help="Comma-separated ORGAO sections")
+    parser.add_argument("--rows-per-page", type=int, default=SyntheticConfig.rows_per_page)
+    parser.add_argument("--page-size", default=SyntheticConfig.page_size)
+    parser.add_argument("--raster-dpi", type=int, default=SyntheticConfig.raster_dpi)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results as JSON to this path (default: stdout)")
+    args = parser.parse_args(argv)
+
+    config = replace(
+        SyntheticConfig(),
+        lists=args.lists,
+        efetivos=args.efetivos,
+        suplentes=args.suplentes,
+        gce_lists=args.gce_lists,
+        orgaos=tuple(orgao.strip().upper() for orgao in args.orgaos.split(",") if orgao.strip()),
+        rows_per_page=args.rows_per_page,
+        page_size=args.page_size,
+        raster_dpi=args.raster_dpi,
+    )
+
+    pipeline = ExtractionPipeline()
+    results: List[Dict[str, Any]] = []
+    try:
+        for scenario in args.scenario or SCENARIOS:
+            results.extend(run_scenario(scenario, config, repeat=args.repeat, pipeline=pipeline))
+    finally:
+        pipeline.close()
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,223 @@
+"""Synthetic electoral-list documents for benchmarking the extraction pipeline."""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from io import BytesIO
+from typing import List, Sequence
+
+try:  # pragma: no cover - optional dependency
+    from PIL import Image, ImageDraw, ImageFont  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    Image = None
+    ImageDraw = None
+    ImageFont = None
+
+# Page sizes in PDF points (1/72 inch).
+PAGE_SIZES = {
+    "A4": (595.0, 842.0),
+    "A3": (842.0, 1191.0),
+    "LETTER": (612.0, 792.0),
+}
+
+ORGAO_HEADERS = {
+    "ASSEMBLEIA": "Assembleia Municipal",
+    "CAMARA": "Câmara Municipal",
+    "FREGUESIA": "Assembleia de Freguesia",
+}
+
+_SIGLAS = ["PS", "PSD", "CDS-PP", "PCP", "BE", "IL", "PAN", "LIVRE", "CHEGA"]
+_FIRST_NAMES = ["Ana", "João", "Maria", "Rui", "Inês", "Pedro", "Sofia", "Tiago", "Marta", "Luís"]
+_LAST_NAMES = ["Silva", "Santos", "Ferreira", "Pereira", "Costa", "Oliveira", "Martins", "Sousa", "Gomes"]
+
+
+@dataclass
+class SyntheticConfig:
+    """Shape of a generated document."""
+
+    lists: int = 4
+    efetivos: int = 9
+    suplentes: int = 3
+    orgaos: Sequence[str] = ("ASSEMBLEIA", "CAMARA")
+    gce_lists: int = 0
+    rows_per_page: int = 45
+    page_size: str = "A4"
+    dtmnfr: str = "2025-10-12"
+    seed: int = 0
+    font_size: float = 8.0
+    raster_dpi: int = 150
+
+
+def generate_lines(config: SyntheticConfig) -> List[str]:
+    """Return the document as text lines: section headers plus ``;`` rows."""
+
+    rng = random.Random(config.seed)
+    lines: List[str] = []
+    for orgao in config.orgaos:
+        lines.append(ORGAO_HEADERS.get(orgao, orgao.title()))
+        for list_index in range(config.lists + config.gce_lists):
+            is_gce = list_index >= config.lists
+            sigla = f"GCE{list_index - config.lists + 1}" if is_gce else _sigla(list_index)
+            tipo_lista = "GCE" if is_gce else ""
+            nome_lista = f"Grupo de Cidadãos {sigla}" if is_gce else ""
+            # GCE rows share TIPO across both sections, so they share one
+            # NUM_ORDEM sequence too; party lists restart it per section.
+            num_ordem = 0
+            for section, count in (("EFETIVOS", config.efetivos), ("SUPLENTES", config.suplentes)):
+                lines.append(f"Candidatos {section.lower()}")
+                if not is_gce:
+                    num_ordem = 0
+                for _ in range(count):
+                    num_ordem += 1
+                    name = " ".join(
+                        [rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES), rng.choice(_LAST_NAMES)]
+                    )
+                    independente = "" if is_gce else rng.choice(["", "", "", "SIM"])
+                    lines.append(
+                        ";".join(
+                            [
+                                config.dtmnfr,
+                                orgao,
+                                tipo_lista or section,
+                                sigla,
+                                "GCE" if is_gce else "",
+                                nome_lista,
+                                str(num_ordem),
+                                name,
+                                "" if is_gce else sigla,
+                                independente,
+                            ]
+                        )
+                    )
+    return lines
+
+
+def _sigla(list_index: int) -> str:
+    # Past the real parties every list still needs its own SIGLA (and so its
+    # own NUM_ORDEM sequence). ``PS2`` would resolve back to ``PS``, so the
+    # extra lists are numbered instead: LISTA10, LISTA11, ...
+    if list_index < len(_SIGLAS):
+        return _SIGLAS[list_index]
+    return f"LISTA{list_index + 1}"
+
+
+def paginate(lines: Sequence[str], rows_per_page: int) -> List[List[str]]:
+    size = max(1, rows_per_page)
+    return [list(lines[start : start + size]) for start in range(0, len(lines), size)] or [[]]
+
+
+def generate_text_pages(config: SyntheticConfig) -> List[bytes]:
+    """One UTF-8 text payload per page, as produced by the renderer for text PDFs."""
+
+    return ["\n".join(page).encode("utf-8") for page in paginate(generate_lines(config), config.rows_per_page)]
+
+
+def generate_text_pdf(config: SyntheticConfig) -> bytes:
+    """Build a PDF with an extractable text layer using only the standard library."""
+
+    width, height = PAGE_SIZES[config.page_size]
+    leading = config.font_size * 1.35
+    pages = paginate(generate_lines(config), config.rows_per_page)
+
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog_id = add(b"")  # patched below once the page tree exists
+    pages_id = add(b"")
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+
+    page_ids: List[int] = []
+    for page_lines in pages:
+        commands = [f"BT /F1 {config.font_size:g} Tf {leading:g} TL 36 {height - 48:g} Td".encode("ascii")]
+        for line in page_lines:
+            commands.append(b"(" + _pdf_escape(line) + b") Tj T*")
+        commands.append(b"ET")
+        stream = b"\n".join(commands)
+        content_id = add(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(
+            add(
+                (
+                    f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {width:g} {height:g}] "
+                    f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+                ).encode("ascii")
+            )
+        )
+
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode("ascii")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    output = BytesIO()
+    output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n")
+    xref_offset = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii"))
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode("ascii"))
+    output.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode(
+            "ascii"
+        )
+    )
+    return output.getvalue()
+
+
+def generate_raster_pdf(config: SyntheticConfig) -> bytes:
+    """Build an image-only PDF (no text layer), like a scanned list."""
+
+    if Image is None or ImageDraw is None or ImageFont is None:
+        raise RuntimeError("Pillow is required to generate rasterized PDFs")
+
+    width_pt, height_pt = PAGE_SIZES[config.page_size]
+    scale = config.raster_dpi / 72.0
+    size = (int(width_pt * scale), int(height_pt * scale))
+    font = ImageFont.load_default(size=max(8, int(config.font_size * scale)))
+    leading = config.font_size * 1.35 * scale
+
+    images = []
+    for page_lines in paginate(generate_lines(config), config.rows_per_page):
+        image = Image.new("L", size, color=255)
+        draw = ImageDraw.Draw(image)
+        y = 48 * scale
+        for line in page_lines:
+            draw.text((36 * scale, y), line, fill=0, font=font)
+            y += leading
+        images.append(image)
+
+    output = BytesIO()
+    images[0].save(
+        output,
+        format="PDF",
+        save_all=True,
+        append_images=images[1:],
+        resolution=float(config.raster_dpi),
+    )
+    return output.getvalue()
+
+
+def expected_rows(config: SyntheticConfig) -> int:
+    return len(config.orgaos) * (config.lists + config.gce_lists) * (config.efetivos + config.suplentes)
+
+
+def _pdf_escape(line: str) -> bytes:
+    encoded = line.encode("cp1252", errors="replace")
+    return encoded.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+__all__ = [
+    "PAGE_SIZES",
+    "SyntheticConfig",
+    "expected_rows",
+    "generate_lines",
+    "generate_raster_pdf",
+    "generate_text_pages",
+    "generate_text_pdf",
+    "paginate",
+]
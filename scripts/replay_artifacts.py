@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Regenerate CSVs from stored pipeline artifacts without re-running OCR."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.artifacts import STAGES, ArtifactStore  # noqa: E402
+from api.app.services.csv_writer import CSVWriter  # noqa: E402
+from api.app.services.pipeline import ExtractionPipeline  # noqa: E402
+from api.app.services.validate import ValidationError  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("store", help="Pasta do ArtifactStore")
+    parser.add_argument("output", help="Pasta onde escrever um CSV por documento")
+    parser.add_argument(
+        "--checkpoint",
+        choices=STAGES,
+        default="ocr",
+        help="Último estágio reaproveitado (predefinição: ocr)",
+    )
+    parser.add_argument("documents", nargs="*", help="Hashes a reprocessar (predefinição: todos)")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.store)
+    pipeline = ExtractionPipeline(artifacts=store)
+    writer = CSVWriter()
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+
+    failures = 0
+    for digest in args.documents or store.documents():
+        try:
+            rows = pipeline.replay(digest, checkpoint=args.checkpoint)
+        except (KeyError, ValidationError) as exc:
+            print(f"{digest}: {exc}", file=sys.stderr)
+            failures += 1
+            continue
+        (output / f"{digest}.csv").write_text(writer.write(rows), encoding="utf-8")
+        print(f"{digest}: {len(rows)} linhas")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.admission import (  # noqa: E402
+    REJECT_QUEUE_FULL,
+    REJECT_TIMEOUT,
+    AdmissionController,
+    AdmissionRejected,
+)
+
+
+def test_queued_request_runs_once_a_slot_frees():
+    controller = AdmissionController(max_running=1, max_queued=1)
+    order = []
+
+    async def request(name, hold):
+        async with controller.admit():
+            order.append(name)
+            await hold.wait()
+
+    async def scenario():
+        first_done, second_done = asyncio.Event(), asyncio.Event()
+        first = asyncio.create_task(request("first", first_done))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(request("second", second_done))
+        await asyncio.sleep(0)
+        assert controller.snapshot() == {"running": 1, "queued": 1, "counting": 0, "pages_in_flight": 0}
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            async with controller.admit():
+                pass
+        assert excinfo.value.reason == REJECT_QUEUE_FULL
+
+        first_done.set()
+        second_done.set()
+        await asyncio.gather(first, second)
+
+    asyncio.run(scenario())
+
+    assert order == ["first", "second"]
+    assert controller.snapshot() == {"running": 0, "queued": 0, "counting": 0, "pages_in_flight": 0}
+    exposition = controller.metrics.render()
+    assert 'cne_admission_rejections_total{reason="queue_full"} 1' in exposition
+    assert "cne_admission_queued_requests 0" in exposition
+
+
+def test_page_budget_and_queue_timeout():
+    controller = AdmissionController(max_running=4, max_pages=100, queue_timeout=0.01, retry_after=7)
+
+    async def scenario():
+        async with controller.admit(pages=80):
+            with pytest.raises(AdmissionRejected) as excinfo:
+                async with controller.admit(pages=30):
+                    pass
+            assert (excinfo.value.reason, excinfo.value.retry_after) == (REJECT_TIMEOUT, 7)
+            async with controller.admit(pages=20):
+                assert controller.snapshot()["pages_in_flight"] == 100
+        # A document over the whole budget still runs when nothing else does.
+        async with controller.admit(pages=500):
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_pages_are_counted_only_while_the_queue_has_room():
+    controller = AdmissionController(max_running=1, max_queued=1, max_pages=100)
+    counted = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def count():
+            counted.append(True)
+            await release.wait()
+            return 10
+
+        async def request():
+            async with controller.admit(pages=count):
+                pass
+
+        first = asyncio.create_task(request())
+        await asyncio.sleep(0)
+        assert controller.snapshot()["counting"] == 1
+
+        with pytest.raises(AdmissionRejected) as excinfo:
+            async with controller.admit(pages=count):
+                pass
+        assert excinfo.value.reason == REJECT_QUEUE_FULL
+
+        release.set()
+        await first
+
+    asyncio.run(scenario())
+
+    assert len(counted) == 1, "the rejected request must not be parsed"
+    assert controller.snapshot()["counting"] == 0
+
+
+def test_worker_threads_wait_their_turn_in_the_same_queue():
+    controller = AdmissionController(max_running=1, max_queued=0)
+    order = []
+
+    def job():
+        with controller.hold(pages=5):
+            order.append("job")
+
+    async def scenario():
+        async with controller.admit():
+            worker = threading.Thread(target=job)
+            worker.start()
+            while not controller.snapshot()["queued"]:
+                await asyncio.sleep(0.001)
+            order.append("request")
+        await asyncio.to_thread(worker.join, 5)
+
+    asyncio.run(scenario())
+
+    assert order == ["request", "job"]
+    assert controller.snapshot() == {"running": 0, "queued": 0, "counting": 0, "pages_in_flight": 0}
+
+
+def test_ocr_csv_answers_503_with_retry_after(monkeypatch):
+    pytest.importorskip("fastapi")
+    from fastapi.testclient import TestClient
+
+    from api.app import main
+
+    controller = AdmissionController(max_running=1, max_queued=0, retry_after=3)
+    controller._take(1, 0)
+    monkeypatch.setattr(main, "admission", controller)
+
+    response = TestClient(main.app).post("/api/ocr-csv", files={"file": ("a.txt", b"PS", "text/plain")})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+
+
+def test_ocr_csv_keeps_its_slots_until_every_upload_finishes(monkeypatch):
+    pytest.importorskip("fastapi")
+    import time
+
+    from fastapi.testclient import TestClient
+
+    from api.app import main
+    from api.app.services.validate import ValidationError
+
+    controller = AdmissionController(max_running=2, max_queued=0, max_pages=0)
+    monkeypatch.setattr(main, "admission", controller)
+    finished = []
+
+    def fake_run(payload, *, filename=None, content_type=None):
+        if filename == "bad.txt":
+            raise ValidationError("ORGAO inválido: MOCK")
+        time.sleep(0.2)
+        finished.append(filename)
+        return []
+
+    monkeypatch.setattr(main.pipeline, "run", fake_run)
+
+    response = TestClient(main.app).post(
+        "/api/ocr-csv",
+        files=[
+            ("files", ("bad.txt", b"bad", "text/plain")),
+            ("files", ("slow.txt", b"slow", "text/plain")),
+        ],
+    )
+
+    assert response.status_code == 422
+    assert finished == ["slow.txt"]
+    assert controller.snapshot()["running"] == 0
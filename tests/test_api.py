@@ -25,3 +25,220 @@ def test_ocr_to_csv_returns_422_on_validation_error(monkeypatch):
 
     assert response.status_code == 422
     assert response.json()["detail"] == "invalid data"
+
+
+def test_ocr_to_csv_rejects_documents_with_unreadable_pages(monkeypatch):
+    from api.app.services.render import RenderedPage
+
+    client = TestClient(app)
+
+    def render(payload, *, filename=None, content_type=None):
+        return [
+            RenderedPage(page_number=1, payload=b"", source="scan.pdf#page=1", error="corrupt page"),
+            RenderedPage(
+                page_number=2,
+                payload="2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;1;ana silva;;\n".encode(),
+                source="scan.pdf#page=2",
+            ),
+        ]
+
+    monkeypatch.setattr(pipeline.renderer, "render", render)
+
+    response = client.post(
+        "/api/ocr-csv",
+        files={"file": ("scan.pdf", b"%PDF-unreadable-page", "application/pdf")},
+    )
+
+    assert response.status_code == 422
+    (violation,) = response.json()["detail"]["violations"]
+    assert violation["rule"] == "page" and violation["page_number"] == 1
+
+
+def test_ocr_to_csv_runs_uploads_concurrently_and_merges_rows(monkeypatch):
+    import threading
+
+    from api.app.schemas.csv_contract import CandidateRow
+
+    client = TestClient(app)
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fake_run(payload, *, filename=None, content_type=None):
+        # Both uploads must be in flight at the same time to pass the barrier.
+        barrier.wait()
+        return [
+            CandidateRow(
+                DTMNFR="2025",
+                ORGAO="CAMARA",
+                TIPO="EFETIVOS",
+                SIGLA=bytes(payload).decode(),
+                NUM_ORDEM=1,
+                NOME_CANDIDATO="Ana Silva",
+            )
+        ]
+
+    monkeypatch.setattr(pipeline, "run", fake_run)
+
+    response = client.post(
+        "/api/ocr-csv",
+        files=[
+            ("files", ("b.txt", b"PSD", "text/plain")),
+            ("files", ("a.txt", b"PS", "text/plain")),
+        ],
+    )
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0].startswith("DTMNFR;ORGAO;TIPO;SIGLA")
+    assert [line.split(";")[3] for line in lines[1:]] == ["PS", "PSD"]
+
+
+def test_job_endpoints_report_progress_and_return_csv(monkeypatch, tmp_path):
+    from api.app import main
+    from api.app.schemas.csv_contract import CandidateRow
+    from api.app.services.jobs import JobQueue
+
+    def fake_run(payload, *, filename=None, content_type=None):
+        return [
+            CandidateRow(
+                DTMNFR="2025",
+                ORGAO="CAMARA",
+                TIPO="EFETIVOS",
+                SIGLA="PS",
+                NUM_ORDEM=1,
+                NOME_CANDIDATO="Ana Silva",
+            )
+        ]
+
+    monkeypatch.setattr(pipeline, "run", fake_run)
+    queue = JobQueue(tmp_path / "jobs.sqlite3", pipeline)
+    monkeypatch.setattr(main, "job_queue", queue)
+    client = TestClient(app)
+
+    created = client.post("/api/jobs", files={"file": ("lista.pdf", b"%PDF-FAKE", "application/pdf")})
+    assert created.status_code == 202
+    job_id = created.json()["id"]
+
+    assert client.get(f"/api/jobs/{job_id}/result").status_code == 409
+
+    queue.process_next()
+
+    status = client.get(f"/api/jobs/{job_id}").json()
+    assert status["status"] == "done"
+    assert status["progress"] == {"documents_done": 1, "documents_total": 1}
+
+    result = client.get(f"/api/jobs/{job_id}/result")
+    assert result.status_code == 200
+    assert result.text.splitlines()[1].startswith("2025;CAMARA;EFETIVOS;PS;")
+    assert client.get("/api/jobs/unknown").status_code == 404
+
+
+def test_metrics_endpoint_serves_prometheus_text():
+    client = TestClient(app)
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE cne_stage_duration_seconds histogram" in response.text
+
+
+def test_ready_endpoint_reports_engine_states(monkeypatch):
+    import threading
+
+    from api.app import main
+
+    client = TestClient(app)
+    monkeypatch.setattr(main, "models_warm", threading.Event())
+
+    # Text-layer documents are served while the models are still loading.
+    warming = client.get("/api/ready")
+    assert warming.status_code == 200
+    assert warming.json()["status"] == "ready"
+    assert warming.json()["models"] == "warming"
+
+    # Without warm-up the models load on first use: nothing to wait for.
+    monkeypatch.setenv("CNE_WARM_UP", "0")
+    main._start_warm_up()
+
+    response = client.get("/api/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["models"] == "loaded"
+    assert {"paddle", "tesseract", "spacy"} <= set(body["engines"])
+
+
+def test_archive_to_csv_merges_members_and_reports_manifest(monkeypatch):
+    import io
+    import zipfile
+
+    from api.app.schemas.csv_contract import CandidateRecord
+
+    client = TestClient(app)
+
+    def fake_run(payload, *, filename=None, content_type=None):
+        if payload == b"invalid":
+            raise ValidationError("ORGAO inválido: MOCK")
+        return [
+            CandidateRecord("2025", "CAMARA", "EFETIVOS", payload.decode(), "", "", 1, "Ana Silva", "", "")
+        ]
+
+    monkeypatch.setattr(pipeline, "run", fake_run)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("porto.pdf", b"PSD")
+        archive.writestr("lisboa.pdf", b"PS")
+        archive.writestr("braga.pdf", b"invalid")
+
+    response = client.post(
+        "/api/archive-csv", files={"file": ("listas.zip", buffer.getvalue(), "application/zip")}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [line.split(";")[3] for line in body["csv"].splitlines()[1:]] == ["PS", "PSD"]
+    assert [(entry["name"], entry["status"], entry["rows"]) for entry in body["manifest"]] == [
+        ("porto.pdf", "done", 1),
+        ("lisboa.pdf", "done", 1),
+        ("braga.pdf", "failed", 0),
+    ]
+
+
+def test_archive_to_csv_rejects_damaged_archives_with_400():
+    import io
+    import tarfile
+
+    client = TestClient(app)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name in ("porto.pdf", "lisboa.pdf"):
+            info = tarfile.TarInfo(name)
+            info.size = 4096
+            archive.addfile(info, io.BytesIO(b"x" * 4096))
+    truncated = buffer.getvalue()[:5120]
+
+    response = client.post("/api/archive-csv", files={"file": ("listas.tar", truncated, "application/x-tar")})
+
+    assert response.status_code == 400
+    assert "Corrupt TAR archive" in response.json()["detail"]
+
+
+def test_ocr_to_csv_negotiates_columnar_output(monkeypatch):
+    from api.app.schemas.csv_contract import CandidateRecord
+    from api.app.services import columnar
+
+    client = TestClient(app)
+    rows = [CandidateRecord("2025", "CAMARA", "EFETIVOS", "PS", "", "", 1, "Ana Silva", "", "")]
+    monkeypatch.setattr(pipeline, "run", lambda payload, **kwargs: rows)
+    upload = {"file": ("a.txt", b"PS", "text/plain")}
+
+    with monkeypatch.context() as patch:
+        patch.setattr(columnar, "pa", None)
+        assert client.post("/api/ocr-csv?format=parquet", files=upload).status_code == 406
+
+    pa = pytest.importorskip("pyarrow")
+    response = client.post(
+        "/api/ocr-csv", files=upload, headers={"Accept": "application/vnd.apache.arrow.stream"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    assert pa.ipc.open_stream(response.content).read_all().column("SIGLA").to_pylist() == ["PS"]
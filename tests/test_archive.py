@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import io
+import sys
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.schemas.csv_contract import CandidateRecord  # noqa: E402
+from api.app.services.admission import AdmissionController  # noqa: E402
+from api.app.services.archive import MEMBER_DONE, MEMBER_FAILED, ArchiveProcessor, iter_members  # noqa: E402
+from api.app.services.validate import ValidationError  # noqa: E402
+
+
+def _zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, payload in members:
+            archive.writestr(name, payload)
+    buffer.seek(0)
+    return buffer
+
+
+def _tar(members, mode="w:gz"):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, payload in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            archive.addfile(info, io.BytesIO(payload))
+    buffer.seek(0)
+    return buffer
+
+
+@pytest.mark.parametrize("build", [_zip, _tar])
+def test_iter_members_skips_hidden_entries(build):
+    archive = build(
+        [("a/lisboa.pdf", b"A"), ("__MACOSX/a/._lisboa.pdf", b"x"), (".DS_Store", b"x"), ("porto.txt", b"B")]
+    )
+
+    assert list(iter_members(archive)) == [("a/lisboa.pdf", b"A", None), ("porto.txt", b"B", None)]
+
+
+def test_iter_members_rejects_other_payloads():
+    with pytest.raises(ValueError):
+        list(iter_members(io.BytesIO(b"not an archive")))
+
+
+def _corrupt(archive, payload):
+    # Flip the stored bytes of one member so its CRC check fails on read.
+    data = archive.getvalue()
+    offset = data.index(payload)
+    return io.BytesIO(data[:offset] + payload.upper() + data[offset + len(payload) :])
+
+
+def test_iter_members_reports_unreadable_and_oversized_members():
+    archive = _zip([("lisboa.txt", b"lisboa"), ("porto.txt", b"porto"), ("braga.txt", b"b" * 64)])
+
+    members = list(iter_members(_corrupt(archive, b"lisboa"), max_member_bytes=32))
+
+    assert [(name, payload) for name, payload, _ in members] == [
+        ("lisboa.txt", b""),
+        ("porto.txt", b"porto"),
+        ("braga.txt", b""),
+    ]
+    assert "BadZipFile" in members[0][2]
+    assert members[1][2] is None
+    assert "too large" in members[2][2]
+
+
+def test_iter_members_rejects_archives_that_cannot_be_listed():
+    data = _tar([("a.txt", b"A" * 4096), ("b.txt", b"B" * 4096)], mode="w").getvalue()
+
+    with pytest.raises(ValueError, match="Corrupt TAR archive"):
+        list(iter_members(io.BytesIO(data[: len(data) // 2])))
+
+
+class _FakePipeline:
+    def run(self, payload, *, filename=None, content_type=None):
+        if payload == b"invalid":
+            raise ValidationError("ORGAO inválido: MOCK")
+        return [
+            CandidateRecord("2025", "CAMARA", "EFETIVOS", payload.decode(), "", "", 1, "Ana Silva", "", "")
+        ]
+
+
+def test_processor_keeps_archive_order_and_reports_failures():
+    archive = _zip([(f"{index}.txt", b"invalid" if index == 2 else b"PS") for index in range(5)])
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = ArchiveProcessor(_FakePipeline(), executor, window=2).process(archive)
+
+    assert [result.name for result in results] == [f"{index}.txt" for index in range(5)]
+    assert [result.status for result in results] == [MEMBER_DONE] * 2 + [MEMBER_FAILED] + [MEMBER_DONE] * 2
+    assert results[2].manifest() == {
+        "name": "2.txt",
+        "status": MEMBER_FAILED,
+        "rows": 0,
+        "error": "ORGAO inválido: MOCK",
+    }
+
+
+def test_processor_marks_unreadable_members_failed():
+    archive = _corrupt(_zip([("lisboa.txt", b"lisboa"), ("PS.txt", b"PS")]), b"lisboa")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = ArchiveProcessor(_FakePipeline(), executor, window=2).process(archive)
+
+    assert [(result.name, result.status) for result in results] == [
+        ("lisboa.txt", MEMBER_FAILED),
+        ("PS.txt", MEMBER_DONE),
+    ]
+    assert "BadZipFile" in results[0].error
+
+
+def test_processor_reserves_pages_for_each_member():
+    controller = AdmissionController(max_running=4, max_pages=3)
+    seen = []
+
+    class _CountingPipeline(_FakePipeline):
+        renderer = SimpleNamespace(count_pages=lambda payload, filename=None: 2)
+
+        def run(self, payload, *, filename=None, content_type=None):
+            seen.append(controller.snapshot()["pages_in_flight"])
+            time.sleep(0.01)
+            return super().run(payload, filename=filename, content_type=content_type)
+
+    archive = _zip([(f"{index}.txt", b"PS") for index in range(4)])
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        processor = ArchiveProcessor(_CountingPipeline(), executor, window=4, admission=controller)
+        results = processor.process(archive)
+
+    assert [result.status for result in results] == [MEMBER_DONE] * 4
+    # Two pages per member against a budget of three: one member at a time.
+    assert seen == [2, 2, 2, 2]
+    assert controller.snapshot() == {"running": 0, "queued": 0, "counting": 0, "pages_in_flight": 0}
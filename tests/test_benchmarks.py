@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.run import run_scenario  # noqa: E402
+from benchmarks.synthetic import SyntheticConfig, generate_lines, generate_text_pdf  # noqa: E402
+
+SMALL = SyntheticConfig(lists=2, efetivos=3, suplentes=1, orgaos=("CAMARA",), rows_per_page=5)
+
+
+def test_text_pdf_generator_produces_extractable_pages():
+    pdfplumber = pytest.importorskip("pdfplumber")
+
+    lines = generate_lines(SMALL)
+    with pdfplumber.open(BytesIO(generate_text_pdf(SMALL))) as pdf:
+        assert len(pdf.pages) == 3
+        extracted = [line for page in pdf.pages for line in page.extract_text().splitlines()]
+
+    assert extracted == lines
+
+
+def test_run_scenario_reports_every_stage():
+    results = run_scenario("text", SMALL, repeat=1)
+
+    assert [entry["stage"] for entry in results] == [
+        "ocr",
+        "layout",
+        "segment",
+        "extract",
+        "normalize",
+        "validate",
+        "csv",
+        "end_to_end",
+        "end_to_end_streaming",
+    ]
+    assert all(entry["pages"] == 3 for entry in results)
+    assert results[-2]["rows"] == results[-3]["rows"] > 0
+    assert all(entry["peak_memory_bytes"] >= 0 for entry in results)
+
+
+def test_many_lists_and_gce_lists_stay_valid():
+    config = SyntheticConfig(
+        lists=11, gce_lists=2, efetivos=2, suplentes=1, orgaos=("CAMARA",), rows_per_page=20
+    )
+
+    results = {entry["stage"]: entry for entry in run_scenario("text", config, repeat=1)}
+
+    assert results["validate"]["valid"] is True
+    assert results["end_to_end"]["rows"] == results["validate"]["expected_rows"] == 39
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.schemas.csv_contract import CandidateRow  # noqa: E402
+from api.app.services.cache import ResultCache  # noqa: E402
+
+
+def _rows():
+    return [
+        CandidateRow(
+            DTMNFR="2025",
+            ORGAO="CAMARA",
+            TIPO="EFETIVOS",
+            SIGLA="PS",
+            NUM_ORDEM=1,
+            NOME_CANDIDATO="Ana Silva",
+        )
+    ]
+
+
+def test_concurrent_identical_lookups_share_one_computation():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return _rows()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_compute("k", compute)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(rows[0].NOME_CANDIDATO == "Ana Silva" for rows in results)
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(max_entries=1)
+    cache.get_or_compute("a", _rows)
+    cache.get_or_compute("b", _rows)
+
+    recomputed = []
+    cache.get_or_compute("a", lambda: recomputed.append(1) or _rows())
+
+    assert recomputed == [1]
+
+
+def test_disk_tier_survives_new_instance_and_is_size_bounded(tmp_path):
+    ResultCache(directory=tmp_path).get_or_compute("a", _rows)
+
+    fresh = ResultCache(directory=tmp_path)
+    rows = fresh.get_or_compute("a", lambda: pytest.fail("should be served from disk"))
+    assert [list(row.as_iterable()) for row in rows] == [list(row.as_iterable()) for row in _rows()]
+
+    bounded = ResultCache(directory=tmp_path, max_disk_bytes=1)
+    bounded.get_or_compute("b", _rows)
+    assert list(tmp_path.glob("*.json")) == []
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app import cli  # noqa: E402
+
+
+def _documents(root: Path) -> None:
+    (root / "a").mkdir(parents=True)
+    (root / "a" / "lisboa.txt").write_text(
+        "2025;CAMARA;EFETIVOS;PS;;;1;ana silva;;\n2025;CAMARA;EFETIVOS;PS;;;2;rui costa;;\n", encoding="utf-8"
+    )
+    (root / "porto.txt").write_text("2025;MOCK;EFETIVOS;PSD;;;1;eva lima;;\n", encoding="utf-8")
+    (root / ".oculto.txt").write_text("ignorado\n", encoding="utf-8")
+
+
+def test_batch_writes_csvs_manifest_and_merged_output(tmp_path):
+    _documents(tmp_path / "in")
+    progress = io.StringIO()
+    runner = cli.BatchRunner(tmp_path / "in", tmp_path / "out", progress=progress)
+
+    assert runner.run() == (1, 1)
+    assert runner.merge(tmp_path / "merged.csv") == 2
+
+    entries = [json.loads(line) for line in (tmp_path / "out" / cli.MANIFEST).read_text().splitlines()]
+    assert [(entry["document"], entry["status"], entry["rows"]) for entry in entries] == [
+        ("a/lisboa.txt", cli.STATUS_DONE, 2),
+        ("porto.txt", cli.STATUS_FAILED, 0),
+    ]
+    assert (tmp_path / "out" / "a" / "lisboa.txt.csv").read_text().splitlines()[1].startswith("2025;CAMARA")
+    assert "[2/2] porto.txt: falhou: ORGAO inválido: MOCK" in progress.getvalue()
+    assert "ETA" in progress.getvalue()
+
+
+def test_batch_resumes_without_redoing_finished_documents(tmp_path, monkeypatch):
+    _documents(tmp_path / "in")
+    runner = cli.BatchRunner(tmp_path / "in", tmp_path / "out")
+    runner.run()
+
+    processed = []
+    monkeypatch.setattr(cli, "_process", lambda path: processed.append(Path(path).name) or ([], None))
+
+    assert runner.run() == (0, 0)
+    assert cli.BatchRunner(tmp_path / "in", tmp_path / "out", retry_failed=True).run() == (1, 0)
+    assert processed == ["porto.txt"]
+
+    (tmp_path / "in" / "a" / "lisboa.txt").write_text("2025;CAMARA;EFETIVOS;PS;;;1;ana silva;;\n")
+    assert [path.name for path in runner.pending()] == ["lisboa.txt"]
+
+
+def test_output_inside_the_source_is_not_read_back(tmp_path):
+    _documents(tmp_path)
+    runner = cli.BatchRunner(tmp_path, tmp_path / "out")
+
+    assert runner.run() == (1, 1)
+    assert (tmp_path / "out" / "a" / "lisboa.txt.csv").exists()
+    assert runner.pending() == []
+    assert runner.run() == (0, 0)
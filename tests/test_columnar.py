@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.schemas.csv_contract import CandidateRecord, CandidateRow  # noqa: E402
+from api.app.services import columnar  # noqa: E402
+from api.app.services.columnar import (  # noqa: E402
+    FORMAT_ARROW,
+    FORMAT_ARROW_FILE,
+    FORMAT_CSV,
+    FORMAT_PARQUET,
+    ColumnarWriter,
+    FormatNotAcceptable,
+    negotiate_format,
+)
+
+ROWS = [
+    CandidateRecord("2025", "CAMARA", "EFETIVOS", "PSD", "", "", 1, "Rui Costa", "", ""),
+    CandidateRecord("2025", "CAMARA", "EFETIVOS", "PS", "", "", 2, "Eva Lima", "", ""),
+    CandidateRecord("2025", "CAMARA", "EFETIVOS", "PS", "", "", 1, "Ana Silva", "", ""),
+]
+
+
+@pytest.mark.parametrize(
+    "accept, requested, expected",
+    [
+        (None, None, FORMAT_CSV),
+        ("*/*", None, FORMAT_CSV),
+        ("application/json", None, FORMAT_CSV),
+        ("text/csv;q=0.5, application/vnd.apache.parquet", None, FORMAT_PARQUET),
+        ("application/vnd.apache.parquet;q=0.2, application/vnd.apache.arrow.stream", None, FORMAT_ARROW),
+        ("application/vnd.apache.arrow.file", None, FORMAT_ARROW_FILE),
+        ("application/vnd.apache.parquet", "csv", FORMAT_CSV),
+    ],
+)
+def test_negotiate_format(monkeypatch, accept, requested, expected):
+    monkeypatch.setattr(columnar, "pa", columnar.pa or object())
+
+    assert negotiate_format(accept, requested) == expected
+
+
+def test_negotiate_format_rejects_unknown_or_unavailable_formats(monkeypatch):
+    with pytest.raises(FormatNotAcceptable):
+        negotiate_format(None, "xlsx")
+
+    monkeypatch.setattr(columnar, "pa", None)
+    with pytest.raises(FormatNotAcceptable):
+        negotiate_format("application/vnd.apache.parquet", None)
+
+
+@pytest.mark.parametrize("output_format", [FORMAT_PARQUET, FORMAT_ARROW, FORMAT_ARROW_FILE])
+def test_columnar_output_keeps_contract_schema_and_order(output_format):
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    payload = ColumnarWriter().write(ROWS, output_format)
+    if output_format == FORMAT_PARQUET:
+        table = pq.read_table(pa.BufferReader(payload))
+    elif output_format == FORMAT_ARROW:
+        table = pa.ipc.open_stream(payload).read_all()
+    else:
+        table = pa.ipc.open_file(payload).read_all()
+
+    assert table.column_names == CandidateRow.HEADERS
+    assert table.schema.field("NUM_ORDEM").type == pa.int32()
+    assert pa.types.is_dictionary(table.schema.field("SIGLA").type)
+    assert table.column("SIGLA").to_pylist() == ["PS", "PS", "PSD"]
+    assert table.column("NUM_ORDEM").to_pylist() == [1, 2, 1]
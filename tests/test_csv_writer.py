@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.schemas.csv_contract import CandidateRecord, CandidateRow  # noqa: E402
+from api.app.services.csv_writer import CSVWriter  # noqa: E402
+
+
+def _row(sigla, num_ordem):
+    return CandidateRow(
+        DTMNFR="2025",
+        ORGAO="CAMARA",
+        TIPO="EFETIVOS",
+        SIGLA=sigla,
+        NUM_ORDEM=num_ordem,
+        NOME_CANDIDATO=f"Candidato {sigla} {num_ordem}",
+    )
+
+
+def test_iter_chunks_yields_header_first_then_rows_in_contract_order():
+    rows = [_row("PSD", 2), _row("PS", 1), _row("PSD", 1)]
+    chunks = list(CSVWriter(chunk_rows=2).iter_chunks(rows))
+
+    assert chunks[0] == ";".join(CandidateRow.HEADERS) + "\n"
+    assert len(chunks) == 3
+    body = "".join(chunks[1:]).splitlines()
+    assert [(line.split(";")[3], line.split(";")[6]) for line in body] == [
+        ("PS", "1"),
+        ("PSD", "1"),
+        ("PSD", "2"),
+    ]
+
+
+def test_write_matches_streamed_output():
+    rows = [_row("PS", 2), _row("PS", 1)]
+    writer = CSVWriter(chunk_rows=1)
+
+    assert writer.write(rows) == "".join(writer.iter_chunks(rows))
+
+
+def test_candidate_record_round_trips_and_writes_like_candidate_row():
+    row = _row("PS", 3)
+    record = CandidateRecord.from_values(list(row.as_iterable()))
+
+    assert record.NUM_ORDEM == 3
+    assert record.to_row() == row
+    assert CSVWriter().write([record]) == CSVWriter().write([row])
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.extract import DataExtractor  # noqa: E402
+from api.app.services.layout import LayoutRow  # noqa: E402
+from api.app.services.segment import DocumentSegment  # noqa: E402
+
+
+class FakeNLP:
+    pipe_names = ["tok2vec", "morphologizer", "parser", "ner"]
+
+    def __init__(self):
+        self.batches = []
+        self.enabled = None
+
+    @contextmanager
+    def select_pipes(self, *, enable):
+        self.enabled = enable
+        yield
+
+    def pipe(self, texts, batch_size):
+        self.batches.append(list(texts))
+        for text in texts:
+            name = " ".join(word for word in text.split() if word.istitle())
+            yield SimpleNamespace(ents=[SimpleNamespace(label_="PER", text=name)] if name else [])
+
+    def __call__(self, text):  # pragma: no cover - must not be used
+        raise AssertionError("rows must be batched through nlp.pipe")
+
+
+def _extractor(nlp):
+    extractor = DataExtractor()
+    extractor._nlp._loader = lambda: nlp
+    return extractor
+
+
+def test_rows_missing_names_are_recognised_in_one_batch_and_memoised():
+    nlp = FakeNLP()
+    extractor = _extractor(nlp)
+    segment = DocumentSegment(
+        anchor="EFETIVOS",
+        rows=[
+            LayoutRow(values=["1", "ana", "Silva"]),
+            LayoutRow(values=["2", "rui", "Costa"]),
+            LayoutRow(values=["1", "ana", "Silva"]),
+        ],
+    )
+
+    candidates = extractor.extract([segment])
+
+    assert [candidate.nome_candidato for candidate in candidates] == ["Silva", "Costa", "Silva"]
+    assert [candidate.num_ordem for candidate in candidates] == ["1", "2", "1"]
+    assert nlp.batches == [["1 ana Silva", "2 rui Costa"]]
+    assert nlp.enabled == ["tok2vec", "ner"]
+
+    extractor.extract([segment])
+    assert len(nlp.batches) == 1
+
+
+def test_model_is_not_loaded_when_no_row_needs_ner():
+    loads = []
+    extractor = DataExtractor()
+    extractor._nlp._loader = lambda: loads.append("spacy")
+    row = ["2025", "CAMARA", "EFETIVOS", "PS", "", "", "1", "Ana Silva", "PS", ""]
+
+    candidates = extractor.extract([DocumentSegment(anchor="EFETIVOS", rows=[LayoutRow(values=row)])])
+
+    assert [candidate.nome_candidato for candidate in candidates] == ["Ana Silva"]
+    assert loads == []
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.schemas.csv_contract import CandidateRow  # noqa: E402
+from api.app.services.jobs import JOB_DONE, JOB_FAILED, JOB_QUEUED, JOB_RUNNING, JobQueue  # noqa: E402
+from api.app.services.validate import ValidationError  # noqa: E402
+
+
+class _FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def run(self, payload, *, filename=None, content_type=None):
+        self.calls.append(filename)
+        payload = bytes(payload)
+        if payload == b"invalid":
+            raise ValidationError("ORGAO inválido: MOCK")
+        return [
+            CandidateRow(
+                DTMNFR="2025",
+                ORGAO="CAMARA",
+                TIPO="EFETIVOS",
+                SIGLA=payload.decode(),
+                NUM_ORDEM=1,
+                NOME_CANDIDATO="Ana Silva",
+            )
+        ]
+
+
+def test_job_runs_documents_and_exposes_csv(tmp_path):
+    pipeline = _FakePipeline()
+    queue = JobQueue(tmp_path / "jobs.sqlite3", pipeline)
+
+    job_id = queue.submit([("b.pdf", "application/pdf", b"PSD"), ("a.pdf", "application/pdf", b"PS")])
+    assert queue.get(job_id).status == JOB_QUEUED
+
+    assert queue.process_next() is True
+    assert queue.process_next() is False
+
+    job = queue.get(job_id)
+    assert job.status == JOB_DONE
+    assert (job.documents_done, job.documents_total) == (2, 2)
+    lines = "".join(queue.iter_result(job_id)).splitlines()
+    assert [line.split(";")[3] for line in lines[1:]] == ["PS", "PSD"]
+
+
+def test_validation_failure_marks_job_failed(tmp_path):
+    queue = JobQueue(tmp_path / "jobs.sqlite3", _FakePipeline())
+
+    job_id = queue.submit([("bad.pdf", "application/pdf", b"invalid")])
+    queue.process_next()
+
+    job = queue.get(job_id)
+    assert job.status == JOB_FAILED
+    assert job.error == "ORGAO inválido: MOCK"
+
+
+def test_interrupted_job_resumes_after_restart(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    first = JobQueue(path, _FakePipeline())
+    job_id = first.submit([("a.pdf", None, b"PS"), ("b.pdf", None, b"PSD")])
+
+    # Simulate a crash after the first document was stored.
+    assert first._claim() == job_id
+    with first._connect() as conn:
+        conn.execute(
+            "UPDATE job_documents SET rows = '[]', path = NULL WHERE job_id = ? AND position = 0",
+            (job_id,),
+        )
+    assert first.get(job_id).status == JOB_RUNNING
+
+    pipeline = _FakePipeline()
+    restarted = JobQueue(path, pipeline, poll_interval=0.01)
+    restarted.start()
+    try:
+        for _ in range(500):
+            if restarted.get(job_id).status == JOB_DONE:
+                break
+            restarted._wakeup.wait(0.01)
+    finally:
+        restarted.stop()
+
+    assert restarted.get(job_id).status == JOB_DONE
+    assert pipeline.calls == ["b.pdf"]
+    assert not (restarted.upload_dir / job_id).exists()
+
+
+def test_uploads_are_spooled_to_files_not_stored_in_the_database(tmp_path):
+    import io
+
+    queue = JobQueue(tmp_path / "jobs.sqlite3", _FakePipeline(), upload_dir=tmp_path / "uploads")
+
+    job_id = queue.submit([("a.pdf", "application/pdf", io.BytesIO(b"PS"))])
+
+    with queue._connect() as conn:
+        (path,) = conn.execute("SELECT path FROM job_documents").fetchone()
+    assert Path(path).parent == tmp_path / "uploads" / job_id
+    assert Path(path).read_bytes() == b"PS"
+
+    queue.process_next()
+
+    assert queue.get(job_id).status == JOB_DONE
+    assert not Path(path).exists()
+
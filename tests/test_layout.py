@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("numpy")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.layout import LayoutAnalyzer  # noqa: E402
+from api.app.services.ocr import OCRPage, OCRToken  # noqa: E402
+
+# Left edge of each contract column, in pixels.
+COLUMNS = [40, 160, 280, 420, 500, 580, 760, 820, 1060, 1140]
+
+
+def _cell(text, column, y):
+    tokens = []
+    x = COLUMNS[column]
+    for word in text.split():
+        tokens.append(OCRToken(text=word, x0=x, y0=y, x1=x + 9 * len(word), y1=y + 14, confidence=0.9))
+        x += 9 * len(word) + 6
+    return tokens
+
+
+def _page(rows, header=None):
+    tokens = []
+    if header:
+        tokens.append(OCRToken(text=header, x0=40, y0=10, x1=700, y1=24))
+    for number, values in enumerate(rows):
+        y = 40 + 22 * number + (number % 2)  # slightly uneven baselines
+        for column, value in enumerate(values):
+            if value:
+                tokens.extend(_cell(value, column, y))
+    text = "\n".join(" ".join(values) for values in rows)
+    return OCRPage(page_number=1, source="scan.pdf#page=1", text=text, engine="paddle", tokens=tokens)
+
+
+def _rows(count):
+    rows = []
+    for number in range(1, count + 1):
+        gce = number == count
+        rows.append(
+            [
+                "2025-10-12",
+                "CAMARA",
+                "GCE" if gce else "EFETIVOS",
+                "GCE1" if gce else "PS",
+                "GCE" if gce else "",
+                "Grupo de Cidadãos" if gce else "",
+                str(number),
+                f"Ana Maria Silva {number}",
+                "" if gce else "PS",
+                "" if gce else "SIM",
+            ]
+        )
+    return rows
+
+
+def test_token_geometry_yields_the_ten_contract_columns():
+    rows = _rows(12)
+    page = _page(rows, header="Câmara Municipal de Lisboa")
+
+    (layout,) = LayoutAnalyzer().analyze([page])
+
+    assert layout.rows[0].values == ["Câmara", "Municipal", "de", "Lisboa"]
+    assert [row.values for row in layout.rows[1:]] == rows
+
+
+def test_spaces_between_words_are_not_column_gaps():
+    # Without a GCE list SIMBOLO and NOME_LISTA stay empty, so fewer than 10
+    # columns are visible and the aligned names must not be cut into cells.
+    rows = _rows(12)[:-1]
+    page = _page(rows)
+
+    (layout,) = LayoutAnalyzer().analyze([page])
+
+    assert [row.values for row in layout.rows] == [" ".join(values).split() for values in rows]
+
+
+def test_pages_without_column_gaps_fall_back_to_text():
+    page = OCRPage(
+        page_number=1,
+        source="scan.pdf#page=1",
+        text="2025;CAMARA;EFETIVOS;PS;;;1;Ana Silva;PS;",
+        tokens=[OCRToken(text="2025;CAMARA;EFETIVOS;PS;;;1;Ana Silva;PS;", x0=0, y0=0, x1=400, y1=14)],
+    )
+
+    (layout,) = LayoutAnalyzer().analyze([page])
+
+    assert layout.rows[0].values[:4] == ["2025", "CAMARA", "EFETIVOS", "PS"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import random
+import string
+import sys
+from difflib import get_close_matches
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.master_data import (  # noqa: E402
+    MASTER_SIGLA,
+    SiglaResolution,
+    SiglaResolver,
+    resolve_sigla,
+)
+
+
+def _reference(master, sigla):
+    # Original per-row scan that SiglaResolver must reproduce exactly.
+    sigla_norm = (sigla or "").strip().upper()
+    if sigla_norm in master:
+        return SiglaResolution(canonical=sigla_norm, matched=sigla_norm, confidence=1.0)
+    for canonical, aliases in master.items():
+        candidates = [canonical, *aliases]
+        matches = get_close_matches(sigla_norm.lower(), [alias.lower() for alias in candidates], n=1, cutoff=0.6)
+        if matches:
+            return SiglaResolution(canonical=canonical, matched=matches[0], confidence=0.8)
+    return SiglaResolution(canonical=sigla_norm or "INDEPENDENTE", matched=sigla_norm, confidence=0.0)
+
+
+def _inputs(master):
+    rng = random.Random(42)
+    samples = ["", "  ", "ps", "P.S.", "cds", "Bloco Esquerda", "partido socialista ", "xyz", "pcp-pev"]
+    for canonical, aliases in master.items():
+        for alias in (canonical, *aliases):
+            samples.append(alias)
+            samples.append(alias.upper())
+            chars = list(alias)
+            if len(chars) > 2:
+                del chars[rng.randrange(len(chars))]
+                samples.append("".join(chars))
+    alphabet = string.ascii_lowercase + " -áç"
+    for _ in range(500):
+        samples.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12))))
+    return samples
+
+
+def test_resolve_sigla_matches_reference_scan():
+    for sigla in _inputs(MASTER_SIGLA):
+        assert resolve_sigla(sigla) == _reference(MASTER_SIGLA, sigla), sigla
+
+
+def test_resolver_matches_reference_on_large_master_list():
+    rng = random.Random(7)
+    master = dict(MASTER_SIGLA)
+    for index in range(300):
+        name = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+        master[f"GCE{index}"] = [name, f"grupo {name}", f"cidadaos {name[:4]}"]
+
+    resolver = SiglaResolver(master)
+    for sigla in _inputs(master)[:1500]:
+        assert resolver.resolve(sigla) == _reference(master, sigla), sigla
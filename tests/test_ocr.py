@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.ocr import OCREngine  # noqa: E402
+from api.app.services.render import RenderedPage  # noqa: E402
+
+
+def _text_pages(count):
+    return [
+        RenderedPage(
+            page_number=index,
+            payload=f"pagina {index}".encode("utf-8"),
+            source=f"doc.pdf#page={index}",
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def test_parallel_run_preserves_page_order():
+    pages = _text_pages(7)
+    engine = OCREngine(workers=2, max_tasks_per_worker=2)
+    try:
+        results = engine.run(pages)
+    finally:
+        engine.close()
+
+    assert [page.page_number for page in results] == list(range(1, 8))
+    assert [page.text for page in results] == [f"pagina {index}" for index in range(1, 8)]
+    assert results[0].source == "doc.pdf#page=1"
+
+
+def test_text_pages_do_not_load_the_ocr_model():
+    loads = []
+    engine = OCREngine()
+    engine._paddle._loader = lambda: loads.append("paddle")
+
+    results = engine.run(_text_pages(2))
+
+    assert loads == []
+    assert [page.engine for page in results] == ["raw", "raw"]
+    assert engine.status()["paddle"] in {"pending", "unavailable"}
+
+
+def test_raster_pages_reach_ocr_without_decoding():
+    np = pytest.importorskip("numpy")
+    pixels = np.zeros((4, 4), dtype=np.uint8)
+    page = RenderedPage(page_number=1, payload=b"", source="scan.pdf#page=1", image=pixels)
+
+    assert OCREngine()._ensure_image(page) is pixels
+
+
+def _raster_page(number):
+    np = pytest.importorskip("numpy")
+    image = np.full((60, 80), 255, dtype=np.uint8)
+    image[10:50, 10:70] = 0  # dense "ink"
+    return RenderedPage(page_number=number, payload=b"", source=f"scan.pdf#page={number}", image=image)
+
+
+def test_router_skips_an_engine_that_keeps_failing_and_never_decodes_rasters_as_text(monkeypatch):
+    from api.app.services.ocr_router import OCRRouter
+
+    now = [0.0]
+    calls = []
+    engine = OCREngine(router=OCRRouter(max_failures=2, cooldown=30.0, clock=lambda: now[0]))
+
+    def broken(image):
+        calls.append("paddle")
+        raise RuntimeError("predictor crashed")
+
+    def tesseract(image):
+        calls.append("tesseract")
+        return "ana silva", "tesseract", 0.9, None
+
+    engine._engines = {"paddle": broken, "tesseract": tesseract}
+    monkeypatch.setattr(engine, "_available_engines", lambda: ["paddle", "tesseract"])
+
+    results = engine.run([_raster_page(number) for number in range(1, 5)])
+
+    assert [page.engine for page in results] == ["tesseract"] * 4
+    assert calls == ["paddle", "tesseract", "paddle", "tesseract", "tesseract", "tesseract"]
+    assert engine.health()["paddle"] == {"calls": 2, "errors": 2, "latency_seconds": None, "available": False}
+
+    now[0] = 31.0
+    engine._engines["tesseract"] = broken
+    assert engine.run([_raster_page(5)])[0].engine == "failed"
+
+
+def test_router_does_not_ocr_blank_pages():
+    np = pytest.importorskip("numpy")
+    engine = OCREngine()
+    engine._engines = {}
+    blank = RenderedPage(page_number=1, payload=b"", source="scan.pdf#page=1", image=np.full((40, 40, 3), 255, np.uint8))
+
+    assert engine.run([blank])[0].engine == "blank"
+
+
+def test_warm_up_starts_every_worker_process():
+    engine = OCREngine(workers=2)
+    try:
+        engine.warm_up()
+        assert len(engine._pool._processes) == 2
+        assert engine._pool_users[engine._pool] == 0
+    finally:
+        engine.close()
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.artifacts import STAGES, ArtifactStore, payload_digest  # noqa: E402
+from api.app.services.pipeline import ExtractionPipeline  # noqa: E402
+
+PAYLOAD = (
+    "2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;1;ana silva;;\n"
+    "2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;2;rui costa;;\n"
+).encode("utf-8")
+
+
+def test_replay_from_ocr_checkpoint_skips_render_and_ocr(tmp_path, monkeypatch):
+    store = ArtifactStore(tmp_path)
+    pipeline = ExtractionPipeline(artifacts=store)
+
+    rows = pipeline.run(PAYLOAD, filename="lista.txt", content_type="text/plain")
+    digest = payload_digest(PAYLOAD)
+    assert store.stages(digest) == list(STAGES)
+
+    def _fail(*args, **kwargs):
+        raise AssertionError("OCR must not run during replay")
+
+    monkeypatch.setattr(pipeline.ocr, "run", _fail)
+    monkeypatch.setattr(pipeline.normalizer, "_title_case", lambda value: value.upper())
+
+    replayed = pipeline.replay(digest, checkpoint="ocr")
+
+    assert [row.NOME_CANDIDATO for row in rows] == ["Ana Silva", "Rui Costa"]
+    assert [row.NOME_CANDIDATO for row in replayed] == ["ANA SILVA", "RUI COSTA"]
+
+
+def test_replay_requires_stored_checkpoint(tmp_path):
+    pipeline = ExtractionPipeline(artifacts=ArtifactStore(tmp_path))
+
+    with pytest.raises(KeyError):
+        pipeline.replay("missing", checkpoint="layout")
+
+
+def test_run_records_stage_metrics():
+    pipeline = ExtractionPipeline()
+
+    pipeline.run(PAYLOAD, filename="lista.txt", content_type="text/plain")
+    exposition = pipeline.metrics.render()
+
+    for stage in ("render", "ocr", "layout", "segment", "extract", "normalize", "validate"):
+        assert f'cne_stage_duration_seconds_count{{stage="{stage}"}} 1' in exposition
+    assert "cne_pages_total 1" in exposition
+    assert 'cne_ocr_pages_total{engine="raw"} 1' in exposition
+    assert "cne_rows_total 2" in exposition
+    assert "# TYPE cne_validation_failures_total counter" in exposition
+
+
+def test_iter_run_streams_rows_page_by_page_and_carries_anchors(monkeypatch):
+    from api.app.services.render import RenderedPage
+
+    pipeline = ExtractionPipeline()
+    texts = [
+        "Candidatos suplentes\n2025;CAMARA;;PS;;;1;ana silva;;\n",
+        "2025;CAMARA;;PS;;;2;rui costa;;\n",
+    ]
+    rendered = []
+
+    def iter_render(payload, *, filename=None, content_type=None):
+        for number, text in enumerate(texts, start=1):
+            rendered.append(number)
+            yield RenderedPage(page_number=number, payload=text.encode("utf-8"), source=f"lista.pdf#page={number}")
+
+    monkeypatch.setattr(pipeline.renderer, "iter_render", iter_render)
+    stream = pipeline.iter_run(b"%PDF", filename="lista.pdf")
+
+    first = next(stream)
+    assert rendered == [1]
+    rows = [first, *stream]
+
+    assert [(row.TIPO, row.NUM_ORDEM, row.NOME_CANDIDATO) for row in rows] == [
+        ("SUPLENTES", 1, "Ana Silva"),
+        ("SUPLENTES", 2, "Rui Costa"),
+    ]
+    assert "cne_rows_total 2" in pipeline.metrics.render()
+
+
+def test_cache_key_changes_with_rasterization_settings():
+    key = ExtractionPipeline().cache_key(PAYLOAD, filename="scan.pdf")
+
+    assert ExtractionPipeline().cache_key(PAYLOAD, filename="scan.pdf") == key
+    assert ExtractionPipeline(raster_dpi=300).cache_key(PAYLOAD, filename="scan.pdf") != key
+    assert ExtractionPipeline(refine_dpi=300).cache_key(PAYLOAD, filename="scan.pdf") != key
+    assert ExtractionPipeline(refine_dpi=300, refine_below=0.5).cache_key(
+        PAYLOAD, filename="scan.pdf"
+    ) != ExtractionPipeline(refine_dpi=300).cache_key(PAYLOAD, filename="scan.pdf")
+
+
+def test_low_confidence_rasters_are_rerendered_at_refine_dpi(monkeypatch):
+    from api.app.services import render as render_module
+    from api.app.services.render import RenderedPage
+
+    pipeline = ExtractionPipeline(raster_dpi=100, refine_dpi=300, refine_below=0.8)
+    blurry = "2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;{0};ana si1va {0};;\n"
+    sharp = "2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;{0};ana silva {0};;\n"
+    opened = []
+
+    def render(payload, *, filename=None, content_type=None):
+        return [
+            RenderedPage(page_number=1, payload=b"", source="scan.pdf#page=1", image="raster", dpi=100),
+            RenderedPage(page_number=2, payload=sharp.format(2).encode(), source="scan.pdf#page=2"),
+            RenderedPage(page_number=3, payload=b"", source="scan.pdf#page=3", image="raster", dpi=100),
+        ]
+
+    class Page:
+        def __init__(self, number):
+            self.number = number
+
+        def to_image(self, resolution):
+            assert resolution == 300
+            return types.SimpleNamespace(original=self)
+
+        def save(self, buffer, format):
+            buffer.write(str(self.number).encode())
+
+    class PDF:
+        pages = [Page(1), Page(2), Page(3)]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    def open_pdf(stream):
+        opened.append(stream)
+        return PDF()
+
+    def run_single(page):
+        if page.dpi == 300:
+            return sharp.format(page.payload.decode()), "paddle", 0.95, None
+        if page.image is None:
+            return page.payload.decode(), "raw", None, None
+        return blurry.format(page.page_number), "paddle", 0.5, None
+
+    monkeypatch.setattr(pipeline.renderer, "render", render)
+    monkeypatch.setattr(render_module, "pdfplumber", types.SimpleNamespace(open=open_pdf))
+    monkeypatch.setattr(pipeline.ocr, "_run_single", run_single)
+
+    rows = pipeline.run(b"%PDF", filename="scan.pdf", content_type="application/pdf")
+
+    assert [row.NOME_CANDIDATO for row in rows] == ["Ana Silva 1", "Ana Silva 2", "Ana Silva 3"]
+    assert len(opened) == 1, "pages to refine should share one parse of the document"
+    exposition = pipeline.metrics.render()
+    assert "cne_ocr_refined_pages_total 2" in exposition
+    assert 'cne_raster_pages_total{dpi="300"} 2' in exposition
+    assert 'cne_ocr_confidence_count{engine="paddle"} 2' in exposition
+
+
+def _render_with_failed_page(payload, *, filename=None, content_type=None):
+    from api.app.services.render import RenderedPage
+
+    return [
+        RenderedPage(page_number=1, payload=PAYLOAD, source="scan.pdf#page=1"),
+        RenderedPage(page_number=2, payload=b"", source="scan.pdf#page=2", error="corrupt page"),
+    ]
+
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_pages_that_failed_to_render_reject_the_document(monkeypatch, streaming):
+    from api.app.services.validate import RULE_PAGE, ValidationError
+
+    pipeline = ExtractionPipeline()
+    monkeypatch.setattr(pipeline.renderer, "render", _render_with_failed_page)
+    monkeypatch.setattr(pipeline.renderer, "iter_render", _render_with_failed_page)
+
+    with pytest.raises(ValidationError, match="Página 2") as excinfo:
+        if streaming:
+            list(pipeline.iter_run(b"%PDF", filename="scan.pdf"))
+        else:
+            pipeline.run(b"%PDF", filename="scan.pdf")
+
+    (violation,) = excinfo.value.report.violations
+    assert (violation.rule, violation.page_number) == (RULE_PAGE, 2)
+    assert 'cne_validation_violations_total{rule="page"} 1' in pipeline.metrics.render()
+
+
+def test_lenient_mode_keeps_the_rows_of_readable_pages(monkeypatch):
+    pipeline = ExtractionPipeline(validation="lenient")
+    monkeypatch.setattr(pipeline.renderer, "render", _render_with_failed_page)
+
+    rows = pipeline.run(b"%PDF", filename="scan.pdf")
+
+    assert [row.NOME_CANDIDATO for row in rows] == ["Ana Silva", "Rui Costa"]
+    assert 'cne_validation_violations_total{rule="page"} 1' in pipeline.metrics.render()
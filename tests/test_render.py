@@ -12,18 +12,25 @@ sys.path.insert(0, str(PROJECT_ROOT))
 
 _render_path = PROJECT_ROOT / "api" / "app" / "services" / "render.py"
 module_name = "api.app.services.render"
-spec = importlib.util.spec_from_file_location(module_name, _render_path)
-assert spec and spec.loader is not None
 
-for package_name in ("api", "api.app", "api.app.services"):
-    if package_name not in sys.modules:
-        package_module = types.ModuleType(package_name)
-        package_module.__path__ = []  # type: ignore[attr-defined]
-        sys.modules[package_name] = package_module
+if module_name in sys.modules:
+    # Reuse the already imported module: replacing it would leave other test
+    # modules holding classes that no longer match ``sys.modules`` (breaking
+    # pickling across processes and artifact stores).
+    render = sys.modules[module_name]
+else:
+    spec = importlib.util.spec_from_file_location(module_name, _render_path)
+    assert spec and spec.loader is not None
 
-render = importlib.util.module_from_spec(spec)
-sys.modules[module_name] = render
-spec.loader.exec_module(render)
+    for package_name in ("api", "api.app", "api.app.services"):
+        if package_name not in sys.modules:
+            package_module = types.ModuleType(package_name)
+            package_module.__path__ = []  # type: ignore[attr-defined]
+            sys.modules[package_name] = package_module
+
+    render = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = render
+    spec.loader.exec_module(render)
 
 
 class _FakeOriginalImage:
@@ -83,20 +90,64 @@ def test_render_pdf_raises_when_pdfplumber_missing(monkeypatch):
         renderer.render(b"%PDF-1.4", filename="missing.pdf")
 
 
-def test_render_pdf_without_extractable_text_returns_image_bytes():
+def test_render_pdf_without_extractable_text_returns_pixels_for_ocr():
     pytest.importorskip("pdfplumber")
+    pytest.importorskip("numpy")
 
     pdf_path = PROJECT_ROOT / "tests" / "fixtures" / "blank.pdf"
     payload = pdf_path.read_bytes()
 
     renderer = render.DocumentRenderer()
 
-    try:
-        pages = renderer.render(payload, filename="blank.pdf")
-    except RuntimeError as exc:  # pragma: no cover - dependency missing at runtime
-        pytest.skip(f"Rasterization backend unavailable: {exc}")
+    pages = renderer.render(payload, filename="blank.pdf")
 
     assert len(pages) == 1
     page = pages[0]
-    assert page.payload, "Rasterized payload should not be empty"
-    assert page.payload.startswith(b"\x89PNG"), "Expected PNG rasterized payload"
+    if page.error:  # pragma: no cover - dependency missing at runtime
+        pytest.skip(f"Rasterization backend unavailable: {page.error}")
+    assert page.payload == b"", "Raster pages should not be PNG-encoded for OCR"
+    assert page.image.dtype.name == "uint8" and page.image.ndim == 3
+
+    encoded = page.encode_png()
+    assert encoded.image is None
+    assert encoded.payload.startswith(b"\x89PNG"), "Expected PNG payload once encoded for storage"
+
+    gray = render.DocumentRenderer(grayscale=True).render(payload, filename="blank.pdf")[0]
+    assert gray.image.ndim == 2
+
+    png = render.DocumentRenderer(raster_format="png").render(payload, filename="blank.pdf")[0]
+    assert png.image is None
+    assert png.payload.startswith(b"\x89PNG")
+
+
+class _BrokenPage(_FakePage):
+    def to_image(self, resolution=200):
+        raise OSError("corrupt page")
+
+
+def test_render_pdf_reports_failed_pages_and_keeps_the_rest(monkeypatch):
+    pages = [_FakePage(), _BrokenPage(), _FakePage()]
+    monkeypatch.setattr(render, "pdfplumber", types.SimpleNamespace(open=lambda _: _FakePDF(pages)))
+
+    rendered = render.DocumentRenderer().render(b"%PDF-FAKE", filename="mock.pdf")
+
+    assert [page.page_number for page in rendered] == [1, 2, 3]
+    assert [page.payload for page in rendered] == [b"fake-image-bytes", b"", b"fake-image-bytes"]
+    assert rendered[1].error and "corrupt page" in rendered[1].error
+    assert rendered[0].error is None
+
+
+def test_parallel_render_matches_serial_render():
+    pytest.importorskip("pdfplumber")
+    from benchmarks.synthetic import SyntheticConfig, generate_text_pdf
+
+    payload = generate_text_pdf(SyntheticConfig(lists=2, rows_per_page=10))
+    serial = render.DocumentRenderer().render(payload, filename="lista.pdf")
+    renderer = render.DocumentRenderer(workers=2, pages_per_task=2)
+    try:
+        parallel = renderer.render(payload, filename="lista.pdf")
+    finally:
+        renderer.close()
+
+    assert len(serial) > 2
+    assert parallel == serial
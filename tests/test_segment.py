@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.layout import LayoutPage, LayoutRow  # noqa: E402
+from api.app.services.segment import (  # noqa: E402
+    ANCHOR_KEYWORDS,
+    AnchorDetector,
+    AnchorMatcher,
+    KeywordDictionary,
+)
+
+
+def _anchors(detector, *lines):
+    page = LayoutPage(page_number=1, source="lista.pdf", rows=[LayoutRow(values=line.split()) for line in lines])
+    return [segment.anchor for segment in detector.locate([page])]
+
+
+def test_matcher_folds_accents_and_prefers_the_most_specific_keyword():
+    matcher = AnchorMatcher(ANCHOR_KEYWORDS)
+
+    assert matcher.match("CAMARA MUNICIPAL DE LISBOA") == "CAMARA"
+    assert matcher.match("Câmara  Municipal") == "CAMARA"
+    assert matcher.match("Candidatos Efetivos:") == "EFETIVOS"
+    assert matcher.match("Assembleia de Freguesia de Arroios") == "FREGUESIA"
+    assert matcher.match("Assembleia Municipal") == "ASSEMBLEIA"
+    assert matcher.match("Camarate") is None
+    assert matcher.match("Ana Silva") is None
+
+
+def test_full_contract_rows_are_never_anchors():
+    detector = AnchorDetector()
+    row = "2025 CAMARA EFETIVOS PS x y 1 Ana Silva PS"
+
+    assert _anchors(detector, "Candidatos suplentes", row) == ["SUPLENTES"]
+
+
+def test_keyword_dictionary_reloads_when_the_file_changes(tmp_path):
+    path = tmp_path / "anchors.json"
+    path.write_text(json.dumps({"EFETIVOS": ["efetivos"]}), encoding="utf-8")
+    dictionary = KeywordDictionary(path, check_interval=0)
+    detector = AnchorDetector(dictionary)
+    before = detector.fingerprint()
+
+    assert _anchors(detector, "Lista de vogais") == ["DESCONHECIDO"]
+
+    path.write_text(json.dumps({"EFETIVOS": ["efetivos"], "VOGAIS": ["lista de vogais"]}), encoding="utf-8")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    assert _anchors(detector, "Lista de vogais") == ["VOGAIS"]
+    assert detector.fingerprint() != before
+
+    path.write_text("not json", encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2_000_000))
+    assert _anchors(detector, "Lista de vogais") == ["VOGAIS"]
+    with pytest.raises(ValueError):
+        dictionary.reload()
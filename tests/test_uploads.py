@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import io
+import mmap
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.services.pipeline import ExtractionPipeline  # noqa: E402
+from api.app.services.render import _PayloadReader  # noqa: E402
+from api.app.services.uploads import spool_upload  # noqa: E402
+
+PAYLOAD = (
+    "2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;1;ana silva;;\n"
+    "2025;CAMARA;COLIGAÇÃO;PS;;Mais Lisboa;2;rui costa;;\n"
+).encode("utf-8")
+
+
+@pytest.mark.parametrize(
+    "make", [lambda: tempfile.SpooledTemporaryFile(max_size=8), io.BytesIO], ids=["spooled", "in-memory"]
+)
+def test_spool_upload_maps_the_file(make):
+    upload = make()
+    upload.write(PAYLOAD)
+    upload.seek(0)
+
+    with spool_upload(upload) as payload:
+        assert isinstance(payload, mmap.mmap)
+        assert payload[:] == PAYLOAD
+    assert payload.closed
+
+
+def test_spool_upload_handles_empty_files():
+    with spool_upload(tempfile.TemporaryFile()) as payload:
+        assert payload == b""
+
+
+def test_payload_reader_keeps_its_own_position():
+    first, second = _PayloadReader(PAYLOAD), _PayloadReader(PAYLOAD)
+
+    assert first.read(4) == b"2025"
+    assert second.seek(-3, io.SEEK_END) == len(PAYLOAD) - 3
+    assert second.read() == b";;\n"
+    assert first.read(7) == b";CAMARA"
+
+
+def test_pipeline_runs_on_mapped_upload():
+    upload = tempfile.TemporaryFile()
+    upload.write(PAYLOAD)
+
+    pipeline = ExtractionPipeline()
+    with spool_upload(upload) as payload:
+        rows = pipeline.run(payload, filename="lista.txt", content_type="text/plain")
+        key = pipeline.cache_key(payload, filename="lista.txt")
+
+    assert key == pipeline.cache_key(PAYLOAD, filename="lista.txt")
+
+    assert [row.NOME_CANDIDATO for row in rows] == ["Ana Silva", "Rui Costa"]
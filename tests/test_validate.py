@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from api.app.schemas.csv_contract import CandidateRecord  # noqa: E402
+from api.app.services.pipeline import ExtractionPipeline  # noqa: E402
+from api.app.services.validate import DataValidator, ValidationError  # noqa: E402
+
+
+def _row(num_ordem: int, *, orgao: str = "CAMARA", page_number: int = 1) -> CandidateRecord:
+    return CandidateRecord(
+        "2025", orgao, "EFETIVOS", "PS", "", "", num_ordem, "Ana Silva", "", "", page_number=page_number
+    )
+
+
+def test_report_collects_every_violation_with_provenance():
+    rows = [_row(1), _row(1, orgao="MOCK", page_number=2), _row(2), _row(2, page_number=3), _row(4)]
+
+    report = DataValidator(strict=False).validate(rows)
+
+    assert report.rows_checked == 5
+    assert [(v.rule, v.row, v.page_number) for v in report.violations] == [
+        ("domain", 2, 2),
+        ("sequence", 4, 3),
+        ("sequence", None, None),
+    ]
+    assert report.violations[0].message == "ORGAO inválido: MOCK"
+    assert "em falta 3" in report.violations[-1].message
+    assert report.invalid_rows() == {2, 4}
+
+
+def test_strict_mode_raises_with_full_report():
+    with pytest.raises(ValidationError) as excinfo:
+        DataValidator().validate([_row(1, orgao="MOCK"), _row(3)])
+
+    assert str(excinfo.value) == "ORGAO inválido: MOCK (+1 outras violações)"
+    assert len(excinfo.value.report.violations) == 2
+
+
+def test_lenient_pipeline_drops_invalid_rows():
+    payload = (
+        "2025;CAMARA;EFETIVOS;PS;;;1;ana silva;;\n"
+        "2025;CAMARA;EFETIVOS;PS;;;1;rui costa;;\n"
+        "2025;CAMARA;EFETIVOS;PS;;;2;eva lima;;\n"
+    ).encode("utf-8")
+    pipeline = ExtractionPipeline(validation="lenient")
+
+    rows = pipeline.run(payload, filename="lista.txt", content_type="text/plain")
+    streamed = list(pipeline.iter_run(payload, filename="lista.txt", content_type="text/plain"))
+
+    assert [row.NOME_CANDIDATO for row in rows] == ["Ana Silva", "Eva Lima"]
+    assert [row.NOME_CANDIDATO for row in streamed] == ["Ana Silva", "Eva Lima"]
+    assert all(row.page_number == 1 for row in rows)
+    assert 'cne_validation_violations_total{rule="sequence"} 2' in pipeline.metrics.render()